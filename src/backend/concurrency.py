@@ -0,0 +1,158 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import numpy as np
+from src.telemetry import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for calls to one backend.
+
+    Callers hold a permit for the duration of a request and queue while the
+    limit is reached. The limit grows by about one per round of requests
+    (+1/limit per success) while the backend keeps up, and is cut by
+    `backoff_ratio` when a call fails with an overload error (429/503,
+    timeouts) or when the p95 latency of the last `window` requests exceeds
+    `latency_tolerance` times the no-load baseline. The baseline follows
+    the lowest window median seen, but may drift up by `baseline_drift` per
+    window so it can follow a lasting shift to longer prompts.
+
+    A decrease only applies once per generation of requests: requests that
+    started before the last cut neither trigger another cut nor raise the
+    limit. This keeps a burst of failures from collapsing the limit to its
+    minimum.
+
+    Usage:
+        limiter = AdaptiveLimiter(is_overload=is_overload_error)
+        with limiter.acquire():
+            response = client.chat.completions.create(...)
+    """
+
+    def __init__(self, initial_limit: int = 4, min_limit: int = 1, max_limit: int = 64,
+                 backoff_ratio: float = 0.7, latency_tolerance: float = 2.0, window: int = 10,
+                 baseline_drift: float = 0.01, is_overload: Optional[Callable[[BaseException], bool]] = None,
+                 name: str = "llm"):
+        """
+        Args:
+            initial_limit: Starting number of concurrent requests.
+            min_limit, max_limit: Bounds on the limit.
+            backoff_ratio: Multiplier applied on overload.
+            latency_tolerance: Allowed ratio of window p95 to baseline latency.
+            window: Successful requests per latency evaluation.
+            baseline_drift: Fraction the baseline may rise per window.
+            is_overload: Classifies a raised exception as backend overload.
+                Other exceptions release the permit without affecting the limit.
+            name: Label for the exported metrics.
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial_limit <= max_limit")
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.window = window
+        self.baseline_drift = baseline_drift
+        self.baseline: Optional[float] = None
+        self.is_overload = is_overload or (lambda e: False)
+        self.name = name
+        self.in_flight = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+        self._epoch = 0
+        self._samples: List[float] = []
+        self._publish()
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Holds a permit while the block runs.
+
+        Raises:
+            TimeoutError: If no permit frees up within `timeout` seconds.
+        """
+        queued_at = time.perf_counter()
+        with self._cond:
+            self.waiting += 1
+            self._publish()
+            try:
+                if not self._cond.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                    raise TimeoutError(f"No {self.name} permit within {timeout}s")
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            epoch = self._epoch
+            # Only grow the limit when demand actually reaches it
+            saturated = self.in_flight + self.waiting >= int(self.limit)
+            self._publish()
+
+        started = time.perf_counter()
+        metrics.observe("llm_concurrency_wait_seconds", started - queued_at,
+                        help="Time spent waiting for a concurrency permit", limiter=self.name)
+        try:
+            yield
+        except BaseException as e:
+            self._release(epoch, None, self.is_overload(e), saturated)
+            raise
+        self._release(epoch, time.perf_counter() - started, False, saturated)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "baseline_ms": round(self.baseline * 1000.0, 2) if self.baseline is not None else None,
+            }
+
+    def _release(self, epoch: int, latency: Optional[float], overload: bool, saturated: bool) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if overload:
+                self._decrease(epoch, "overload")
+            elif latency is not None and epoch == self._epoch and not self._observe(latency) and saturated:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._publish()
+            self._cond.notify_all()
+
+    def _observe(self, latency: float) -> bool:
+        """
+        Adds a latency sample; returns True if it completed a window that cut
+        the limit. Only requests started since the last cut are sampled, so a
+        window always reflects the current limit.
+        """
+        self._samples.append(latency)
+        if len(self._samples) < self.window:
+            return False
+        p50, p95 = np.percentile(self._samples, [50, 95])
+        self._samples.clear()
+        baseline = self.baseline if self.baseline is not None else float(p50)
+        self.baseline = min(float(p50), baseline * (1.0 + self.baseline_drift))
+        if p95 > self.latency_tolerance * baseline:
+            return self._decrease(self._epoch, "latency")
+        return False
+
+    def _decrease(self, epoch: int, reason: str) -> bool:
+        if epoch != self._epoch:
+            return False
+        self._epoch += 1
+        self._samples.clear()
+        previous = self.limit
+        self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+        metrics.inc("llm_concurrency_decreases_total", help="Concurrency limit cuts by cause",
+                    limiter=self.name, reason=reason)
+        logger.info(f"Concurrency limit for {self.name}: {previous:.1f} -> {self.limit:.1f} ({reason})")
+        return True
+
+    def _publish(self) -> None:
+        metrics.set_gauge("llm_concurrency_limit", int(self.limit),
+                          help="Current adaptive concurrency limit", limiter=self.name)
+        metrics.set_gauge("llm_concurrency_in_flight", self.in_flight,
+                          help="Requests holding a concurrency permit", limiter=self.name)
+        metrics.set_gauge("llm_concurrency_queue_depth", self.waiting,
+                          help="Requests waiting for a concurrency permit", limiter=self.name)
@@ -7,6 +7,9 @@ from ..database.db_manager import DBManager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Corrections logged from the GUI cover a whole extraction (component, package and pins)
+TASK_TYPE = "EXTRACTION"
+
 class CorrectionLogger:
     """
     Logger for the active learning loop.
@@ -27,7 +30,8 @@ class CorrectionLogger:
         Log a correction to the database.
 
         Args:
-            prompt (str): The prompt sent to the LLM.
+            prompt (str): The datasheet context the extraction saw (ContentExtractor.build_context);
+                few-shot retrieval matches new datasheets against it.
             original_output (str): The original output from the LLM (can be JSON string or raw text).
             user_corrected_output (str): The corrected output from the user (should be JSON string).
         """
@@ -39,10 +43,10 @@ class CorrectionLogger:
                 user_corrected_output = json.dumps(user_corrected_output)
 
             query = """
-                INSERT INTO correction_log (input_context, llm_output, user_correction)
-                VALUES (?, ?, ?)
+                INSERT INTO correction_log (task_type, input_context, llm_output, user_corrected_output)
+                VALUES (?, ?, ?, ?)
             """
-            self.db.execute_query(query, (prompt, original_output, user_corrected_output))
+            self.db.execute_query(query, (TASK_TYPE, prompt, original_output, user_corrected_output))
             logger.info("Correction logged successfully.")
             
         except Exception as e:
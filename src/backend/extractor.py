@@ -1,20 +1,147 @@
 import json
 import logging
-from typing import Dict, Any, List, Optional
+import functools
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Type
+from pydantic import BaseModel, ConfigDict, Field, create_model
 from src.backend.llm_client import LLMClient
 from src.models.data_models import Component, Package, Pin
+from src.backend.prompts import PromptTemplate, DEFAULT_TEMPLATE
+from src.backend.ingestion import truncate_section
+from src.backend.validation import DIMENSION_RANGES, expected_pin_count
+from src.generators.package_names import packages_in_text, package_dimensions, package_type_of, is_determined
+from src.telemetry import tracer, metrics
+
+if TYPE_CHECKING:
+    from src.backend.few_shot import FewShotRetriever
 
 logger = logging.getLogger(__name__)
 
+# Sections feeding each sub-extraction. A change to any of these sections
+# invalidates the corresponding part of a stored extraction.
+TARGET_SECTIONS: Dict[str, List[str]] = {
+    "component": ["description", "features", "preamble"],
+    "package": ["package_dimensions", "ordering_information"],
+    "pins": ["pin_configuration"],
+}
+
+ALL_TARGETS = ["component", "package", "pins"]
+
+# Database bookkeeping the LLM cannot know; excluded from the output schema
+SCHEMA_EXCLUDED_FIELDS = {"id", "datasheet_id", "component_id", "package_id", "model_params"}
+
+TARGET_MODELS: Dict[str, Any] = {"component": Component, "package": Package, "pins": Pin}
+
+# Package.dimensions keys the LLM may fill: the ones validation checks,
+# except the bare 'width'/'length' that no generator reads
+DIMENSION_KEYS = [key for key in DIMENSION_RANGES if key not in ("width", "length")]
+
+
+def _dimensions_model() -> Type[BaseModel]:
+    """Package.dimensions as an object with named optional properties instead of a free-form map."""
+    fields = {key: (float, Field(default=None)) for key in DIMENSION_KEYS}
+    return create_model("PackageDimensions", __config__=ConfigDict(extra="forbid"), **fields)
+
+
+def _output_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """Copies a data model without its database-only fields."""
+    fields = {name: (field.annotation, field) for name, field in model.model_fields.items()
+              if name not in SCHEMA_EXCLUDED_FIELDS}
+    if model is Package:
+        field = model.model_fields["dimensions"]
+        fields["dimensions"] = (_dimensions_model(), Field(default_factory=dict, description=field.description))
+    return create_model(f"{model.__name__}Extraction", **fields)
+
+
+@functools.lru_cache(maxsize=None)
+def _extraction_schema(targets: Tuple[str, ...]) -> str:
+    fields = {}
+    for target in targets:
+        model = _output_model(TARGET_MODELS[target])
+        fields[target] = (List[model], ...) if target == "pins" else (model, ...)
+    return json.dumps(create_model("Extraction", **fields).model_json_schema())
+
+
+def extraction_schema(targets: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    JSON Schema of the extraction response, derived from the pydantic models.
+
+    Sent to vLLM for guided decoding instead of being spelled out in the
+    prompt, so the output structure is enforced rather than requested.
+
+    Args:
+        targets (List[str], optional): Subset of 'component', 'package' and 'pins'.
+
+    Returns:
+        Dict[str, Any]: A fresh copy of the schema.
+    """
+    targets = tuple(t for t in ALL_TARGETS if t in (targets or ALL_TARGETS))
+    return json.loads(_extraction_schema(targets))
+
+
+def escalation_reasons(result: Dict[str, Any], targets: List[str]) -> List[str]:
+    """
+    Cheap plausibility checks on a small-model extraction.
+
+    Returns:
+        List[str]: Why the result should go to the large model; empty if it looks sound.
+    """
+    reasons = []
+    if "component" in targets:
+        part_number = (result["component"].part_number or "").strip()
+        if part_number.lower() in ("", "unknown", "n/a", "none"):
+            reasons.append("missing part number")
+    if "pins" in targets:
+        pins = result["pins"]
+        numbers = [p.number.strip() for p in pins]
+        if not pins:
+            reasons.append("no pins")
+        elif len(set(numbers)) != len(numbers) or "" in numbers:
+            reasons.append("duplicate or empty pin numbers")
+        elif sum(1 for p in pins if not (p.name or "").strip()) > len(pins) // 2:
+            reasons.append("most pins unnamed")
+        if pins and "package" in targets:
+            expected = expected_pin_count(result["package"])
+            # One extra pin is allowed for an exposed thermal pad
+            if expected and len(pins) not in (expected, expected + 1):
+                reasons.append(f"{len(pins)} pins for a {expected}-pin package")
+    return reasons
+
+
 class ContentExtractor:
     """
     Extracts structured component data from text using an LLM.
+
+    With a `fast_client`, extraction runs as a two-tier cascade: the small
+    model answers first and its result is kept unless it fails the cheap
+    checks in escalation_reasons() (or the call fails), in which case the
+    request is repeated on `llm_client`.
+
+    With `resolve_packages`, a datasheet whose package sections name a single
+    standard package (e.g. 'SOIC-8' or 'QFN-32-1EP_5x5mm_P0.5mm') gets its
+    package from the name and the JEDEC table instead of from the LLM.
+
+    With a `few_shot` retriever (src.backend.few_shot.FewShotRetriever),
+    verified corrections of similar datasheets are added to the prompt as
+    examples.
     """
 
-    def __init__(self, llm_client: LLMClient):
+    def __init__(self, llm_client: LLMClient, template: PromptTemplate = DEFAULT_TEMPLATE,
+                 fast_client: Optional[LLMClient] = None, resolve_packages: bool = True,
+                 few_shot: Optional["FewShotRetriever"] = None):
         self.llm_client = llm_client
+        self.template = template
+        self.fast_client = fast_client
+        self.resolve_packages = resolve_packages
+        self.few_shot = few_shot
+
+    @property
+    def version(self) -> str:
+        """What produces this extractor's output: the prompt template version and the LLM model, if known."""
+        model = getattr(self.llm_client, "model_name", None)
+        return f"{self.template.version}:{model}" if isinstance(model, str) else self.template.version
 
-    def extract_all(self, text_content: str, datasheet_id: int = 1, sections: Dict[str, str] = None) -> Dict[str, Any]:
+    def extract_all(self, text_content: str, datasheet_id: int = 1, sections: Dict[str, str] = None,
+                    targets: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Extracts component, package, and pin information from the text content.
         
@@ -22,13 +149,132 @@ class ContentExtractor:
             text_content (str): The full text content of the datasheet (or relevant sections).
             datasheet_id (int): The ID of the datasheet being processed.
             sections (Dict[str, str], optional): Identified sections from IngestionEngine.
+            targets (List[str], optional): Subset of 'component', 'package' and 'pins' to extract.
+                Defaults to all three.
             
         Returns:
-            Dict[str, Any]: A dictionary containing 'component', 'package', and 'pins' objects/lists.
+            Dict[str, Any]: A dictionary containing 'component', 'package', and 'pins' objects/lists
+            (only the requested targets) and the 'raw_json' response.
+        """
+        targets = [t for t in ALL_TARGETS if t in (targets or ALL_TARGETS)]
+
+        with tracer.span("extraction", targets=",".join(targets)) as extraction_span:
+            package = self.resolve_package(sections) if "package" in targets else None
+            known = {"package": package} if package else {}
+            llm_targets = [t for t in targets if t not in known]
+            if known:
+                extraction_span.set("resolved", ",".join(known))
+                metrics.inc("extraction_resolved_total", help="Targets filled without the LLM", target="package")
+            if not llm_targets:
+                return self.build_result(known, datasheet_id, targets)
+
+            with tracer.span("prompt_build", prompt_version=self.template.version) as span:
+                system_prompt, user_prompt = self.build_prompt(text_content, sections, llm_targets)
+                span.set("prompt_chars", len(system_prompt) + len(user_prompt))
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"LLM prompt\nSystem Prompt:\n{system_prompt}\nUser Prompt:\n{user_prompt}")
+
+            if self.fast_client is not None:
+                result = self._try_fast(system_prompt, user_prompt, datasheet_id, targets, known)
+                if result:
+                    return result
+
+            try:
+                response = self._generate(self.llm_client, system_prompt, user_prompt, llm_targets)
+
+                if isinstance(response, dict) and "error" in response:
+                    logger.error(f"LLM extraction failed: {response['error']}")
+                    return {}
+
+                return self.build_result({**response, **known}, datasheet_id, targets)
+
+            except Exception as e:
+                logger.error(f"Error during extraction: {e}")
+                raise
+
+    def _generate(self, client: LLMClient, system_prompt: str, user_prompt: str,
+                  targets: List[str]) -> Dict[str, Any]:
+        response = client.generate(
+            prompt=user_prompt,
+            system_prompt=system_prompt,
+            json_mode=True,
+            temperature=0.1,
+            json_schema=extraction_schema(targets),
+        )
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"LLM raw response: {response}")
+        return response
+
+    def _try_fast(self, system_prompt: str, user_prompt: str, datasheet_id: int,
+                  targets: List[str], known: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Runs the small model; returns its result, or None to escalate."""
+        with tracer.span("cascade.fast") as span:
+            try:
+                llm_targets = [t for t in targets if t not in known]
+                response = self._generate(self.fast_client, system_prompt, user_prompt, llm_targets)
+                if isinstance(response, dict) and "error" in response:
+                    reasons = [f"fast model error: {response['error']}"]
+                else:
+                    result = self.build_result({**response, **known}, datasheet_id, targets)
+                    reasons = escalation_reasons(result, targets)
+            except Exception as e:
+                reasons = [f"fast model failed: {type(e).__name__}"]
+
+            span.set("escalated", bool(reasons))
+            metrics.inc("extraction_cascade_total", help="Cascade extractions by outcome",
+                        outcome="escalated" if reasons else "accepted")
+            if reasons:
+                span.set("reasons", "; ".join(reasons))
+                logger.info(f"Escalating extraction to the large model: {'; '.join(reasons)}")
+                return None
+            return result
+
+    def resolve_package(self, sections: Optional[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        """
+        Package data determined by the package name alone.
+
+        Returns:
+            Dict[str, Any]: Raw package JSON (name, package_type, dimensions) if
+            the package sections name exactly one package geometry and that
+            geometry is tabulated or spelled out in the name; None otherwise,
+            in which case the LLM extracts the package.
+        """
+        if not self.resolve_packages or not sections:
+            return None
+        text = "\n".join(sections.get(key, "") for key in TARGET_SECTIONS["package"])
+        # 'SO8' in an ordering code and 'SOIC-8' in the drawing title are the same package
+        geometries = {}
+        for name in packages_in_text(text):
+            dimensions = package_dimensions(name)
+            geometries.setdefault(tuple(sorted(dimensions.items())), (name, dimensions))
+        if len(geometries) != 1:
+            return None
+        name, dimensions = next(iter(geometries.values()))
+        if not is_determined(dimensions):
+            return None
+        logger.info(f"Package {name} resolved from the standard package table")
+        return {"name": name, "package_type": package_type_of(name), "dimensions": dimensions}
+
+    def build_prompt(self, text_content: str, sections: Optional[Dict[str, str]],
+                     targets: List[str]) -> Tuple[str, str]:
+        """
+        Builds the system and user prompts for the requested targets.
+
+        Returns:
+            Tuple[str, str]: (system_prompt, user_prompt).
+        """
+        context_text = self.build_context(text_content, sections, targets)
+        examples = [e["json"] for e in self.few_shot.examples(context_text, targets)] if self.few_shot else []
+        # Shared instructions first, datasheet text last, for vLLM prefix caching
+        return self.template.render(targets, context_text, examples)
+
+    def build_context(self, text_content: str, sections: Optional[Dict[str, str]], targets: List[str]) -> str:
+        """
+        Datasheet text sent for the requested targets. Also the text corrections
+        are logged and retrieved under, so keep the two in step.
         """
-        
-        # Construct the prompt
-        
         context_text = ""
         
         if sections:
@@ -36,19 +282,22 @@ class ContentExtractor:
             # We prioritize sections that are likely to contain the info we need
             
             # 1. Component Details (usually in Description, Features, or Preamble)
-            context_text += "--- COMPONENT DESCRIPTION ---\n"
-            context_text += sections.get("description", "") + "\n"
-            context_text += sections.get("features", "") + "\n"
-            context_text += sections.get("preamble", "")[:2000] + "\n" # Limit preamble
+            if "component" in targets:
+                context_text += "--- COMPONENT DESCRIPTION ---\n"
+                context_text += sections.get("description", "") + "\n"
+                context_text += sections.get("features", "") + "\n"
+                context_text += truncate_section("preamble", sections.get("preamble", "")) + "\n"  # Limit preamble
             
             # 2. Package Details
-            context_text += "\n--- PACKAGE INFORMATION ---\n"
-            context_text += sections.get("package_dimensions", "") + "\n"
-            context_text += sections.get("ordering_information", "") + "\n"
+            if "package" in targets:
+                context_text += "\n--- PACKAGE INFORMATION ---\n"
+                context_text += sections.get("package_dimensions", "") + "\n"
+                context_text += sections.get("ordering_information", "") + "\n"
             
             # 3. Pin Configuration
-            context_text += "\n--- PIN CONFIGURATION ---\n"
-            context_text += sections.get("pin_configuration", "") + "\n"
+            if "pins" in targets:
+                context_text += "\n--- PIN CONFIGURATION ---\n"
+                context_text += sections.get("pin_configuration", "") + "\n"
             
             # Add other potentially useful sections if they are small enough?
             # For now, let's stick to these key ones.
@@ -60,104 +309,48 @@ class ContentExtractor:
             # Qwen 32B usually has 32k context, so 30k chars is safe.
             context_text = text_content[:50000] 
             logger.info("Using raw text content (truncated) for LLM context.")
-        
-        system_prompt = """You are an expert electronics engineer and data extraction assistant. 
-Your task is to extract structured information from a component datasheet.
-Output the data strictly in JSON format."""
-
-        user_prompt = f"""Extract the following information from the provided datasheet text:
-
-1. Component Details:
-   - Part Number
-   - Manufacturer
-   - Description
-
-2. Package Details:
-   - Package Name (e.g., SOIC-8, TO-220)
-   - Package Type (e.g., SOIC, DIP, QFN)
-   - Dimensions (width, length, height if available) - approximate or nominal values in mm.
-
-3. Pin Configuration:
-   - List of pins with:
-     - Pin Number
-     - Pin Name
-     - Electrical Type (Input, Output, Power, Ground, Bidirectional, Passive, etc.)
-     - Description (brief function)
-
-Output JSON Schema:
-{{
-  "component": {{
-    "part_number": "string",
-    "manufacturer": "string",
-    "description": "string"
-  }},
-  "package": {{
-    "name": "string",
-    "package_type": "string",
-    "dimensions": {{
-      "width": float,
-      "length": float,
-      "height": float
-    }}
-  }},
-  "pins": [
-    {{
-      "number": "string",
-      "name": "string",
-      "electrical_type": "string",
-      "description": "string"
-    }}
-  ]
-}}
-
-If a value is not found, use null or an empty string.
-Ensure the JSON is valid.
-
-Datasheet Text:
-{context_text}
-"""
-
-        print("\n--- LLM PROMPT ---")
-        print(f"System Prompt:\n{system_prompt}")
-        print(f"User Prompt:\n{user_prompt}")
-        print("------------------\n")
-
-        try:
-            response = self.llm_client.generate(
-                prompt=user_prompt,
-                system_prompt=system_prompt,
-                json_mode=True,
-                temperature=0.1
-            )
-            
-            print(f"\n--- LLM RAW RESPONSE ---\n{response}\n------------------------\n")
-            
-            if isinstance(response, dict) and "error" in response:
-                logger.error(f"LLM extraction failed: {response['error']}")
-                return {}
 
-            # Parse response into models
-            data = response
-            
-            # Create Component
+        return context_text
+
+    @tracer.traced("model_construction")
+    def build_result(self, data: Dict[str, Any], datasheet_id: int = 1,
+                     targets: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Builds model objects from a raw extraction response.
+
+        Args:
+            data (Dict[str, Any]): Parsed JSON returned by the LLM (or a stored copy of it).
+            datasheet_id (int): The ID of the datasheet being processed.
+            targets (List[str], optional): Which of 'component', 'package' and 'pins' to build.
+
+        Returns:
+            Dict[str, Any]: The requested model objects and the 'raw_json' they were built from.
+        """
+        targets = targets or ALL_TARGETS
+        result = {"raw_json": data}
+
+        # Create Component
+        if "component" in targets:
             comp_data = data.get("component", {})
-            component = Component(
+            result["component"] = Component(
                 datasheet_id=datasheet_id,
                 part_number=comp_data.get("part_number", "Unknown"),
                 manufacturer=comp_data.get("manufacturer", "Unknown"),
                 description=comp_data.get("description", "")
             )
-            
-            # Create Package
+
+        # Create Package
+        if "package" in targets:
             pkg_data = data.get("package", {})
-            package = Package(
+            result["package"] = Package(
                 component_id=0, # Placeholder, will be set after component save in real DB
                 name=pkg_data.get("name", "Unknown"),
                 package_type=pkg_data.get("package_type", "Unknown"),
-                dimensions=pkg_data.get("dimensions", {})
+                dimensions={k: v for k, v in (pkg_data.get("dimensions") or {}).items() if v is not None}
             )
-            
-            # Create Pins
+
+        # Create Pins
+        if "pins" in targets:
             pins_data = data.get("pins", [])
             pins = []
             for p in pins_data:
@@ -168,14 +361,6 @@ Datasheet Text:
                     electrical_type=p.get("electrical_type", "Passive"),
                     description=p.get("description", "")
                 ))
-                
-            return {
-                "component": component,
-                "package": package,
-                "pins": pins,
-                "raw_json": data
-            }
-
-        except Exception as e:
-            logger.error(f"Error during extraction: {e}")
-            raise
+            result["pins"] = pins
+
+        return result
@@ -0,0 +1,193 @@
+import re
+import json
+import math
+import heapq
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from src.backend.extractor import ALL_TARGETS, SCHEMA_EXCLUDED_FIELDS
+from src.database.db_manager import DBManager
+from src.telemetry import tracer
+
+logger = logging.getLogger(__name__)
+
+# Part numbers and package names ("LM358", "SOIC-8", "0.5mm") stay single tokens
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an inverted index that grows one document at a time.
+
+    Adding a document only touches the postings of its own terms, so the
+    index can follow a table that keeps receiving rows. Re-adding a key
+    replaces the earlier document.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Any, int]] = {}
+        self._lengths: Dict[Any, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, key: Any, text: str) -> None:
+        if key in self._lengths:
+            self.remove(key)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[key] = tf
+        length = sum(counts.values())
+        self._lengths[key] = length
+        self._total_length += length
+
+    def remove(self, key: Any) -> None:
+        length = self._lengths.pop(key, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in [t for t, docs in self._postings.items() if key in docs]:
+            del self._postings[term][key]
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def search(self, text: str, k: int = 5) -> List[Tuple[Any, float]]:
+        """
+        Returns:
+            List[Tuple[Any, float]]: Up to `k` (key, score) pairs, best first.
+            Documents sharing no term with the query are never returned.
+        """
+        if not self._lengths:
+            return []
+        n = len(self._lengths)
+        avg_length = self._total_length / n or 1.0
+        scores: Dict[Any, float] = {}
+        for term in set(tokenize(text)):
+            docs = self._postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1.0 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for key, tf in docs.items():
+                norm = self.k1 * (1.0 - self.b + self.b * self._lengths[key] / avg_length)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+class FewShotRetriever:
+    """
+    Picks verified corrections of similar datasheets as few-shot examples.
+
+    Rows of `correction_log` with a corrected output are indexed by their
+    input context (the datasheet text the extraction saw). Each lookup first
+    pulls rows added since the previous one, so new corrections are used on
+    the next extraction without rebuilding the index.
+
+    Usage:
+        extractor = ContentExtractor(llm_client, few_shot=FewShotRetriever(db_manager))
+    """
+
+    def __init__(self, db_manager: DBManager, k: int = 2, max_chars: int = 6000, min_score: float = 1.0):
+        """
+        Args:
+            db_manager: Database holding the correction log.
+            k: Maximum number of examples per prompt.
+            max_chars: Budget for all examples together (about 4 characters per token).
+            min_score: BM25 score below which a correction is not considered similar.
+        """
+        self.db = db_manager
+        self.k = k
+        self.max_chars = max_chars
+        self.min_score = min_score
+        self.index = BM25Index()
+        self._outputs: Dict[int, Dict[str, Any]] = {}
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """Indexes corrections logged since the last call; returns how many were added."""
+        rows = self.db.fetch_all(
+            "SELECT id, input_context, user_corrected_output FROM correction_log "
+            "WHERE id > ? AND user_corrected_output IS NOT NULL ORDER BY id",
+            (self._last_id,)
+        )
+        added = 0
+        with self._lock:
+            for row in rows:
+                self._last_id = max(self._last_id, row["id"])
+                output = _extraction_output(row["user_corrected_output"])
+                if output and row["input_context"]:
+                    self.index.add(row["id"], row["input_context"])
+                    self._outputs[row["id"]] = output
+                    added += 1
+        if added:
+            logger.info(f"Indexed {added} corrections for few-shot retrieval ({len(self.index)} total)")
+        return added
+
+    @tracer.traced("few_shot")
+    def examples(self, context: str, targets: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Most similar verified outputs for a datasheet context, within the budget.
+
+        Args:
+            context: Datasheet text the extraction will see.
+            targets: Parts of the outputs to keep; defaults to all.
+
+        Returns:
+            List[Dict[str, Any]]: Up to `k` dicts with 'id', 'score' and
+            'json' (the compact output, restricted to `targets`), best first.
+        """
+        try:
+            self.refresh()
+        except Exception as e:
+            # The prompt still works zero-shot
+            logger.warning(f"Could not read corrections for few-shot examples: {e}")
+        targets = targets or ALL_TARGETS
+        with self._lock:
+            hits = self.index.search(context, self.k)
+            outputs = {key: self._outputs[key] for key, _ in hits}
+
+        examples, used = [], 0
+        for key, score in hits:
+            if score < self.min_score:
+                break
+            subset = {t: outputs[key][t] for t in targets if t in outputs[key]}
+            if not subset:
+                continue
+            text = json.dumps(subset, separators=(",", ":"), ensure_ascii=False)
+            if used + len(text) > self.max_chars:
+                continue
+            used += len(text)
+            examples.append({"id": key, "score": round(score, 3), "json": text})
+        return examples
+
+
+def _extraction_output(raw: Any) -> Optional[Dict[str, Any]]:
+    """Corrected output in extraction shape, without database-only fields."""
+    try:
+        data = json.loads(raw) if isinstance(raw, str) else raw
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    if not any(t in data for t in ALL_TARGETS):
+        # Older GUI versions logged the bare component
+        if "part_number" not in data:
+            return None
+        data = {"component": data}
+    return {t: _strip(data[t]) for t in ALL_TARGETS if data.get(t)}
+
+
+def _strip(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_strip(v) for v in value]
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if k not in SCHEMA_EXCLUDED_FIELDS}
+    return value
@@ -0,0 +1,159 @@
+import logging
+from typing import Dict, Any, List, Optional
+
+from src.backend.extractor import ContentExtractor, TARGET_SECTIONS, ALL_TARGETS
+from src.backend.ingestion import IngestionEngine
+from src.backend.near_duplicates import NearDuplicateDetector
+from src.database.db_manager import DBManager
+
+logger = logging.getLogger(__name__)
+
+# Stored with the section hashes; an extraction made by another prompt
+# template or model is not reused, whatever its sections
+VERSION_KEY = "_extractor_version"
+
+
+class IncrementalExtractor:
+    """
+    Re-runs only the sub-extractions whose source sections changed since the
+    last stored extraction of the same document.
+
+    With a NearDuplicateDetector, a document seen for the first time is
+    diffed against the stored extraction of its closest near-duplicate
+    (e.g. the same datasheet under a new cover page), so only the targets
+    fed by differing sections go to the LLM.
+    """
+
+    def __init__(self, extractor: ContentExtractor, db_manager: DBManager,
+                 ingestion_engine: Optional[IngestionEngine] = None,
+                 duplicates: Optional[NearDuplicateDetector] = None):
+        """
+        Initialize the IncrementalExtractor.
+
+        Args:
+            extractor (ContentExtractor): Extractor used for the LLM calls.
+            db_manager (DBManager): Database holding previous extractions.
+            ingestion_engine (IngestionEngine, optional): Used to hash sections that
+                were not produced by process_file.
+            duplicates (NearDuplicateDetector, optional): Finds an earlier near-duplicate
+                to reuse when the document has no extraction of its own, and
+                registers every extracted document.
+        """
+        self.extractor = extractor
+        self.db = db_manager
+        self.ingestion_engine = ingestion_engine or IngestionEngine()
+        self.duplicates = duplicates
+
+    def changed_targets(self, old_hashes: Dict[str, str], new_hashes: Dict[str, str]) -> List[str]:
+        """
+        Determine which sub-extractions are affected by a section diff.
+
+        Args:
+            old_hashes (Dict[str, str]): Section hashes of the stored extraction.
+            new_hashes (Dict[str, str]): Section hashes of the new revision.
+
+        Returns:
+            List[str]: Affected targets, in extraction order; all of them if
+            the two were extracted by different versions (see VERSION_KEY).
+        """
+        if old_hashes.get(VERSION_KEY) != new_hashes.get(VERSION_KEY):
+            return list(ALL_TARGETS)
+        changed_sections = {
+            key for key in set(old_hashes) | set(new_hashes)
+            if old_hashes.get(key) != new_hashes.get(key)
+        }
+        return [
+            target for target in ALL_TARGETS
+            if changed_sections.intersection(TARGET_SECTIONS[target])
+        ]
+
+    def section_hashes(self, sections: Optional[Dict[str, str]],
+                       section_hashes: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Section hashes of a document plus the extractor version, as stored with its extraction."""
+        if section_hashes is None:
+            section_hashes = self.ingestion_engine.compute_section_hashes(sections or {})
+        return dict(section_hashes, **{VERSION_KEY: self.extractor.version})
+
+    def store(self, source_key: str, content: str, sections: Optional[Dict[str, str]],
+              raw_json: Dict[str, Any], datasheet_id: int = 1,
+              section_hashes: Optional[Dict[str, str]] = None) -> None:
+        """
+        Saves an extraction made outside extract() so later revisions can be diffed against it,
+        and registers the document for near-duplicate detection.
+        """
+        self.db.save_extraction(source_key, self.section_hashes(sections, section_hashes), raw_json, datasheet_id)
+        if self.duplicates is not None:
+            try:
+                self.duplicates.register(source_key, sections, content)
+            except Exception as e:
+                logger.warning(f"Could not register signature of {source_key}: {e}")
+
+    def extract(self, source_key: str, content: str, sections: Dict[str, str],
+                datasheet_id: int = 1, section_hashes: Optional[Dict[str, str]] = None,
+                reuse_from: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Extract a document, reusing unchanged parts of its previous extraction.
+
+        Args:
+            source_key (str): Identity of the document across revisions (e.g. its filename).
+            content (str): Full text content, used when no sections were identified.
+            sections (Dict[str, str]): Identified sections from IngestionEngine.
+            datasheet_id (int): The ID of the datasheet being processed.
+            section_hashes (Dict[str, str], optional): Precomputed hashes from process_file.
+            reuse_from (str, optional): Diff against the stored extraction of this
+                document instead of `source_key`'s own, e.g. a near-duplicate the
+                user chose to reuse. The result is still saved under `source_key`.
+                Any value, `source_key` included, skips the near-duplicate lookup.
+
+        Returns:
+            Dict[str, Any]: Same shape as ContentExtractor.extract_all, plus 'reextracted'
+            listing the targets that went to the LLM and 'reused_from' naming the
+            document whose extraction was diffed against (None if none was).
+        """
+        section_hashes = self.section_hashes(sections, section_hashes)
+
+        base_key = reuse_from or source_key
+        previous = self.db.get_latest_extraction(base_key)
+        if previous is None and reuse_from is None and self.duplicates is not None:
+            match = self._near_duplicate(source_key, content, sections)
+            if match:
+                base_key = match["source_key"]
+                previous = self.db.get_latest_extraction(base_key)
+                logger.info(f"{source_key} is a near-duplicate of {base_key} "
+                            f"(similarity {match['similarity']}), reusing its extraction")
+
+        # Without sections there is nothing to diff against, so extract everything.
+        if not previous or not sections:
+            targets = list(ALL_TARGETS)
+        else:
+            targets = self.changed_targets(previous["section_hashes"], section_hashes)
+
+        raw_json = dict(previous["raw_json"]) if previous else {}
+
+        if targets:
+            logger.info(f"Re-extracting {targets} for {source_key}")
+            partial = self.extractor.extract_all(content, datasheet_id=datasheet_id,
+                                                 sections=sections, targets=targets)
+            if not partial:
+                return {}
+            for target in targets:
+                if target in partial["raw_json"]:
+                    raw_json[target] = partial["raw_json"][target]
+        else:
+            logger.info(f"No section changes for {source_key}, reusing stored extraction")
+
+        self.store(source_key, content, sections, raw_json, datasheet_id, section_hashes)
+
+        result = self.extractor.build_result(raw_json, datasheet_id)
+        result["reextracted"] = targets
+        result["reused_from"] = base_key if previous else None
+        return result
+
+    def _near_duplicate(self, source_key: str, content: str,
+                        sections: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        try:
+            return self.duplicates.best_reusable(sections, content, exclude=source_key)
+        except Exception as e:
+            # Detection only saves LLM calls; extraction proceeds without it
+            logger.warning(f"Near-duplicate lookup failed for {source_key}: {e}")
+            return None
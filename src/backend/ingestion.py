@@ -1,12 +1,65 @@
 import json
 import re
+import hashlib
 import logging
 from typing import Dict, Any, List, Optional
+from src.telemetry import tracer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Heuristics for common datasheet sections
+SECTION_PATTERNS: Dict[str, List[str]] = {
+    "pin_configuration": [
+        r"(?i)pin\s+configuration",
+        r"(?i)pin\s+functions",
+        r"(?i)pin\s+description",
+        r"(?i)terminal\s+configuration",
+        r"(?i)pinout"
+    ],
+    "package_dimensions": [
+        r"(?i)package\s+dimensions",
+        r"(?i)mechanical\s+data",
+        r"(?i)package\s+outline",
+        r"(?i)dimensions",
+        r"(?i)physical\s+dimensions"
+    ],
+    "ordering_information": [
+        r"(?i)ordering\s+information",
+        r"(?i)device\s+ordering",
+        r"(?i)order\s+codes"
+    ],
+    "electrical_characteristics": [
+        r"(?i)electrical\s+characteristics",
+        r"(?i)specifications",
+        r"(?i)dc\s+characteristics",
+        r"(?i)ac\s+characteristics"
+    ],
+    "description": [
+        r"(?i)description",
+        r"(?i)general\s+description",
+        r"(?i)overview"
+    ],
+    "features": [
+        r"(?i)features",
+        r"(?i)key\s+features"
+    ]
+}
+
+# Sections the extraction prompt only reads the start of; hashing the same
+# prefix keeps edits past it from triggering a pointless re-extraction
+SECTION_CHAR_LIMITS: Dict[str, int] = {
+    "preamble": 2000,
+}
+
+
+def truncate_section(key: str, text: str) -> str:
+    """The part of a section the extraction prompt sees."""
+    limit = SECTION_CHAR_LIMITS.get(key)
+    return text[:limit] if limit is not None else text
+
+
 class IngestionEngine:
     """
     Engine for parsing MinerU output and identifying key sections.
@@ -26,13 +79,16 @@ class IngestionEngine:
             Dict[str, Any]: A dictionary containing the parsed content and identified sections.
         """
         logger.info(f"Processing file: {file_path}")
-        
-        if file_path.endswith('.json'):
-            return self._process_json(file_path)
-        elif file_path.endswith('.md'):
-            return self._process_markdown(file_path)
-        else:
-            raise ValueError(f"Unsupported file format: {file_path}")
+
+        with tracer.span("ingestion", path=file_path) as span:
+            if file_path.endswith('.json'):
+                result = self._process_json(file_path)
+            elif file_path.endswith('.md'):
+                result = self._process_markdown(file_path)
+            else:
+                raise ValueError(f"Unsupported file format: {file_path}")
+            span.set("sections", len(result.get("sections", {})))
+            return result
 
     def _process_json(self, file_path: str) -> Dict[str, Any]:
         with open(file_path, 'r', encoding='utf-8') as f:
@@ -45,58 +101,45 @@ class IngestionEngine:
     def _process_markdown(self, file_path: str) -> Dict[str, Any]:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
-            
+        return self.process_text(content)
+
+    def process_text(self, content: str) -> Dict[str, Any]:
+        """
+        Identify sections in plain text, e.g. the pages kept by PageRelevanceFilter
+        when no MinerU output exists yet.
+
+        Returns:
+            Dict[str, Any]: Same shape as process_file for Markdown.
+        """
         sections = self._identify_sections(content)
-        
+
         return {
             "content": content,
-            "sections": sections
+            "sections": sections,
+            "section_hashes": self.compute_section_hashes(sections)
         }
 
+    def compute_section_hashes(self, sections: Dict[str, str]) -> Dict[str, str]:
+        """
+        Compute a content hash per section so re-ingested revisions can be diffed.
+
+        Only the text the extraction prompt sees is hashed (see SECTION_CHAR_LIMITS).
+        Whitespace is normalized first; MinerU re-runs often differ only in
+        blank lines and trailing spaces.
+        """
+        hashes = {}
+        for key, text in sections.items():
+            text = truncate_section(key, text)
+            normalized = "\n".join(line.strip() for line in text.split('\n') if line.strip())
+            hashes[key] = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        return hashes
+
     def _identify_sections(self, content: str) -> Dict[str, str]:
         """
         Identify key sections using heuristics (regex/keywords).
         """
         sections = {}
         
-        # Heuristics for common datasheet sections
-        patterns = {
-            "pin_configuration": [
-                r"(?i)pin\s+configuration",
-                r"(?i)pin\s+functions",
-                r"(?i)pin\s+description",
-                r"(?i)terminal\s+configuration",
-                r"(?i)pinout"
-            ],
-            "package_dimensions": [
-                r"(?i)package\s+dimensions",
-                r"(?i)mechanical\s+data",
-                r"(?i)package\s+outline",
-                r"(?i)dimensions",
-                r"(?i)physical\s+dimensions"
-            ],
-            "ordering_information": [
-                r"(?i)ordering\s+information",
-                r"(?i)device\s+ordering",
-                r"(?i)order\s+codes"
-            ],
-            "electrical_characteristics": [
-                r"(?i)electrical\s+characteristics",
-                r"(?i)specifications",
-                r"(?i)dc\s+characteristics",
-                r"(?i)ac\s+characteristics"
-            ],
-            "description": [
-                r"(?i)description",
-                r"(?i)general\s+description",
-                r"(?i)overview"
-            ],
-            "features": [
-                r"(?i)features",
-                r"(?i)key\s+features"
-            ]
-        }
-        
         lines = content.split('\n')
         current_section = "preamble"
         buffer = []
@@ -120,7 +163,7 @@ class IngestionEngine:
                 
                 # Check if header matches any known pattern
                 found_match = False
-                for key, regex_list in patterns.items():
+                for key, regex_list in SECTION_PATTERNS.items():
                     for pattern in regex_list:
                         if re.search(pattern, header_text):
                             new_section_key = key
@@ -0,0 +1,124 @@
+import re
+import json
+from typing import Any, Iterator, List, Optional, Tuple
+
+_FENCE_RE = re.compile(r"```[a-zA-Z]*[ \t]*\n?(.*?)(?:```|\Z)", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+
+# Truncation cut points tried before giving up; each costs one json.loads
+MAX_CUT_ATTEMPTS = 8
+
+
+def strip_code_fences(text: str) -> str:
+    """Returns the body of the first Markdown code fence, or the text unchanged."""
+    match = _FENCE_RE.search(text)
+    return match.group(1) if match else text
+
+
+def repair_json(text: Optional[str]) -> Optional[Any]:
+    """
+    Best-effort local repair of malformed LLM JSON output.
+
+    Handles the failure modes seen from vLLM in practice: code fences and
+    prose around the payload, trailing commas, and output cut off mid-string
+    or mid-array. Truncated documents are closed at the last complete value,
+    so the result may be missing trailing items.
+
+    Args:
+        text: Raw model output.
+
+    Returns:
+        The parsed value, or None if the text could not be repaired.
+    """
+    if not text:
+        return None
+    body = strip_code_fences(text)
+    start = min((i for i in (body.find("{"), body.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return None
+
+    for candidate in _candidates(body[start:]):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def _candidates(text: str) -> Iterator[str]:
+    """
+    Yields repaired versions of `text`, most complete first.
+
+    A single scan drops trailing commas, stops after the root value closes,
+    and records cut points after the root bracket and each complete member,
+    together with the brackets still open at that point. Objects inside
+    arrays (table rows such as pins) are kept whole or dropped, never cut.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    cuts: List[Tuple[int, str]] = []
+    in_string = escaped = False
+    pending_comma = False
+
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch in " \t\r\n":
+            if not pending_comma:
+                out.append(ch)
+            continue
+        if ch == ",":
+            if pending_comma:
+                continue
+            if not _in_record(stack):
+                cuts.append((len(out), "".join(reversed(stack))))
+            pending_comma = True
+            continue
+        if pending_comma:
+            # Trailing commas before a closing bracket are dropped
+            if ch not in "}]":
+                out.append(",")
+            pending_comma = False
+
+        if ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+            out.append(ch)
+            if len(stack) == 1:
+                # An empty root beats nothing; empty nested members are never useful
+                cuts.append((len(out), stack[0]))
+            continue
+        elif ch in "}]":
+            if not stack or stack[-1] != ch:
+                break
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                yield "".join(out)
+                return
+            if not _in_record(stack):
+                cuts.append((len(out), "".join(reversed(stack))))
+            continue
+        elif ch == '"':
+            in_string = True
+        out.append(ch)
+
+    # Truncated: close everything still open, then back off to earlier cut points
+    tail = "".join(out)
+    if in_string:
+        # A dangling backslash would escape the closing quote
+        tail = (tail[:-1] if escaped else tail) + '"'
+    yield tail.rstrip() + "".join(reversed(stack))
+    for pos, closers in reversed(cuts[-MAX_CUT_ATTEMPTS:]):
+        yield "".join(out[:pos]).rstrip() + closers
+
+
+def _in_record(stack: List[str]) -> bool:
+    return len(stack) >= 2 and stack[-1] == "}" and stack[-2] == "]"
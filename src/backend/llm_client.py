@@ -1,8 +1,38 @@
 import os
 import json
+import time
+import random
 import logging
-from typing import Dict, Any, Optional, Union
-from openai import OpenAI, APIConnectionError, APIStatusError
+from contextlib import nullcontext
+from typing import Dict, Any, List, Optional, Tuple, Union
+from src.lazy_import import lazy_import
+from src.backend.json_repair import repair_json
+from src.backend.concurrency import AdaptiveLimiter
+from src.telemetry import tracer, metrics
+
+# The OpenAI SDK is imported when the first client is created
+openai = lazy_import("openai")
+OpenAI = lazy_import("openai", "OpenAI")
+
+# 408/409 are retried by the OpenAI SDK too; 429 and 5xx cover vLLM overload and restarts
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# vLLM answers 503 when its waiting queue is full; 429 comes from gateways in front of it
+OVERLOAD_STATUS = {429, 503}
+
+STRUCTURED_OUTPUT_MODES = ("response_format", "guided_json")
+
+def is_transient_error(error: Exception) -> bool:
+    """True for failures worth retrying: connection errors, timeouts, 429 and 5xx."""
+    if isinstance(error, openai.APIConnectionError):  # includes timeouts
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code in RETRYABLE_STATUS
+
+def is_overload_error(error: BaseException) -> bool:
+    """True for failures that mean the server is saturated: 429, 503 and timeouts."""
+    if isinstance(error, openai.APITimeoutError):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code in OVERLOAD_STATUS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,7 +43,10 @@ class LLMClient:
     Client for communicating with the vLLM service using the OpenAI-compatible API.
     """
 
-    def __init__(self, base_url: str = "http://localhost:8000/v1", model_name: str = "Qwen/Qwen2.5-Coder-32B-Instruct", api_key: str = "sk-antigravity"):
+    def __init__(self, base_url: str = "http://localhost:8000/v1", model_name: str = "Qwen/Qwen2.5-Coder-32B-Instruct", api_key: str = "sk-antigravity",
+                 stream: bool = False, max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 max_continuations: int = 1, max_reprompts: int = 1, structured_output: str = "response_format",
+                 adaptive_concurrency: bool = False):
         """
         Initialize the LLM client.
 
@@ -21,28 +54,60 @@ class LLMClient:
             base_url (str): The base URL of the vLLM service.
             model_name (str): The name of the model to use.
             api_key (str): The API key (dummy key for vLLM usually).
+            stream (bool): Stream responses, which lets time-to-first-token be measured.
+            max_retries (int): Retries per request for transient errors.
+            backoff_base (float): First backoff ceiling in seconds; doubles per retry.
+            backoff_max (float): Upper bound on a single backoff in seconds.
+            max_continuations (int): "Continue the JSON" requests for a truncated reply.
+            max_reprompts (int): Full re-prompts when the JSON cannot be recovered.
+            structured_output (str): How a JSON schema is sent: 'response_format' (OpenAI-style
+                json_schema, vLLM >= 0.6) or 'guided_json' (vLLM extra parameter, older servers).
+            adaptive_concurrency (bool): Limit in-flight requests with an AdaptiveLimiter that
+                grows while latency is stable and backs off on latency spikes or 429/503.
+                Tune it by replacing `client.limiter`.
         """
+        if structured_output not in STRUCTURED_OUTPUT_MODES:
+            raise ValueError(f"Unknown structured output mode: {structured_output}")
         self.base_url = base_url
         self.model_name = model_name
+        self.stream = stream
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_continuations = max_continuations
+        self.max_reprompts = max_reprompts
+        self.structured_output = structured_output
+        self.limiter = AdaptiveLimiter(is_overload=is_overload_error, name=base_url) if adaptive_concurrency else None
+        # Retries are handled here so they are bounded, jittered and counted
         self.client = OpenAI(
             base_url=base_url,
             api_key=api_key,
+            max_retries=0,
         )
         logger.info(f"LLMClient initialized with base_url={base_url}, model={model_name}")
 
-    def generate(self, prompt: str, system_prompt: str = None, json_mode: bool = True, temperature: float = 0.1) -> Union[Dict[str, Any], str]:
+    def generate(self, prompt: str, system_prompt: str = None, json_mode: bool = True, temperature: float = 0.1,
+                 json_schema: Optional[Dict[str, Any]] = None) -> Union[Dict[str, Any], str]:
         """
         Generate a response from the LLM.
 
+        Transient failures (connection errors, timeouts, 429/5xx) are retried
+        with jittered exponential backoff. Malformed JSON is recovered, cheapest
+        first: a local repair pass, then for truncated output a continuation
+        request for just the missing tail, and only then a full re-prompt.
+
         Args:
             prompt (str): The user prompt.
             system_prompt (str, optional): The system prompt. Defaults to a generic helpful assistant prompt if None.
             json_mode (bool): Whether to enforce JSON output. Defaults to True.
             temperature (float): Sampling temperature. Defaults to 0.1 for deterministic output.
+            json_schema (Dict[str, Any], optional): Constrain the output to this JSON Schema
+                with vLLM guided decoding. Implies json_mode.
 
         Returns:
             Union[Dict[str, Any], str]: The parsed JSON response or the raw string response.
         """
+        queued_at = time.perf_counter()
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
@@ -52,38 +117,190 @@ class LLMClient:
         messages.append({"role": "user", "content": prompt})
 
         response_format = {"type": "json_object"} if json_mode else None
+        extra_body = None
+        if json_schema is not None:
+            json_mode = True
+            if self.structured_output == "guided_json":
+                extra_body = {"guided_json": json_schema}
+            else:
+                response_format = {"type": "json_schema",
+                                   "json_schema": {"name": json_schema.get("title", "response"), "schema": json_schema}}
 
-        try:
-            logger.debug(f"Sending request to LLM: {messages}")
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                temperature=temperature,
-                response_format=response_format,
+        if not json_mode:
+            content, _ = self._complete(messages, temperature, response_format, queued_at)
+            return content
+
+        for attempt in range(self.max_reprompts + 1):
+            if attempt:
+                metrics.inc("llm_json_recoveries_total", help="Malformed JSON responses recovered, by method",
+                            method="reprompt")
+                logger.warning(f"Re-prompting after unrecoverable JSON output ({attempt}/{self.max_reprompts})")
+            content, finish_reason = self._complete(messages, temperature, response_format,
+                                                    queued_at if attempt == 0 else None, extra_body)
+            result = self._recover_json(messages, temperature, content, finish_reason)
+            if result is not None:
+                return result
+
+        logger.error(f"Failed to parse JSON response. Content: {content}")
+        return {"error": "JSONDecodeError", "raw_content": content}
+
+    def _recover_json(self, messages: List[Dict[str, str]], temperature: float, content: Optional[str],
+                      finish_reason: Optional[str]) -> Optional[Any]:
+        """Parses `content`, repairing or continuing it if needed. Returns None on failure."""
+        truncated = finish_reason == "length"
+        with tracer.span("json_parse", chars=len(content or ""), truncated=truncated) as span:
+            try:
+                return json.loads(content)
+            except (json.JSONDecodeError, TypeError):
+                pass
+            # Repairing a truncated reply would silently drop its tail; continue it first
+            if not truncated:
+                repaired = repair_json(content)
+                if repaired is not None:
+                    span.set("recovery", "repair")
+                    metrics.inc("llm_json_recoveries_total", help="Malformed JSON responses recovered, by method",
+                                method="repair")
+                    return repaired
+
+        if not truncated:
+            return None
+
+        for _ in range(self.max_continuations):
+            tail, finish_reason = self._complete(
+                messages + [{"role": "assistant", "content": content}], temperature, None,
+                extra_body={"continue_final_message": True, "add_generation_prompt": False},
             )
-            
-            content = response.choices[0].message.content
-            logger.debug(f"Received response from LLM: {content}")
-
-            if json_mode:
-                try:
-                    return json.loads(content)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse JSON response: {e}. Content: {content}")
-                    # Attempt to repair or return raw content if parsing fails? 
-                    # For now, raise or return raw to let caller handle.
-                    # Let's return a dictionary with error info to be safe.
-                    return {"error": "JSONDecodeError", "raw_content": content}
-            else:
-                return content
-
-        except APIConnectionError as e:
-            logger.error(f"The server could not be reached: {e.__cause__}")
-            raise
-        except APIStatusError as e:
-            logger.error(f"Another non-200-range status code was received: {e.status_code}")
-            logger.error(e.response)
-            raise
-        except Exception as e:
-            logger.error(f"An unexpected error occurred: {e}")
-            raise
+            content += tail or ""
+            try:
+                result = json.loads(content)
+            except json.JSONDecodeError:
+                if finish_reason == "length":
+                    continue
+                result = repair_json(content)
+            if result is not None:
+                metrics.inc("llm_json_recoveries_total", help="Malformed JSON responses recovered, by method",
+                            method="continuation")
+                return result
+            break
+
+        # Still cut off: keep the complete members rather than re-prompting into the same limit
+        repaired = repair_json(content)
+        if repaired is not None:
+            logger.warning("LLM output truncated; using the complete part of the JSON")
+            metrics.inc("llm_json_recoveries_total", help="Malformed JSON responses recovered, by method",
+                        method="truncated")
+        return repaired
+
+    def _complete(self, messages: List[Dict[str, str]], temperature: float, response_format: Optional[Dict[str, str]],
+                  queued_at: Optional[float] = None, extra_body: Optional[Dict[str, Any]] = None) -> Tuple[str, Optional[str]]:
+        """Sends one completion request, retrying transient errors. Returns (content, finish_reason)."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.limiter.acquire() if self.limiter else nullcontext():
+                    return self._request(messages, temperature, response_format, queued_at, extra_body)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient_error(e):
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                metrics.inc("llm_retries_total", help="LLM requests retried after transient errors",
+                            reason=type(e).__name__)
+                logger.warning(f"Transient LLM error ({type(e).__name__}); retrying in {delay:.2f}s "
+                               f"({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+                queued_at = None
+
+    def _request(self, messages, temperature, response_format, queued_at, extra_body):
+        with tracer.span("llm_request", model=self.model_name, stream=self.stream) as span:
+            try:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Sending request to LLM: {messages}")
+                sent_at = time.perf_counter()
+                if queued_at is not None:
+                    queue_seconds = sent_at - queued_at
+                    span.set("queue_seconds", queue_seconds)
+                    metrics.observe("llm_queue_seconds", queue_seconds,
+                                    help="Time between generate() and dispatching the request, including limiter waits")
+
+                kwargs = {"extra_body": extra_body} if extra_body else {}
+                if self.stream:
+                    content, finish_reason, usage = self._create_streaming(
+                        messages, temperature, response_format, sent_at, span, **kwargs)
+                else:
+                    response = self.client.chat.completions.create(
+                        model=self.model_name,
+                        messages=messages,
+                        temperature=temperature,
+                        response_format=response_format,
+                        **kwargs,
+                    )
+                    content = response.choices[0].message.content
+                    finish_reason = response.choices[0].finish_reason
+                    usage = getattr(response, "usage", None)
+
+                self._record_usage(span, usage)
+                span.set("finish_reason", finish_reason)
+                metrics.inc("llm_requests_total", help="LLM requests by outcome", status="ok")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Received response from LLM: {content}")
+                return content, finish_reason
+
+            except openai.APIConnectionError as e:
+                metrics.inc("llm_requests_total", help="LLM requests by outcome", status="connection_error")
+                logger.error(f"The server could not be reached: {e.__cause__}")
+                raise
+            except openai.APIStatusError as e:
+                metrics.inc("llm_requests_total", help="LLM requests by outcome", status=str(e.status_code))
+                logger.error(f"Another non-200-range status code was received: {e.status_code}")
+                logger.error(e.response)
+                raise
+            except Exception as e:
+                metrics.inc("llm_requests_total", help="LLM requests by outcome", status="error")
+                logger.error(f"An unexpected error occurred: {e}")
+                raise
+
+    def _create_streaming(self, messages, temperature, response_format, sent_at, span, **kwargs):
+        stream = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            temperature=temperature,
+            response_format=response_format,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs,
+        )
+        parts = []
+        finish_reason = None
+        usage = None
+        for chunk in stream:
+            if chunk.choices:
+                choice = chunk.choices[0]
+                if choice.delta.content:
+                    if not parts:
+                        ttft = time.perf_counter() - sent_at
+                        span.set("ttft_seconds", ttft)
+                        metrics.observe("llm_ttft_seconds", ttft, help="Time to first streamed token")
+                    parts.append(choice.delta.content)
+                finish_reason = choice.finish_reason or finish_reason
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+        return "".join(parts), finish_reason, usage
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, stretched to honour a server Retry-After."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        response = getattr(error, "response", None)
+        try:
+            retry_after = float(response.headers.get("retry-after"))
+        except (AttributeError, TypeError, ValueError):
+            return delay
+        return max(delay, min(retry_after, self.backoff_max))
+
+    def _record_usage(self, span, usage) -> None:
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if isinstance(prompt_tokens, int):
+            span.set("prompt_tokens", prompt_tokens)
+            metrics.inc("llm_prompt_tokens_total", prompt_tokens, help="Prompt tokens sent")
+        if isinstance(completion_tokens, int):
+            span.set("completion_tokens", completion_tokens)
+            metrics.inc("llm_completion_tokens_total", completion_tokens, help="Completion tokens received")
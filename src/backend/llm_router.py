@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import logging
+import threading
+import urllib.request
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Union
+import numpy as np
+from src.backend.llm_client import LLMClient, is_transient_error
+from src.telemetry import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://localhost:8000/v1"
+DEFAULT_MODEL = "Qwen/Qwen2.5-Coder-32B-Instruct"
+
+# Latency samples kept per endpoint for percentiles
+LATENCY_WINDOW = 256
+
+# Weight of the newest sample in the latency moving average
+EWMA_ALPHA = 0.2
+
+
+class Endpoint:
+    """One vLLM replica and its dispatch state. Mutated under the router lock."""
+
+    def __init__(self, base_url: str, client: LLMClient):
+        self.base_url = base_url
+        self.client = client
+        self.outstanding = 0
+        self.healthy = True
+        self.ejected_at: Optional[float] = None
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.errors = 0
+        self.ejections = 0
+        self.ewma_latency: Optional[float] = None
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "base_url": self.base_url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "ejections": self.ejections,
+        }
+        if self.latencies:
+            samples = np.array(self.latencies) * 1000.0
+            p50, p95 = np.percentile(samples, [50, 95])
+            stats.update(latency_mean_ms=round(float(samples.mean()), 2), latency_p50_ms=round(float(p50), 2),
+                         latency_p95_ms=round(float(p95), 2), latency_ewma_ms=round(self.ewma_latency * 1000.0, 2))
+        return stats
+
+
+class LLMRouter:
+    """
+    Spreads LLM requests over several OpenAI-compatible vLLM replicas.
+
+    Requests go to the healthy endpoint with the fewest outstanding requests
+    (ties broken by recent latency). An endpoint that fails
+    `failure_threshold` times in a row with a transient error is ejected.
+    Once `eject_seconds` have passed it is re-admitted when a /v1/models
+    health check passes, or when a trial request succeeds while no other
+    endpoint is healthy.
+    A transient failure fails over to another endpoint, so a single dead
+    replica does not fail the request.
+
+    Has the same `generate()` interface as LLMClient, so it can be passed
+    to ContentExtractor directly.
+    """
+
+    def __init__(self, base_urls: Sequence[str], model_name: str = DEFAULT_MODEL, api_key: str = "sk-antigravity",
+                 failure_threshold: int = 3, eject_seconds: float = 30.0, health_timeout: float = 2.0,
+                 **client_options: Any):
+        """
+        Args:
+            base_urls: One base URL per replica, e.g. 'http://gpu1:8000/v1'.
+            model_name: Model every replica must serve.
+            api_key: API key passed to each replica's client.
+            failure_threshold: Consecutive transient failures before ejection.
+            eject_seconds: Minimum time an ejected endpoint stays out.
+            health_timeout: Timeout for /v1/models health checks.
+            **client_options: Passed to each LLMClient. Defaults to max_retries=1,
+                since failing over to another replica beats backing off on one.
+        """
+        if not base_urls:
+            raise ValueError("LLMRouter needs at least one endpoint")
+        client_options.setdefault("max_retries", 1)
+        self.model_name = model_name
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+        self.health_timeout = health_timeout
+        self.endpoints = [Endpoint(url, LLMClient(base_url=url, model_name=model_name, api_key=api_key,
+                                                  **client_options))
+                          for url in dict.fromkeys(base_urls)]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        logger.info(f"LLMRouter initialized with {len(self.endpoints)} endpoints, model={model_name}")
+
+    def generate(self, prompt: str, system_prompt: str = None, json_mode: bool = True, temperature: float = 0.1,
+                 json_schema: Optional[Dict[str, Any]] = None) -> Union[Dict[str, Any], str]:
+        """
+        Generate a response on the least loaded healthy endpoint.
+
+        Args and return value are those of LLMClient.generate. Non-transient
+        errors (e.g. 400) are raised immediately; transient ones are raised
+        only once every available endpoint has failed.
+        """
+        tried: List[Endpoint] = []
+        last_error: Optional[Exception] = None
+        while True:
+            endpoint = self._acquire(exclude=tried)
+            if endpoint is None:
+                if last_error is not None:
+                    raise last_error
+                raise RuntimeError("No LLM endpoint available")
+            tried.append(endpoint)
+            start = time.perf_counter()
+            try:
+                result = endpoint.client.generate(prompt, system_prompt=system_prompt, json_mode=json_mode,
+                                                  temperature=temperature, json_schema=json_schema)
+            except Exception as e:
+                if not is_transient_error(e):
+                    # A bad request says nothing about the replica's health
+                    self._release_neutral(endpoint)
+                    raise
+                self._release(endpoint, None, failed=True)
+                logger.warning(f"Endpoint {endpoint.base_url} failed ({type(e).__name__}), failing over")
+                last_error = e
+                continue
+            self._release(endpoint, time.perf_counter() - start, failed=False)
+            return result
+
+    def check_health(self) -> Dict[str, bool]:
+        """
+        Probes every endpoint's /v1/models and updates its state.
+
+        Healthy endpoints that fail the probe are ejected. Ejected endpoints
+        that pass are re-admitted once `eject_seconds` have elapsed.
+
+        Returns:
+            Dict[str, bool]: Probe result per base URL.
+        """
+        results = {}
+        for endpoint in self.endpoints:
+            ok = self._probe(endpoint)
+            results[endpoint.base_url] = ok
+            with self._lock:
+                if ok and not endpoint.healthy and self._cooled_down(endpoint):
+                    self._readmit(endpoint)
+                elif not ok and endpoint.healthy:
+                    self._eject(endpoint, "health check failed")
+        return results
+
+    def start_health_checks(self, interval: float = 10.0) -> "LLMRouter":
+        """Runs check_health() every `interval` seconds in a daemon thread."""
+        if self._health_thread is None:
+            self._stop.clear()
+            self._health_thread = threading.Thread(target=self._health_loop, args=(interval,),
+                                                   name="llm-health", daemon=True)
+            self._health_thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._health_thread:
+            self._health_thread.join(timeout=self.health_timeout + 1.0)
+            self._health_thread = None
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-endpoint health, load, error and latency statistics."""
+        with self._lock:
+            return [endpoint.stats() for endpoint in self.endpoints]
+
+    def _health_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.warning(f"Health check failed: {e}")
+
+    def _acquire(self, exclude: List[Endpoint]) -> Optional[Endpoint]:
+        """
+        Picks and reserves the healthy endpoint with the fewest outstanding
+        requests. If none is healthy, an ejected endpoint past its cooldown
+        gets a trial request.
+        """
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude and e.healthy]
+            if not candidates:
+                candidates = [e for e in self.endpoints if e not in exclude and self._cooled_down(e)]
+            if not candidates:
+                return None
+            endpoint = min(candidates, key=lambda e: (e.outstanding, e.ewma_latency or 0.0))
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            self._publish(endpoint)
+            return endpoint
+
+    def _release(self, endpoint: Endpoint, latency: Optional[float], failed: bool) -> None:
+        with self._lock:
+            endpoint.outstanding -= 1
+            if failed:
+                endpoint.errors += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.healthy and endpoint.consecutive_failures >= self.failure_threshold:
+                    self._eject(endpoint, f"{endpoint.consecutive_failures} consecutive failures")
+                elif not endpoint.healthy:
+                    # Failed trial request: restart the cooldown
+                    endpoint.ejected_at = time.monotonic()
+            else:
+                endpoint.consecutive_failures = 0
+                if latency is not None:
+                    endpoint.latencies.append(latency)
+                    endpoint.ewma_latency = latency if endpoint.ewma_latency is None else \
+                        EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * endpoint.ewma_latency
+                    metrics.observe("llm_endpoint_latency_seconds", latency,
+                                    help="LLM request latency per endpoint", endpoint=endpoint.base_url)
+                if not endpoint.healthy:
+                    self._readmit(endpoint)
+            self._publish(endpoint)
+
+    def _release_neutral(self, endpoint: Endpoint) -> None:
+        """Frees the slot after a non-transient error: neither a failure nor a success."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.errors += 1
+            self._publish(endpoint)
+
+    def _probe(self, endpoint: Endpoint) -> bool:
+        try:
+            with urllib.request.urlopen(endpoint.base_url.rstrip('/') + "/models", timeout=self.health_timeout) as r:
+                models = json.loads(r.read()).get("data", [])
+        except Exception as e:
+            logger.debug(f"Health check of {endpoint.base_url} failed: {e}")
+            return False
+        # A replica serving a different model cannot take our requests
+        return any(m.get("id") == self.model_name for m in models)
+
+    def _cooled_down(self, endpoint: Endpoint) -> bool:
+        return endpoint.ejected_at is None or time.monotonic() - endpoint.ejected_at >= self.eject_seconds
+
+    def _eject(self, endpoint: Endpoint, reason: str) -> None:
+        endpoint.healthy = False
+        endpoint.ejected_at = time.monotonic()
+        endpoint.ejections += 1
+        metrics.inc("llm_endpoint_ejections_total", help="Endpoints ejected from the LLM pool",
+                    endpoint=endpoint.base_url)
+        logger.warning(f"Ejecting LLM endpoint {endpoint.base_url}: {reason}")
+
+    def _readmit(self, endpoint: Endpoint) -> None:
+        endpoint.healthy = True
+        endpoint.ejected_at = None
+        endpoint.consecutive_failures = 0
+        logger.info(f"Re-admitting LLM endpoint {endpoint.base_url}")
+
+    def _publish(self, endpoint: Endpoint) -> None:
+        metrics.set_gauge("llm_endpoint_outstanding", endpoint.outstanding,
+                          help="In-flight requests per LLM endpoint", endpoint=endpoint.base_url)
+        metrics.set_gauge("llm_endpoint_healthy", int(endpoint.healthy),
+                          help="1 if the LLM endpoint is in the pool", endpoint=endpoint.base_url)
+
+
+def client_from_env(url_var: str = "LLM_BASE_URL", model_var: str = "LLM_MODEL",
+                    **options: Any) -> Union[LLMClient, LLMRouter]:
+    """
+    Builds the LLM client from LLM_BASE_URL and LLM_MODEL.
+
+    LLM_BASE_URL may list several replicas separated by commas, in which
+    case an LLMRouter over all of them is returned.
+    """
+    base_urls = [u.strip() for u in os.getenv(url_var, DEFAULT_BASE_URL).split(",") if u.strip()]
+    model_name = os.getenv(model_var, DEFAULT_MODEL)
+    if len(base_urls) > 1:
+        return LLMRouter(base_urls, model_name=model_name, **options)
+    return LLMClient(base_url=base_urls[0] if base_urls else DEFAULT_BASE_URL, model_name=model_name, **options)
+
+
+def fast_client_from_env(**options: Any) -> Optional[Union[LLMClient, LLMRouter]]:
+    """
+    Builds the small-model client for the extraction cascade.
+
+    Enabled by LLM_FAST_MODEL. LLM_FAST_BASE_URL defaults to LLM_BASE_URL,
+    for servers that serve both models.
+
+    Returns:
+        The client, or None when no fast model is configured.
+    """
+    if not os.getenv("LLM_FAST_MODEL"):
+        return None
+    url_var = "LLM_FAST_BASE_URL" if os.getenv("LLM_FAST_BASE_URL") else "LLM_BASE_URL"
+    return client_from_env(url_var, "LLM_FAST_MODEL", **options)
@@ -0,0 +1,261 @@
+import re
+import zlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from src.database.db_manager import DBManager
+from src.telemetry import metrics
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_WORD_RE = re.compile(r"\w+")
+
+# Shingles hashed per vectorized block; bounds the (num_perm x block) temporary
+_SHINGLE_BLOCK = 4096
+
+
+def document_text(sections: Optional[Dict[str, str]], content: str = "") -> str:
+    """Text a document is fingerprinted by: its sections in a fixed order, or the raw content."""
+    if sections:
+        return "\n".join(sections[key] for key in sorted(sections))
+    return content or ""
+
+
+class MinHasher:
+    """
+    MinHash signatures of word shingles.
+
+    The fraction of equal signature slots between two documents estimates
+    the Jaccard similarity of their shingle sets. Hash parameters depend only
+    on `seed`, so signatures stored in the database stay comparable across runs.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Below 2**32 so a * x + b cannot overflow uint64 for 32-bit x
+        self._a = rng.integers(1, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+
+    def shingle_hashes(self, text: str) -> np.ndarray:
+        words = _WORD_RE.findall(text.lower())
+        k = min(self.shingle_size, len(words)) or 1
+        shingles = {" ".join(words[i:i + k]) for i in range(max(len(words) - k + 1, 0))}
+        return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: `num_perm` uint32 values. Empty text gets the all-max
+            signature, which matches only other empty documents.
+        """
+        hashes = self.shingle_hashes(text)
+        signature = np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        for start in range(0, len(hashes), _SHINGLE_BLOCK):
+            block = hashes[start:start + _SHINGLE_BLOCK]
+            permuted = (self._a * block + self._b) % _MERSENNE_PRIME & _MAX_HASH
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        return signature.astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """
+    Locality-sensitive hashing index over MinHash signatures.
+
+    Each signature is cut into `bands` bands; documents sharing any band hash
+    become candidates and are then ranked by estimated Jaccard similarity.
+    With 16 bands of 8 rows, pairs at 0.8 similarity are found with ~95%
+    probability and pairs below 0.5 rarely become candidates.
+
+    Memory is flat numpy arrays rather than Python objects: the signature
+    matrix plus one sorted (hash, id) array pair per band, about 700 bytes per
+    document at 128 permutations, or ~70 MB for a 100k-document library.
+    New documents go to a small unsorted buffer that is merged into the
+    sorted arrays once it exceeds a quarter of the index, so inserts stay
+    cheap and lookups stay binary searches.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.8):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.keys: List[Optional[str]] = []
+        self._ids: Dict[str, int] = {}
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._sorted_hashes = [np.empty(0, dtype=np.uint64) for _ in range(bands)]
+        self._sorted_ids = [np.empty(0, dtype=np.int32) for _ in range(bands)]
+        self._pending_hashes = np.empty((0, bands), dtype=np.uint64)
+        self._pending_ids: List[int] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids
+
+    def add(self, key: str, signature: np.ndarray) -> None:
+        """Adds or replaces the signature stored for `key`."""
+        self.add_many([key], np.asarray(signature, dtype=np.uint32)[None, :])
+
+    def add_many(self, keys: Sequence[str], signatures: np.ndarray) -> None:
+        """Bulk insert; used when loading a library from the database."""
+        signatures = np.asarray(signatures, dtype=np.uint32).reshape(len(keys), self.num_perm)
+        with self._lock:
+            first = len(self.keys)
+            self._reserve(first + len(keys))
+            self._signatures[first:first + len(keys)] = signatures
+            for offset, key in enumerate(keys):
+                # A replaced document keeps its old rows but its key no longer points to them
+                if key in self._ids:
+                    self.keys[self._ids[key]] = None
+                self._ids[key] = first + offset
+                self.keys.append(key)
+            self._pending_hashes = np.concatenate([self._pending_hashes, self._band_hashes(signatures)])
+            self._pending_ids.extend(range(first, first + len(keys)))
+            if len(self._pending_ids) > max(256, len(self.keys) // 4):
+                self._merge()
+
+    def query(self, signature: np.ndarray, threshold: Optional[float] = None,
+              exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Finds stored documents similar to `signature`.
+
+        Returns:
+            List[Tuple[str, float]]: (key, estimated Jaccard similarity) at or
+            above `threshold` (default: the index threshold), most similar first.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        signature = np.asarray(signature, dtype=np.uint32)
+        hashes = self._band_hashes(signature[None, :])[0]
+        with self._lock:
+            found = []
+            for band in range(self.bands):
+                sorted_hashes = self._sorted_hashes[band]
+                lo, hi = np.searchsorted(sorted_hashes, hashes[band], side="left"), \
+                    np.searchsorted(sorted_hashes, hashes[band], side="right")
+                found.append(self._sorted_ids[band][lo:hi])
+            if self._pending_ids:
+                matches = (self._pending_hashes == hashes).any(axis=1)
+                found.append(np.asarray(self._pending_ids, dtype=np.int32)[matches])
+            candidates = np.unique(np.concatenate(found))
+            if not len(candidates):
+                return []
+            similarity = (self._signatures[candidates] == signature).mean(axis=1)
+            keys = [self.keys[i] for i in candidates]
+
+        results = [(key, float(s)) for key, s in zip(keys, similarity)
+                   if key is not None and key != exclude and s >= threshold]
+        return sorted(results, key=lambda item: item[1], reverse=True)
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the numpy arrays (excluding the key strings)."""
+        arrays = [self._signatures, self._pending_hashes, *self._sorted_hashes, *self._sorted_ids]
+        return sum(a.nbytes for a in arrays)
+
+    def _reserve(self, size: int) -> None:
+        if size > len(self._signatures):
+            # Grow by a quarter rather than doubling: at 100k documents the slack is what costs memory
+            grown = np.empty((max(size, len(self._signatures) * 5 // 4, 64), self.num_perm), dtype=np.uint32)
+            grown[:len(self.keys)] = self._signatures[:len(self.keys)]
+            self._signatures = grown
+
+    def _merge(self) -> None:
+        ids = np.asarray(self._pending_ids, dtype=np.int32)
+        for band in range(self.bands):
+            hashes = np.concatenate([self._sorted_hashes[band], self._pending_hashes[:, band]])
+            order = np.argsort(hashes, kind="stable")
+            self._sorted_hashes[band] = hashes[order]
+            self._sorted_ids[band] = np.concatenate([self._sorted_ids[band], ids])[order]
+        self._pending_hashes = np.empty((0, self.bands), dtype=np.uint64)
+        self._pending_ids = []
+
+    def _band_hashes(self, signatures: np.ndarray) -> np.ndarray:
+        """(n, num_perm) uint32 -> (n, bands) uint64, one FNV-1a style hash per band."""
+        rows = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        hashes = np.full(rows.shape[:2], np.uint64(0xCBF29CE484222325), dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for row in range(self.rows):
+                hashes = (hashes ^ rows[:, :, row]) * np.uint64(0x100000001B3)
+        return hashes
+
+
+class NearDuplicateDetector:
+    """
+    Finds previously ingested datasheets that are near-duplicates of a new one.
+
+    Signatures are stored in the `document_signatures` table and loaded into
+    a NearDuplicateIndex on first use, so a republished datasheet (new cover
+    page, revision date or disclaimer) can reuse the stored extraction of its
+    earlier version instead of going through the LLM again.
+    """
+
+    def __init__(self, db_manager: DBManager, threshold: float = 0.8, hasher: Optional[MinHasher] = None,
+                 bands: int = 16):
+        self.db = db_manager
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher()
+        self.bands = bands
+        self._index: Optional[NearDuplicateIndex] = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def index(self) -> NearDuplicateIndex:
+        with self._load_lock:
+            if self._index is None:
+                self._index = self._load()
+            return self._index
+
+    def find(self, sections: Optional[Dict[str, str]], content: str = "",
+             exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Near-duplicates of a document, most similar first.
+
+        Args:
+            sections: Sections from IngestionEngine.
+            content: Raw text, used when no sections were identified.
+            exclude: Key of the document itself, when it is already registered.
+
+        Returns:
+            List[Dict[str, Any]]: 'source_key', 'similarity' and 'has_extraction'
+            (whether a stored extraction can be reused) per match.
+        """
+        signature = self.hasher.signature(document_text(sections, content))
+        matches = []
+        for key, similarity in self.index.query(signature, self.threshold, exclude=exclude):
+            matches.append({
+                "source_key": key,
+                "similarity": round(similarity, 3),
+                "has_extraction": self.db.get_latest_extraction(key) is not None,
+            })
+        metrics.inc("near_duplicate_lookups_total", help="Near-duplicate lookups by outcome",
+                    outcome="match" if matches else "none")
+        return matches
+
+    def best_reusable(self, sections: Optional[Dict[str, str]], content: str = "",
+                      exclude: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The most similar near-duplicate that has a stored extraction, if any."""
+        return next((m for m in self.find(sections, content, exclude) if m["has_extraction"]), None)
+
+    def register(self, source_key: str, sections: Optional[Dict[str, str]], content: str = "") -> None:
+        """Stores and indexes the signature of an ingested document."""
+        signature = self.hasher.signature(document_text(sections, content))
+        self.db.save_document_signature(source_key, signature.tobytes())
+        self.index.add(source_key, signature)
+
+    def _load(self) -> NearDuplicateIndex:
+        index = NearDuplicateIndex(num_perm=self.hasher.num_perm, bands=self.bands, threshold=self.threshold)
+        rows = self.db.get_document_signatures()
+        if rows:
+            keys = [row["source_key"] for row in rows]
+            signatures = np.frombuffer(b"".join(row["signature"] for row in rows), dtype=np.uint32)
+            index.add_many(keys, signatures.reshape(len(rows), self.hasher.num_perm))
+            logger.info(f"Loaded {len(rows)} document signatures for near-duplicate detection")
+        return index
@@ -0,0 +1,370 @@
+import os
+import re
+import argparse
+import logging
+from typing import Dict, Any, List, Optional, Iterable, Sequence
+
+from src.backend.ingestion import SECTION_PATTERNS
+from src.lazy_import import lazy_import, is_available
+
+fitz = lazy_import("fitz")  # PyMuPDF, loaded on first use
+HAS_FITZ = is_available("fitz")
+
+logger = logging.getLogger(__name__)
+
+PAGE_FILTER_ENV = "PAGE_FILTER"
+PAGE_FILTER_MAX_PAGES_ENV = "PAGE_FILTER_MAX_PAGES"
+
+# Sections whose content feeds the extractor (see ContentExtractor.extract_all)
+DEFAULT_TARGET_SECTIONS = (
+    "pin_configuration",
+    "package_dimensions",
+    "ordering_information",
+    "description",
+    "features",
+)
+
+# Body keywords that show up on pin tables and mechanical drawings even when
+# the page has no recognizable section heading (e.g. continuation pages).
+KEYWORD_PATTERNS: Dict[str, List[str]] = {
+    "pin_configuration": [
+        r"(?i)\bpin\s*(?:no\.?|number|name)\b",
+        r"(?i)\b(?:vdd|vcc|vss|gnd|nc)\b",
+        r"(?i)\bi/o\b",
+    ],
+    "package_dimensions": [
+        r"(?i)\bmm\b",
+        r"(?i)\b(?:min|nom|max)\b",
+        r"(?i)\bpitch\b",
+        r"(?i)\b(?:land\s+pattern|footprint)\b",
+    ],
+}
+
+# Register maps make up most of a large MCU datasheet and never contain
+# anything the extractor needs.
+PENALTY_PATTERNS = [
+    r"(?i)\bregister\b",
+    r"(?i)\breset\s+value\b",
+    r"(?i)\boffset\s*:?\s*0x[0-9a-f]+",
+    r"(?i)\bbits?\s+\d+(?::\d+)?\b",
+    r"(?i)\b(?:rw|r/w|ro|wo)\b",
+]
+
+_NUMERIC_ROW = re.compile(r"^\s*\S+(?:\s+[-+]?\d+(?:\.\d+)?){2,}\s*$")
+
+
+class PageRelevanceFilter:
+    """
+    Ranks datasheet pages by how likely they are to hold extraction targets,
+    so only the top pages are sent through MinerU and the LLM.
+    """
+
+    def __init__(self,
+                 target_sections: Iterable[str] = DEFAULT_TARGET_SECTIONS,
+                 min_score: float = 3.0,
+                 max_pages: Optional[int] = None,
+                 always_keep_first: int = 1,
+                 heading_weight: float = 5.0,
+                 keyword_weight: float = 1.0,
+                 table_weight: float = 2.0,
+                 drawing_weight: float = 2.0,
+                 penalty_weight: float = 1.0):
+        """
+        Initialize the filter.
+
+        Args:
+            target_sections (Iterable[str]): Section keys from SECTION_PATTERNS to look for.
+            min_score (float): Pages scoring below this are pruned.
+            max_pages (int, optional): Upper bound on the number of kept pages.
+            always_keep_first (int): Number of leading pages that are always kept
+                (part number and description usually live on page 1).
+            heading_weight (float): Score per matched section heading.
+            keyword_weight (float): Score per keyword hit per 1000 characters.
+            table_weight (float): Bonus for pages containing a table.
+            drawing_weight (float): Bonus for pages containing vector drawings.
+            penalty_weight (float): Penalty per register-map hit per 1000 characters.
+        """
+        self.target_sections = list(target_sections)
+        self.min_score = min_score
+        self.max_pages = max_pages
+        self.always_keep_first = always_keep_first
+        self.heading_weight = heading_weight
+        self.keyword_weight = keyword_weight
+        self.table_weight = table_weight
+        self.drawing_weight = drawing_weight
+        self.penalty_weight = penalty_weight
+
+        self._heading_patterns = {
+            key: [re.compile(p) for p in SECTION_PATTERNS.get(key, [])]
+            for key in self.target_sections
+        }
+        self._keyword_patterns = [
+            re.compile(p)
+            for key in self.target_sections
+            for p in KEYWORD_PATTERNS.get(key, [])
+        ]
+        self._penalty_patterns = [re.compile(p) for p in PENALTY_PATTERNS]
+
+    def score_page(self, text: str, has_table: Optional[bool] = None, has_drawing: bool = False) -> Dict[str, Any]:
+        """
+        Score a single page.
+
+        Args:
+            text (str): Plain text of the page.
+            has_table (bool, optional): Whether the page has a table. Detected from the text if None.
+            has_drawing (bool): Whether the page has vector drawings (package outlines).
+
+        Returns:
+            Dict[str, Any]: Score breakdown with 'score', 'sections', 'has_table' and 'has_drawing'.
+        """
+        lines = text.split('\n')
+
+        sections = []
+        for key, regex_list in self._heading_patterns.items():
+            if any(_is_heading(line, regex_list) for line in lines):
+                sections.append(key)
+
+        per_kchar = 1000.0 / max(len(text), 1)
+        keyword_hits = sum(len(p.findall(text)) for p in self._keyword_patterns)
+        penalty_hits = sum(len(p.findall(text)) for p in self._penalty_patterns)
+
+        if has_table is None:
+            has_table = self._detect_table(lines)
+
+        score = self.heading_weight * len(sections)
+        score += self.keyword_weight * min(keyword_hits * per_kchar, 10.0)
+        score -= self.penalty_weight * min(penalty_hits * per_kchar, 10.0)
+        if has_table:
+            score += self.table_weight
+        if has_drawing:
+            score += self.drawing_weight
+
+        return {
+            "score": score,
+            "sections": sections,
+            "has_table": has_table,
+            "has_drawing": has_drawing,
+        }
+
+    def score_pages(self, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Score a list of pages.
+
+        Args:
+            pages (List[Dict[str, Any]]): Pages with a 'text' key and optional
+                'has_table' / 'has_drawing' flags, in document order.
+
+        Returns:
+            List[Dict[str, Any]]: One score breakdown per page, with its 'page' index.
+        """
+        scored = []
+        for i, page in enumerate(pages):
+            result = self.score_page(
+                page.get("text", ""),
+                has_table=page.get("has_table"),
+                has_drawing=page.get("has_drawing", False),
+            )
+            result["page"] = i
+            scored.append(result)
+        return scored
+
+    def select_pages(self, scored: List[Dict[str, Any]]) -> List[int]:
+        """
+        Select the pages to keep.
+
+        Args:
+            scored (List[Dict[str, Any]]): Output of score_pages.
+
+        Returns:
+            List[int]: Kept page indices in document order.
+        """
+        forced = {s["page"] for s in scored if s["page"] < self.always_keep_first}
+        ranked = sorted(
+            (s for s in scored if s["page"] not in forced and s["score"] >= self.min_score),
+            key=lambda s: (-s["score"], s["page"]),
+        )
+        if self.max_pages is not None:
+            ranked = ranked[:max(self.max_pages - len(forced), 0)]
+
+        return sorted(forced | {s["page"] for s in ranked})
+
+    def recall_report(self, scored: List[Dict[str, Any]], selected: List[int],
+                      relevant_pages: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+        """
+        Summarize how much was pruned and how much of the relevant content survived.
+
+        Args:
+            scored (List[Dict[str, Any]]): Output of score_pages.
+            selected (List[int]): Output of select_pages.
+            relevant_pages (Iterable[int], optional): Ground-truth relevant pages. Defaults to
+                the pages on which a target section heading was found.
+
+        Returns:
+            Dict[str, Any]: Totals, overall recall, per-section recall and missed pages.
+        """
+        kept = set(selected)
+        if relevant_pages is None:
+            relevant = {s["page"] for s in scored if s["sections"]}
+        else:
+            relevant = set(relevant_pages)
+
+        section_recall = {}
+        for key in self.target_sections:
+            pages = {s["page"] for s in scored if key in s["sections"]}
+            if pages:
+                section_recall[key] = len(pages & kept) / len(pages)
+
+        total = len(scored)
+        return {
+            "total_pages": total,
+            "kept_pages": len(kept),
+            "pruned_ratio": (total - len(kept)) / total if total else 0.0,
+            "relevant_pages": len(relevant),
+            "recall": len(relevant & kept) / len(relevant) if relevant else 1.0,
+            "section_recall": section_recall,
+            "missed_pages": sorted(relevant - kept),
+        }
+
+    def filter_pdf(self, pdf_path: str, output_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Score a PDF, select the relevant pages and optionally write them to a new PDF
+        that can be handed to MinerU instead of the full document.
+
+        Args:
+            pdf_path (str): Path to the source datasheet.
+            output_path (str, optional): Where to write the reduced PDF.
+
+        Returns:
+            Dict[str, Any]: 'selected' page indices, 'scores', the recall 'report'
+            and 'text', the selected pages with section headings marked up as
+            Markdown for IngestionEngine.process_text.
+        """
+        pages = self.load_pdf_pages(pdf_path)
+        scored = self.score_pages(pages)
+        selected = self.select_pages(scored)
+        report = self.recall_report(scored, selected)
+        logger.info(
+            f"Page filter kept {report['kept_pages']}/{report['total_pages']} pages "
+            f"(recall {report['recall']:.2f}) for {pdf_path}"
+        )
+
+        if output_path:
+            self.write_subset(pdf_path, selected, output_path)
+
+        text = "\n\n".join(headings_to_markdown(pages[i].get("text", "")) for i in selected)
+        return {"selected": selected, "scores": scored, "report": report, "text": text}
+
+    def load_pdf_pages(self, pdf_path: str) -> List[Dict[str, Any]]:
+        """
+        Read page text and drawing presence from a PDF.
+
+        Args:
+            pdf_path (str): Path to the PDF.
+
+        Returns:
+            List[Dict[str, Any]]: One dict per page with 'text' and 'has_drawing'.
+        """
+        if not HAS_FITZ:
+            raise ImportError("PyMuPDF is required to read PDF pages")
+
+        pages = []
+        with fitz.open(pdf_path) as doc:
+            for page in doc:
+                pages.append({
+                    "text": page.get_text(),
+                    "has_drawing": len(page.get_drawings()) > 20,
+                })
+        return pages
+
+    def write_subset(self, pdf_path: str, pages: List[int], output_path: str) -> None:
+        """
+        Write the selected pages of a PDF to a new file.
+
+        Args:
+            pdf_path (str): Path to the source PDF.
+            pages (List[int]): Page indices to keep.
+            output_path (str): Destination path.
+        """
+        if not HAS_FITZ:
+            raise ImportError("PyMuPDF is required to write PDF pages")
+
+        with fitz.open(pdf_path) as doc:
+            doc.select(pages)
+            doc.save(output_path)
+
+    def _detect_table(self, lines: List[str]) -> bool:
+        # Markdown tables from MinerU, numeric rows, or runs of lines with the
+        # same column count in raw PDF text
+        pipe_rows = sum(1 for line in lines if line.count('|') >= 3)
+        numeric_rows = sum(1 for line in lines if _NUMERIC_ROW.match(line))
+        if pipe_rows >= 3 or numeric_rows >= 3:
+            return True
+
+        run, prev_cols = 0, 0
+        for line in lines:
+            cols = len(line.split())
+            run = run + 1 if cols >= 3 and cols == prev_cols else (1 if cols >= 3 else 0)
+            prev_cols = cols
+            if run >= 3:
+                return True
+        return False
+
+
+_ALL_HEADING_PATTERNS = [re.compile(p) for patterns in SECTION_PATTERNS.values() for p in patterns]
+
+
+def _is_heading(line: str, patterns: List[re.Pattern]) -> bool:
+    # Headings are short lines; matching long body lines would turn every
+    # mention of "description" into a section hit.
+    stripped = line.lstrip('#').strip()
+    return bool(stripped) and len(stripped) <= 80 and any(p.search(stripped) for p in patterns)
+
+
+def headings_to_markdown(text: str) -> str:
+    """Prefixes section headings in raw PDF text with '## ' so they split sections like MinerU output."""
+    return "\n".join(
+        f"## {line.strip()}" if not line.lstrip().startswith('#') and _is_heading(line, _ALL_HEADING_PATTERNS)
+        else line
+        for line in text.split('\n')
+    )
+
+
+def page_filter_from_env() -> Optional[PageRelevanceFilter]:
+    """
+    Builds the page filter from PAGE_FILTER and PAGE_FILTER_MAX_PAGES.
+
+    Filtering is on unless PAGE_FILTER is '0', 'false' or 'off'.
+
+    Returns:
+        The filter, or None when disabled.
+    """
+    if os.getenv(PAGE_FILTER_ENV, "1").strip().lower() in ("0", "false", "off"):
+        return None
+    max_pages = os.getenv(PAGE_FILTER_MAX_PAGES_ENV)
+    return PageRelevanceFilter(max_pages=int(max_pages) if max_pages else None)
+
+
+def relevant_pdf_path(pdf_path: str) -> str:
+    """Where the reduced PDF for MinerU is written: 'part.pdf' -> 'part.relevant.pdf'."""
+    return os.path.splitext(pdf_path)[0] + ".relevant.pdf"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Writes the relevant pages of a datasheet to a new PDF to run MinerU on."""
+    parser = argparse.ArgumentParser(description="Keep only the datasheet pages worth sending to MinerU")
+    parser.add_argument("pdf", help="Source datasheet")
+    parser.add_argument("-o", "--output", help="Reduced PDF (default: <name>.relevant.pdf)")
+    parser.add_argument("--max-pages", type=int, help="Upper bound on the number of kept pages")
+    parser.add_argument("--min-score", type=float, default=3.0)
+    args = parser.parse_args(argv)
+
+    page_filter = PageRelevanceFilter(min_score=args.min_score, max_pages=args.max_pages)
+    result = page_filter.filter_pdf(args.pdf, args.output or relevant_pdf_path(args.pdf))
+    report = result["report"]
+    print(f"Kept pages {[i + 1 for i in result['selected']]} of {report['total_pages']} "
+          f"({report['pruned_ratio']:.0%} pruned, recall {report['recall']:.2f})")
+    return result
+
+
+if __name__ == "__main__":
+    main()
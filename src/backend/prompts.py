@@ -0,0 +1,106 @@
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Sequence, Tuple
+
+# vLLM automatic prefix caching hashes the prompt in fixed-size token blocks and
+# reuses KV cache for the longest run of identical leading blocks. Everything
+# that is the same for every extraction therefore goes first, byte for byte,
+# and anything that varies (requested targets, datasheet text) goes last.
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    A versioned extraction prompt.
+
+    `system` and `instructions` together form the shared prefix; they must not
+    depend on the request. Bump `version` whenever either changes so stored
+    extractions and benchmark results can be traced back to the prompt used.
+    """
+    version: str
+    system: str
+    instructions: str
+    request: str = field(default="Extract only: {targets}.\n\nDatasheet Text:\n{context}\n")
+    examples: str = field(default="Verified extractions from similar datasheets. Follow their conventions, "
+                                  "not their values:\n{examples}\n\n")
+
+    @property
+    def prefix(self) -> str:
+        """The user-prompt text shared by every request."""
+        return self.instructions
+
+    def render(self, targets: List[str], context: str, examples: Sequence[str] = ()) -> Tuple[str, str]:
+        """
+        Args:
+            targets: Requested subset of 'component', 'package' and 'pins'.
+            context: Datasheet text for this request.
+            examples: Few-shot example outputs (JSON), placed after the shared prefix.
+
+        Returns:
+            Tuple[str, str]: (system_prompt, user_prompt).
+        """
+        shots = self.examples.format(examples="\n".join(examples)) if examples else ""
+        return self.system, self.prefix + shots + self.request.format(targets=", ".join(targets), context=context)
+
+
+EXTRACTION_V2 = PromptTemplate(
+    version="extraction-v2",
+    system="""You are an expert electronics engineer and data extraction assistant.
+Your task is to extract structured information from a component datasheet.
+Output the data strictly in JSON format.""",
+    instructions="""Extract the requested information from the provided datasheet text.
+
+component - Component Details:
+   - Part Number
+   - Manufacturer
+   - Description
+
+package - Package Details:
+   - Package Name (e.g., SOIC-8, TO-220)
+   - Package Type (e.g., SOIC, DIP, QFN)
+   - Dimensions (width, length, height if available) - approximate or nominal values in mm.
+
+pins - Pin Configuration:
+   - List of pins with:
+     - Pin Number
+     - Pin Name
+     - Electrical Type (Input, Output, Power, Ground, Bidirectional, Passive, etc.)
+     - Description (brief function)
+
+If a value is not found, use null or an empty string.
+Ensure the JSON is valid.
+
+""",
+)
+
+# Names the Package.dimensions keys of the extraction schema instead of 'width, length, height'
+EXTRACTION_V3 = replace(
+    EXTRACTION_V2,
+    version="extraction-v3",
+    instructions=EXTRACTION_V2.instructions.replace(
+        "   - Dimensions (width, length, height if available) - approximate or nominal values in mm.\n",
+        "   - Dimensions in mm where given: body_width (across the leads), body_length, pitch, height, pin_count;\n"
+        "     ball_diameter, rows and columns for BGAs.\n"),
+)
+
+PROMPT_TEMPLATES: Dict[str, PromptTemplate] = {t.version: t for t in (EXTRACTION_V2, EXTRACTION_V3)}
+
+DEFAULT_TEMPLATE = EXTRACTION_V3
+
+
+def get_template(version: str) -> PromptTemplate:
+    """Looks up a registered template by version."""
+    try:
+        return PROMPT_TEMPLATES[version]
+    except KeyError:
+        raise ValueError(f"Unknown prompt template: {version}") from None
+
+
+def common_prefix_length(prompts: List[str]) -> int:
+    """Length of the prefix shared by all `prompts`, in characters."""
+    if not prompts:
+        return 0
+    first, last = min(prompts), max(prompts)
+    for i, (a, b) in enumerate(zip(first, last)):
+        if a != b:
+            return i
+    return len(first)
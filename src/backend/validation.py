@@ -0,0 +1,248 @@
+import re
+import logging
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from src.models.data_models import Component, Package, Pin
+from src.generators.package_names import CHIP_SIZES, parse_package_name
+
+logger = logging.getLogger(__name__)
+
+ERROR = "error"
+WARNING = "warning"
+
+# First <family>-<N> token of a name parse_package_name does not recognise;
+# digits followed by "x" are a body size, not a pin count
+_PIN_TOKEN_RE = re.compile(r"(?<![A-Z0-9])[A-Z]+[-_]?(\d+)(?![\d.]|\s*X\s*\d)")
+
+# Plausible ranges in mm (pin_count and grid sizes are counts)
+DIMENSION_RANGES: Dict[str, Tuple[float, float]] = {
+    "pitch": (0.2, 5.08),
+    "body_width": (0.3, 100.0),
+    "body_length": (0.3, 100.0),
+    "height": (0.1, 30.0),
+    "width": (0.3, 100.0),
+    "length": (0.3, 100.0),
+    "ball_diameter": (0.1, 1.0),
+    "pin_count": (1, 3000),
+    "rows": (1, 100),
+    "columns": (1, 100),
+}
+
+# KiCad symbol pin types
+KICAD_PIN_TYPES = ("input", "output", "bidirectional", "tri_state", "passive", "free", "unspecified",
+                   "power_in", "power_out", "open_collector", "open_emitter", "no_connect")
+
+# Datasheet spellings of each KiCad pin type, compared after lower-casing and
+# collapsing separators to single spaces
+ELECTRICAL_TYPE_SYNONYMS: Dict[str, str] = {
+    "i": "input", "in": "input", "digital input": "input", "analog input": "input", "analog": "input",
+    "o": "output", "out": "output", "digital output": "output", "analog output": "output",
+    "io": "bidirectional", "i o": "bidirectional", "inout": "bidirectional", "input output": "bidirectional",
+    "bidir": "bidirectional", "bi directional": "bidirectional",
+    "tristate": "tri_state", "tri state": "tri_state", "3 state": "tri_state", "hi z": "tri_state",
+    "p": "power_in", "pwr": "power_in", "power": "power_in", "power input": "power_in", "supply": "power_in",
+    "ground": "power_in", "gnd": "power_in",
+    "power output": "power_out", "regulator output": "power_out",
+    "od": "open_collector", "oc": "open_collector", "open drain": "open_collector",
+    "open collector": "open_collector", "open source": "open_emitter", "open emitter": "open_emitter",
+    "nc": "no_connect", "n c": "no_connect", "no connect": "no_connect", "not connected": "no_connect",
+    "dnc": "no_connect", "do not connect": "no_connect",
+    "none": "unspecified", "other": "unspecified",
+}
+
+# Fallback for free text such as 'Input (5 V tolerant)'; first match wins
+_TYPE_KEYWORDS: List[Tuple[str, str]] = [
+    ("open drain", "open_collector"), ("open collector", "open_collector"), ("no connect", "no_connect"),
+    ("not connected", "no_connect"), ("bidirectional", "bidirectional"), ("i o", "bidirectional"),
+    ("ground", "power_in"), ("supply", "power_in"), ("power", "power_in"),
+    ("output", "output"), ("input", "input"), ("passive", "passive"),
+]
+
+_TYPE_SEPARATOR_RE = re.compile(r"[^a-z0-9]+")
+
+_PLACEHOLDERS = ("", "unknown", "n/a", "none", "null")
+
+
+@dataclass(frozen=True)
+class ValidationIssue:
+    """One finding of a validation rule, for display next to the offending field."""
+    rule: str
+    severity: str
+    field: str
+    message: str
+    suggestion: Optional[Any] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+Rule = Callable[[Optional[Component], Optional[Package], List[Pin]], Iterable[ValidationIssue]]
+
+RULES: List[Tuple[str, Rule]] = []
+
+
+def rule(name: str) -> Callable[[Rule], Rule]:
+    """Registers a validation rule; rules run in registration order."""
+    def register(func: Rule) -> Rule:
+        RULES.append((name, func))
+        return func
+    return register
+
+
+def expected_pin_count(package: Optional[Package]) -> Optional[int]:
+    """Pin count implied by a package's dimensions or name, if any."""
+    if package is None:
+        return None
+    pin_count = (package.dimensions or {}).get("pin_count")
+    if pin_count:
+        return int(pin_count)
+    return pin_count_from_name(package.name)
+
+
+def pin_count_from_name(name: Optional[str]) -> Optional[int]:
+    """Pin count encoded in a package name such as 'SOIC-8', 'SOT-23-5' or 'QFN-32 5x5'."""
+    parsed = parse_package_name(name)
+    # Chip sizes such as '0805' are body codes, not pin counts
+    if parsed and parsed["family"] not in CHIP_SIZES:
+        return parsed["pin_count"]
+    match = _PIN_TOKEN_RE.search((name or "").upper())
+    return int(match.group(1)) if match else None
+
+
+def normalize_electrical_type(value: Optional[str]) -> Optional[str]:
+    """
+    Maps a datasheet pin type ('Power', 'I/O', 'Open Drain') to its KiCad pin type.
+
+    Returns:
+        The KiCad type, or None if the value is not recognised.
+    """
+    key = _TYPE_SEPARATOR_RE.sub(" ", (value or "").strip().lower()).strip()
+    if not key:
+        return "unspecified"
+    canonical = key.replace(" ", "_")
+    if canonical in KICAD_PIN_TYPES:
+        return canonical
+    if key in ELECTRICAL_TYPE_SYNONYMS:
+        return ELECTRICAL_TYPE_SYNONYMS[key]
+    padded = f" {key} "
+    for keyword, kicad_type in _TYPE_KEYWORDS:
+        if f" {keyword} " in padded:
+            return kicad_type
+    return None
+
+
+def normalize_pins(pins: List[Pin]) -> List[Pin]:
+    """Copies `pins` with recognised electrical types replaced by KiCad types; others are kept."""
+    normalized = []
+    for pin in pins:
+        kicad_type = normalize_electrical_type(pin.electrical_type)
+        if kicad_type and kicad_type != pin.electrical_type:
+            pin = pin.model_copy(update={"electrical_type": kicad_type})
+        normalized.append(pin)
+    return normalized
+
+
+def validate(component: Optional[Component], package: Optional[Package],
+             pins: Optional[List[Pin]]) -> List[ValidationIssue]:
+    """
+    Runs every registered rule over one extracted part.
+
+    Deterministic and cheap (about 0.1 ms for a 64-pin part, see
+    src.benchmarks.validation), so it runs after every extraction and
+    again before generation.
+
+    Returns:
+        List[ValidationIssue]: Errors first, then warnings; empty if the part is consistent.
+    """
+    issues: List[ValidationIssue] = []
+    for name, func in RULES:
+        try:
+            issues.extend(func(component, package, pins or []))
+        except Exception as e:
+            # A broken rule must not hide the other findings
+            logger.warning(f"Validation rule {name} failed: {e}")
+    issues.sort(key=lambda issue: issue.severity != ERROR)
+    return issues
+
+
+def has_errors(issues: List[ValidationIssue]) -> bool:
+    return any(issue.severity == ERROR for issue in issues)
+
+
+@rule("part_number")
+def _check_part_number(component, package, pins):
+    if component is not None and (component.part_number or "").strip().lower() in _PLACEHOLDERS:
+        yield ValidationIssue("part_number", ERROR, "component.part_number", "Part number is missing")
+
+
+@rule("package_name")
+def _check_package_name(component, package, pins):
+    if package is not None and (package.name or "").strip().lower() in _PLACEHOLDERS:
+        yield ValidationIssue("package_name", ERROR, "package.name", "Package name is missing")
+
+
+@rule("pin_count")
+def _check_pin_count(component, package, pins):
+    if package is None:
+        return
+    from_name = pin_count_from_name(package.name)
+    declared = (package.dimensions or {}).get("pin_count")
+    if from_name and declared and int(declared) != from_name:
+        yield ValidationIssue("pin_count", WARNING, "package.dimensions.pin_count",
+                              f"pin_count {int(declared)} disagrees with package name {package.name}",
+                              suggestion=from_name)
+    expected = expected_pin_count(package)
+    # One extra pin is allowed for an exposed thermal pad
+    if pins and expected and len(pins) not in (expected, expected + 1):
+        yield ValidationIssue("pin_count", ERROR, "pins",
+                              f"{len(pins)} pins extracted for a {expected}-pin package ({package.name})",
+                              suggestion=expected)
+
+
+@rule("pin_numbers")
+def _check_pin_numbers(component, package, pins):
+    seen = set()
+    duplicates = []
+    for index, pin in enumerate(pins):
+        number = (pin.number or "").strip()
+        if not number:
+            yield ValidationIssue("pin_numbers", ERROR, f"pins[{index}].number", f"Pin {pin.name or index} has no number")
+        elif number in seen:
+            duplicates.append(number)
+        seen.add(number)
+    if duplicates:
+        yield ValidationIssue("pin_numbers", ERROR, "pins",
+                              f"Duplicate pin numbers: {', '.join(dict.fromkeys(duplicates))}")
+    # Gaps only mean something for plain numeric numbering (not BGA A1/B2)
+    numeric = [int(n) for n in seen if n.isdigit()]
+    if numeric and len(numeric) == len(seen - {""}):
+        missing = sorted(set(range(1, max(numeric) + 1)) - set(numeric))
+        if missing:
+            listed = ", ".join(map(str, missing[:10])) + (", ..." if len(missing) > 10 else "")
+            yield ValidationIssue("pin_numbers", WARNING, "pins", f"Missing pin numbers: {listed}",
+                                  suggestion=missing)
+
+
+@rule("dimensions")
+def _check_dimensions(component, package, pins):
+    if package is None:
+        return
+    for key, value in (package.dimensions or {}).items():
+        bounds = DIMENSION_RANGES.get(key)
+        if bounds is None or value is None:
+            continue
+        field = f"package.dimensions.{key}"
+        if value <= 0:
+            yield ValidationIssue("dimensions", ERROR, field, f"{key} must be positive, got {value}")
+        elif not bounds[0] <= value <= bounds[1]:
+            yield ValidationIssue("dimensions", WARNING, field,
+                                  f"{key} = {value} is outside the plausible range {bounds[0]}-{bounds[1]}")
+
+
+@rule("electrical_type")
+def _check_electrical_types(component, package, pins):
+    for index, pin in enumerate(pins):
+        if normalize_electrical_type(pin.electrical_type) is None:
+            yield ValidationIssue("electrical_type", WARNING, f"pins[{index}].electrical_type",
+                                  f"Pin {pin.number}: unknown electrical type '{pin.electrical_type}'",
+                                  suggestion="passive")
@@ -0,0 +1,98 @@
+"""
+Times the symbol and footprint generators on very large parts.
+
+Builds an FPGA-style part (I/O banks plus power pins) and times splitting
+it into units and rendering the symbol, and times the footprint of a full
+BGA grid:
+
+    python -m src.benchmarks.generators --symbol-pins 2000 --bga-rows 54
+"""
+import re
+import json
+import time
+import argparse
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from src.generators.symbol_generator import SymbolGenerator
+from src.generators.footprint_generator import FootprintGenerator
+from src.models.data_models import Component, Package, Pin
+
+PINS_PER_BANK = 50
+
+
+def fpga_pins(banks: Iterable[int], per_bank: int, power: int) -> List[Pin]:
+    """`per_bank` bidirectional I/O pins per bank followed by `power` alternating VCCO/GND pins."""
+    pins = []
+    number = 1
+    for bank in banks:
+        for i in range(per_bank):
+            pins.append(Pin(package_id=0, number=str(number), name=f"IO_L{i}P_T0_{bank}",
+                            electrical_type="Bidirectional"))
+            number += 1
+    for i in range(power):
+        pins.append(Pin(package_id=0, number=str(number), name="GND" if i % 2 else "VCCO",
+                        electrical_type="Power"))
+        number += 1
+    return pins
+
+
+def benchmark_symbol(pin_count: int) -> Dict[str, Any]:
+    """
+    Generates the symbol of a `pin_count`-pin FPGA, a tenth of it power pins.
+
+    Returns:
+        Dict[str, Any]: 'pins', 'units' and 'seconds'.
+    """
+    power = pin_count // 10
+    banks = range(10, 10 + (pin_count - power) // PINS_PER_BANK)
+    pins = fpga_pins(banks, PINS_PER_BANK, power + (pin_count - power) % PINS_PER_BANK)
+    component = Component(datasheet_id=1, part_number="FPGA", description="Benchmark FPGA")
+
+    start = time.perf_counter()
+    content = SymbolGenerator().generate_symbol(component, pins)
+    seconds = time.perf_counter() - start
+    return {
+        "pins": len(pins),
+        "units": len(re.findall(r'\(symbol "FPGA_\d+_1"', content)),
+        "seconds": round(seconds, 4),
+    }
+
+
+def bga_package(rows: int, pitch: float = 1.0) -> Package:
+    """Full `rows` x `rows` BGA grid."""
+    return Package(component_id=0, name=f"FBGA-{rows * rows}", package_type="FBGA",
+                   dimensions={"rows": rows, "columns": rows, "pitch": pitch})
+
+
+def benchmark_footprint(rows: int) -> Dict[str, Any]:
+    """
+    Generates the footprint of a full `rows` x `rows` BGA.
+
+    Returns:
+        Dict[str, Any]: 'pads' and 'seconds'.
+    """
+    package = bga_package(rows)
+    start = time.perf_counter()
+    content = FootprintGenerator().generate_footprint(package)
+    seconds = time.perf_counter() - start
+    return {"pads": content.count("(pad "), "seconds": round(seconds, 4)}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--symbol-pins", type=int, default=2000, help="Pins of the benchmark symbol")
+    parser.add_argument("--bga-rows", type=int, default=54, help="Rows and columns of the benchmark BGA")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = {"symbol": benchmark_symbol(args.symbol_pins), "footprint": benchmark_footprint(args.bga_rows)}
+    symbol, footprint = results["symbol"], results["footprint"]
+    print(f"symbol: {symbol['pins']} pins in {symbol['units']} units, {symbol['seconds']:.3f}s")
+    print(f"footprint: {footprint['pads']} pads, {footprint['seconds']:.3f}s")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Throughput/latency benchmark for LLMClient and ContentExtractor.
+
+Runs against the local mock vLLM server by default, or any OpenAI-compatible
+endpoint via --base-url:
+
+    python -m src.benchmarks.llm_throughput --concurrency 1 4 16 --requests 64 \
+        --latency-ms 300 --tokens-per-second 40 --max-concurrency 8 --json results.json
+"""
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import numpy as np
+from src.backend.llm_client import LLMClient
+from src.backend.extractor import ContentExtractor
+from src.benchmarks.mock_vllm import MockVLLMServer, LATENCY_DISTRIBUTIONS
+
+logger = logging.getLogger(__name__)
+
+MODES = ("client", "extractor")
+
+# Representative section text for extractor runs
+SAMPLE_SECTIONS: Dict[str, str] = {
+    "description": "The MOCK-1234 is a low-noise, rail-to-rail operational amplifier.",
+    "features": "- 10 MHz GBW\n- 1.8 V to 5.5 V supply\n- SOIC-8 package",
+    "package_dimensions": "SOIC-8: body 4.9 x 3.9 mm, pitch 1.27 mm, height 1.75 mm max.",
+    "ordering_information": "MOCK-1234-SO8 | SOIC-8 | Tape and reel",
+    "pin_configuration": "\n".join(f"| {i} | P{i} | passive |" for i in range(1, 9)),
+}
+
+
+def make_client(base_url: str, model_name: str, adaptive_concurrency: bool = False) -> LLMClient:
+    # Retries and re-prompts would hide injected failures and skew latencies
+    return LLMClient(base_url=base_url, model_name=model_name, max_retries=0, max_continuations=0, max_reprompts=0,
+                     adaptive_concurrency=adaptive_concurrency)
+
+
+def make_request(mode: str, client: LLMClient) -> Callable[[], Any]:
+    if mode == "client":
+        return lambda: client.generate("Extract the component data as JSON.", json_mode=True)
+    extractor = ContentExtractor(client)
+    return lambda: extractor.extract_all("", sections=SAMPLE_SECTIONS)
+
+
+def run_level(request: Callable[[], Any], concurrency: int, requests: int) -> Dict[str, Any]:
+    """
+    Issues `requests` calls with `concurrency` threads and summarizes latencies.
+    """
+    def timed(_: int) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            request()
+        except Exception as e:
+            logger.debug(f"Request failed: {e}")
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(requests)))
+    wall = time.perf_counter() - start
+
+    latencies = np.array([r for r in results if r is not None]) * 1000.0
+    summary = {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": requests - len(latencies),
+        "wall_s": round(wall, 4),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else 0.0,
+    }
+    if latencies.size:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary.update(latency_mean_ms=round(float(latencies.mean()), 2), latency_p50_ms=round(float(p50), 2),
+                       latency_p95_ms=round(float(p95), 2), latency_p99_ms=round(float(p99), 2))
+    return summary
+
+
+def run_benchmark(base_url: str, model_name: str, mode: str = "client",
+                  concurrency_levels: Sequence[int] = (1, 4, 16), requests_per_level: int = 64,
+                  server: Optional[MockVLLMServer] = None,
+                  adaptive_concurrency: bool = False) -> List[Dict[str, Any]]:
+    """
+    Benchmarks one call path at several concurrency levels.
+
+    Args:
+        base_url: OpenAI-compatible endpoint.
+        model_name: Model to request.
+        mode: 'client' (LLMClient.generate) or 'extractor' (ContentExtractor.extract_all).
+        concurrency_levels: Thread counts to run, in order.
+        requests_per_level: Calls issued per level.
+        server: The mock server, if used, to report decode token throughput.
+        adaptive_concurrency: Put the client's AdaptiveLimiter between the threads and the server.
+
+    Returns:
+        One summary dict per concurrency level.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+    client = make_client(base_url, model_name, adaptive_concurrency)
+    request = make_request(mode, client)
+
+    results = []
+    for concurrency in concurrency_levels:
+        tokens_before = server.stats["completion_tokens"] if server else 0
+        summary = run_level(request, concurrency, requests_per_level)
+        summary["mode"] = mode
+        if client.limiter:
+            summary["concurrency_limit"] = client.limiter.stats()["limit"]
+        if server:
+            tokens = server.stats["completion_tokens"] - tokens_before
+            summary["completion_tokens_per_s"] = round(tokens / summary["wall_s"], 1) if summary["wall_s"] else 0.0
+        results.append(summary)
+        logger.info(f"{mode} x{concurrency}: {summary}")
+    return results
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    columns = ["mode", "concurrency", "concurrency_limit", "requests", "errors", "throughput_rps",
+               "latency_p50_ms", "latency_p95_ms", "latency_p99_ms", "completion_tokens_per_s"]
+    columns = [c for c in columns if any(c in r for r in results)]
+    rows = [[str(r.get(c, "")) for c in columns] for r in results]
+    widths = [max(len(c), *(len(row[i]) for row in rows)) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    lines += ["  ".join(v.rjust(w) for v, w in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", help="Benchmark an existing endpoint instead of the mock server")
+    parser.add_argument("--model", default="mock-model")
+    parser.add_argument("--mode", choices=MODES + ("both",), default="both")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=64, help="Requests per concurrency level")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-spread-ms", type=float, default=50.0)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Mock server decode slots")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--adaptive-concurrency", action="store_true",
+                        help="Limit in-flight requests with the client's AIMD limiter")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    modes = MODES if args.mode == "both" else (args.mode,)
+    server = None
+    if not args.base_url:
+        server = MockVLLMServer(model_name=args.model, latency_ms=args.latency_ms,
+                                latency_distribution=args.latency_distribution,
+                                latency_spread_ms=args.latency_spread_ms,
+                                tokens_per_second=args.tokens_per_second,
+                                max_concurrency=args.max_concurrency, failure_rate=args.failure_rate,
+                                malformed_rate=args.malformed_rate, seed=args.seed).start()
+    try:
+        base_url = args.base_url or server.base_url
+        results = []
+        for mode in modes:
+            results.extend(run_benchmark(base_url, args.model, mode, args.concurrency, args.requests, server,
+                                         args.adaptive_concurrency))
+    finally:
+        if server:
+            server.stop()
+
+    print(format_table(results))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+import json
+import math
+import time
+import random
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# A plausible extraction for ContentExtractor.extract_all
+DEFAULT_RESPONSE: Dict[str, Any] = {
+    "component": {"part_number": "MOCK-1234", "manufacturer": "Mock Devices", "description": "Mock op-amp"},
+    "package": {"name": "SOIC-8", "package_type": "SOIC",
+                "dimensions": {"body_width": 3.9, "body_length": 4.9, "pitch": 1.27, "pin_count": 8}},
+    "pins": [{"number": str(i), "name": f"P{i}", "electrical_type": "passive", "description": ""}
+             for i in range(1, 9)],
+}
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+# Rough average for English/JSON text with Qwen/Llama tokenizers
+CHARS_PER_TOKEN = 4
+
+# vLLM's default KV-cache block size; prefix caching works in whole blocks
+PREFIX_BLOCK_TOKENS = 16
+
+ResponseSource = Union[Dict[str, Any], str, List[Union[Dict[str, Any], str]], Callable[[Dict[str, Any]], Any]]
+
+
+class MockVLLMServer:
+    """
+    Local stand-in for a vLLM OpenAI-compatible endpoint.
+
+    Serves /v1/models and /v1/chat/completions (streaming and non-streaming)
+    over real HTTP, with configurable time-to-first-token distribution,
+    decode speed, a limited number of concurrent "GPU" slots, failure
+    injection and canned responses. All randomness comes from a seeded RNG,
+    so runs are reproducible.
+
+    Usage:
+        with MockVLLMServer(latency_ms=200, tokens_per_second=50) as server:
+            client = LLMClient(base_url=server.base_url, model_name=server.model_name)
+    """
+
+    def __init__(self, responses: Optional[ResponseSource] = None, model_name: str = "mock-model",
+                 host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 0.0, latency_distribution: str = "fixed", latency_spread_ms: float = 0.0,
+                 tokens_per_second: Optional[float] = None, max_concurrency: Optional[int] = None,
+                 failure_rate: float = 0.0, failure_status: int = 503, malformed_rate: float = 0.0,
+                 prefix_caching: bool = True, seed: int = 0):
+        """
+        Args:
+            responses: Canned reply: a dict (sent as JSON), a string, a list cycled
+                through per request, or a callable taking the request body.
+                Defaults to DEFAULT_RESPONSE.
+            model_name: Model id reported by /v1/models and in completions.
+            host, port: Bind address; port 0 picks a free port.
+            latency_ms: Mean time to first token (prefill + queueing overhead).
+            latency_distribution: One of LATENCY_DISTRIBUTIONS.
+            latency_spread_ms: Half-width (uniform) or standard deviation (lognormal).
+            tokens_per_second: Decode speed per request; None returns instantly.
+            max_concurrency: Requests decoded at once; extra requests queue.
+            failure_rate: Fraction of requests answered with `failure_status`.
+            failure_status: HTTP status for injected failures.
+            malformed_rate: Fraction of replies truncated mid-JSON.
+            prefix_caching: Simulate automatic prefix caching and export its
+                counters on /metrics like vLLM does.
+            seed: RNG seed for latency and failure sampling.
+        """
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+
+        self.responses = DEFAULT_RESPONSE if responses is None else responses
+        self.model_name = model_name
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.latency_spread_ms = latency_spread_ms
+        self.tokens_per_second = tokens_per_second
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.malformed_rate = malformed_rate
+        self.prefix_caching = prefix_caching
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._cached_blocks: set = set()
+        self.stats = {"requests": 0, "completions": 0, "failures": 0, "malformed": 0,
+                      "in_flight": 0, "peak_in_flight": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                      "prefix_cache_queries": 0, "prefix_cache_hits": 0}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self) -> "MockVLLMServer":
+        """Starts serving in a background thread."""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-vllm", daemon=True)
+        self._thread.start()
+        logger.info(f"Mock vLLM server listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockVLLMServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle plus delayed
+            # ACKs every keep-alive response would gain ~40 ms
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def do_GET(self):
+                if self.path.rstrip('/') == "/v1/models":
+                    self._send_json(200, {"object": "list", "data": [
+                        {"id": server.model_name, "object": "model", "owned_by": "mock"}]})
+                elif self.path.rstrip('/') == "/metrics":
+                    data = server.render_metrics().encode('utf-8')
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                else:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+                    return
+                if self.path.rstrip('/') != "/v1/chat/completions":
+                    self._send_json(404, {"error": {"message": "Not found"}})
+                    return
+                server._handle_completion(self, body)
+
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def _handle_completion(self, handler: BaseHTTPRequestHandler, body: Dict[str, Any]) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+            request_index = self.stats["requests"] - 1
+            fail = self._rng.random() < self.failure_rate
+            malformed = self._rng.random() < self.malformed_rate
+            delay = self._sample_latency()
+
+        if fail:
+            with self._lock:
+                self.stats["failures"] += 1
+            handler._send_json(self.failure_status, {"error": {"message": "Injected failure",
+                                                               "type": "server_error"}})
+            return
+
+        content = self._render_response(body, request_index)
+        finish_reason = "stop"
+        if malformed:
+            # Looks like a reply cut off by max_tokens
+            content = content[:max(1, len(content) // 2)]
+            finish_reason = "length"
+        prompt_text = "".join(f"<|{m.get('role')}|>{m.get('content', '')}" for m in body.get("messages", []))
+        prompt_tokens = len(prompt_text) // CHARS_PER_TOKEN
+        cached_tokens = self._match_prefix(prompt_text) if self.prefix_caching else 0
+        completion_tokens = max(1, len(content) // CHARS_PER_TOKEN)
+
+        if self._slots:
+            self._slots.acquire()
+        with self._lock:
+            self.stats["in_flight"] += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+        try:
+            time.sleep(delay)
+            if body.get("stream"):
+                usage = None
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                             "total_tokens": prompt_tokens + completion_tokens}
+                self._stream(handler, content, finish_reason, usage)
+            else:
+                if self.tokens_per_second:
+                    time.sleep(completion_tokens / self.tokens_per_second)
+                handler._send_json(200, self._completion_payload(content, finish_reason, prompt_tokens, completion_tokens))
+        finally:
+            with self._lock:
+                self.stats["in_flight"] -= 1
+                self.stats["completions"] += 1
+                self.stats["malformed"] += int(malformed)
+                self.stats["prompt_tokens"] += prompt_tokens
+                self.stats["completion_tokens"] += completion_tokens
+                if self.prefix_caching:
+                    self.stats["prefix_cache_queries"] += prompt_tokens
+                    self.stats["prefix_cache_hits"] += cached_tokens
+            if self._slots:
+                self._slots.release()
+
+    def _stream(self, handler: BaseHTTPRequestHandler, content: str, finish_reason: str,
+                usage: Optional[Dict[str, int]] = None) -> None:
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Cache-Control", "no-cache")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        handler.close_connection = True
+
+        pieces = [content[i:i + CHARS_PER_TOKEN] for i in range(0, len(content), CHARS_PER_TOKEN)]
+        interval = 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+        created = int(time.time())
+        for i, piece in enumerate(pieces):
+            if i and interval:
+                time.sleep(interval)
+            self._send_event(handler, self._chunk_payload({"content": piece}, None, created))
+        self._send_event(handler, self._chunk_payload({}, finish_reason, created))
+        if usage:
+            final = self._chunk_payload({}, None, created)
+            final["choices"], final["usage"] = [], usage
+            self._send_event(handler, final)
+        handler.wfile.write(b"data: [DONE]\n\n")
+        handler.wfile.flush()
+
+    def _send_event(self, handler: BaseHTTPRequestHandler, payload: Dict[str, Any]) -> None:
+        handler.wfile.write(b"data: " + json.dumps(payload).encode('utf-8') + b"\n\n")
+        handler.wfile.flush()
+
+    def _match_prefix(self, prompt_text: str) -> int:
+        """
+        Returns how many prompt tokens hit the prefix cache, then caches the
+        prompt. Like vLLM, only whole blocks count and a block only matches
+        when every block before it matched too.
+        """
+        block_chars = PREFIX_BLOCK_TOKENS * CHARS_PER_TOKEN
+        block_hash = 0
+        hits = 0
+        matching = True
+        with self._lock:
+            for start in range(0, len(prompt_text) - block_chars + 1, block_chars):
+                block_hash = hash((block_hash, prompt_text[start:start + block_chars]))
+                if matching and block_hash in self._cached_blocks:
+                    hits += PREFIX_BLOCK_TOKENS
+                else:
+                    matching = False
+                    self._cached_blocks.add(block_hash)
+        return hits
+
+    def render_metrics(self) -> str:
+        """Prefix-cache counters in vLLM's Prometheus format."""
+        labels = f'{{model_name="{self.model_name}"}}'
+        with self._lock:
+            queries, hits = self.stats["prefix_cache_queries"], self.stats["prefix_cache_hits"]
+        return (f"# TYPE vllm:prefix_cache_queries counter\n"
+                f"vllm:prefix_cache_queries_total{labels} {queries}\n"
+                f"# TYPE vllm:prefix_cache_hits counter\n"
+                f"vllm:prefix_cache_hits_total{labels} {hits}\n")
+
+    def _sample_latency(self) -> float:
+        mean = self.latency_ms / 1000.0
+        spread = self.latency_spread_ms / 1000.0
+        if mean <= 0:
+            return 0.0
+        if self.latency_distribution == "uniform":
+            return max(0.0, self._rng.uniform(mean - spread, mean + spread))
+        if self.latency_distribution == "exponential":
+            return self._rng.expovariate(1.0 / mean)
+        if self.latency_distribution == "lognormal":
+            # Parameterized so the sample mean and standard deviation match
+            variance = spread ** 2
+            sigma_sq = math.log(1 + variance / mean ** 2)
+            mu = math.log(mean) - sigma_sq / 2
+            return self._rng.lognormvariate(mu, sigma_sq ** 0.5)
+        return mean
+
+    def _render_response(self, body: Dict[str, Any], request_index: int) -> str:
+        source = self.responses
+        if callable(source):
+            source = source(body)
+        elif isinstance(source, list):
+            source = source[request_index % len(source)]
+        return source if isinstance(source, str) else json.dumps(source)
+
+    def _completion_payload(self, content: str, finish_reason: str, prompt_tokens: int,
+                            completion_tokens: int) -> Dict[str, Any]:
+        return {
+            "id": f"cmpl-mock-{self.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": self.model_name,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def _chunk_payload(self, delta: Dict[str, Any], finish_reason: Optional[str], created: int) -> Dict[str, Any]:
+        return {
+            "id": f"cmpl-mock-{self.stats['requests']}",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": self.model_name,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
@@ -0,0 +1,79 @@
+"""
+Times the near-duplicate LSH index at library scale.
+
+Bulk-loads random MinHash signatures, adds more one at a time (as ingestion
+does), then times queries that share only part of a stored signature:
+
+    python -m src.benchmarks.near_duplicates --documents 100000 --queries 100
+"""
+import json
+import time
+import argparse
+from typing import Any, Dict, Optional, Sequence
+import numpy as np
+from src.backend.near_duplicates import NearDuplicateIndex
+
+
+def benchmark_index(documents: int = 100_000, incremental: int = 1000, queries: int = 100,
+                    num_perm: int = 128, seed: int = 0) -> Dict[str, Any]:
+    """
+    Returns:
+        Dict[str, Any]: 'documents', 'bytes_per_document', 'bulk_seconds',
+        'add_ms' and 'query_ms' (means per call), and 'found' (queries whose
+        source document ranked first).
+    """
+    rng = np.random.default_rng(seed)
+    signatures = rng.integers(0, 1 << 32, size=(documents, num_perm), dtype=np.uint32)
+    bulk = documents - incremental
+    index = NearDuplicateIndex(num_perm=num_perm)
+
+    start = time.perf_counter()
+    index.add_many([f"doc{i}.pdf" for i in range(bulk)], signatures[:bulk])
+    bulk_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(bulk, documents):
+        index.add(f"doc{i}.pdf", signatures[i])
+    add_seconds = time.perf_counter() - start
+
+    # Keep the first ten bands of each probe so it stays a candidate
+    targets = rng.integers(0, documents, size=queries)
+    probes = signatures[targets].copy()
+    probes[:, num_perm * 2 // 3:] = 0
+    found = 0
+    start = time.perf_counter()
+    for target, probe in zip(targets.tolist(), probes):
+        matches = index.query(probe, threshold=0.6)
+        found += bool(matches) and matches[0][0] == f"doc{target}.pdf"
+    query_seconds = time.perf_counter() - start
+
+    return {
+        "documents": len(index),
+        "bytes_per_document": round(index.memory_bytes() / max(len(index), 1), 1),
+        "bulk_seconds": round(bulk_seconds, 4),
+        "add_ms": round(add_seconds / max(incremental, 1) * 1e3, 4),
+        "query_ms": round(query_seconds / max(queries, 1) * 1e3, 4),
+        "found": found,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=100_000, help="Signatures in the index")
+    parser.add_argument("--incremental", type=int, default=1000, help="Of those, added one at a time")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = benchmark_index(args.documents, args.incremental, args.queries)
+    print(f"{results['documents']} documents, {results['bytes_per_document']:.0f} B each: "
+          f"bulk load {results['bulk_seconds']:.3f}s, add {results['add_ms']:.3f} ms, "
+          f"query {results['query_ms']:.3f} ms ({results['found']}/{args.queries} found)")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
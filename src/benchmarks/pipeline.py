@@ -0,0 +1,317 @@
+"""
+End-to-end pipeline benchmark with per-stage timing, peak memory and a
+baseline regression gate.
+
+Times IngestionEngine, ContentExtractor (against a stub LLM), the symbol,
+footprint and 3D model generators and DB persistence separately, on
+synthetic datasheets from 10 to 10,000 pins and up to 5 MB of Markdown:
+
+    python -m src.benchmarks.pipeline --json results.json --baseline
+    python -m src.benchmarks.pipeline --update-baseline src/benchmarks/baselines/pipeline.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from src.backend.ingestion import IngestionEngine
+from src.backend.extractor import ContentExtractor
+from src.database.db_manager import DBManager
+from src.generators.symbol_generator import SymbolGenerator
+from src.generators.footprint_generator import FootprintGenerator
+from src.generators.model_generator import ModelGenerator, HAS_CQ
+from src.models.data_models import Package
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'schema.sql')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'pipeline.json')
+
+# (pin count, Markdown size in bytes)
+DEFAULT_CASES: List[Tuple[int, int]] = [(10, 20_000), (1_000, 500_000), (10_000, 5_000_000)]
+QUICK_CASES: List[Tuple[int, int]] = [(10, 10_000), (200, 100_000)]
+
+STAGES = ("ingestion", "extraction", "symbol", "footprint", "model", "db")
+
+PIN_TYPES = ("input", "output", "bidirectional", "power_in", "passive")
+
+
+def case_name(pins: int, size: int) -> str:
+    return f"pins{pins}_{size // 1000}kB"
+
+
+def synthetic_datasheet(pin_count: int, size: int) -> str:
+    """
+    Builds MinerU-style Markdown with the usual datasheet sections, a pin
+    table of `pin_count` rows and electrical characteristics padding the
+    document to roughly `size` bytes.
+    """
+    lines = [
+        "# BENCH-{0} High Pin Count Device".format(pin_count),
+        "## Description",
+        "The BENCH device is a synthetic part used for pipeline benchmarking.",
+        "## Features",
+        "- Wide supply range\n- Low power\n- Industrial temperature range",
+        "## Pin Configuration",
+        "| Pin | Name | Type | Description |",
+        "|-----|------|------|-------------|",
+    ]
+    for number, name, etype in synthetic_pins(pin_count):
+        lines.append(f"| {number} | {name} | {etype} | Function of {name} |")
+    lines += [
+        "## Package Dimensions",
+        "| Symbol | Min | Nom | Max |",
+        "| A | 1.35 | 1.55 | 1.75 |",
+        "| E | 3.80 | 3.90 | 4.00 |",
+        "## Ordering Information",
+        "| Part | Package | Packing |",
+        "| BENCH-{0} | {1} | Tray |".format(pin_count, synthetic_package(pin_count).name),
+        "## Electrical Characteristics",
+    ]
+    text = "\n".join(lines)
+    row = "| Parameter {0} | Conditions {0} | 0.{0:03d} | 1.{0:03d} | 2.{0:03d} | V |\n"
+    filler = []
+    remaining = size - len(text)
+    i = 0
+    while remaining > 0:
+        line = row.format(i % 1000)
+        filler.append(line)
+        remaining -= len(line)
+        i += 1
+    return text + "\n" + "".join(filler)
+
+
+def synthetic_pins(pin_count: int) -> List[Tuple[str, str, str]]:
+    """(number, name, electrical type) for a mix of banked I/O and power pins."""
+    pins = []
+    for i in range(1, pin_count + 1):
+        if i % 10 == 0:
+            name, etype = ("VCC" if i % 20 else "GND"), "power_in"
+        else:
+            name, etype = f"IO_L{i}P_T0_{i // 200}", PIN_TYPES[i % 3]
+        pins.append((str(i), name, etype))
+    return pins
+
+
+def synthetic_package(pin_count: int) -> Package:
+    if pin_count <= 64:
+        return Package(component_id=1, name=f"SOIC-{pin_count}", package_type="SOIC",
+                       dimensions={"body_width": 3.9, "body_length": 4.9, "pitch": 1.27,
+                                   "pin_count": pin_count, "height": 1.75})
+    side = math.ceil(math.sqrt(pin_count))
+    size = round(side * 0.8 + 1.0, 2)
+    return Package(component_id=1, name=f"BGA-{side * side}", package_type="BGA",
+                   dimensions={"rows": side, "columns": side, "pitch": 0.8, "ball_diameter": 0.4,
+                               "body_width": size, "body_length": size, "height": 1.2})
+
+
+class StubLLMClient:
+    """LLMClient stand-in answering with a fixed extraction for the synthetic part."""
+
+    def __init__(self, pin_count: int):
+        package = synthetic_package(pin_count)
+        self.response = {
+            "component": {"part_number": f"BENCH-{pin_count}", "manufacturer": "Bench",
+                          "description": "Synthetic benchmark part"},
+            "package": {"name": package.name, "package_type": package.package_type,
+                        "dimensions": package.dimensions},
+            "pins": [{"number": n, "name": name, "electrical_type": t, "description": ""}
+                     for n, name, t in synthetic_pins(pin_count)],
+        }
+
+    def generate(self, prompt: str, system_prompt: str = None, json_mode: bool = True,
+                 temperature: float = 0.1, json_schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Round-trip through JSON like a real response would
+        return json.loads(json.dumps(self.response))
+
+
+def measure(func: Callable[[], Any], repeat: int = 3) -> Dict[str, float]:
+    """
+    Times `func` (best of `repeat` runs) and, in a separate run under
+    tracemalloc, records the peak of Python allocations.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 2 ** 20}
+
+
+def run_case(pin_count: int, size: int, work_dir: str, repeat: int = 3,
+             stages: Sequence[str] = STAGES) -> Dict[str, Any]:
+    """
+    Benchmarks every stage for one synthetic datasheet.
+
+    Returns:
+        Case metadata plus {stage: {seconds, peak_mb, throughput, unit}}.
+    """
+    markdown_path = os.path.join(work_dir, f"{case_name(pin_count, size)}.md")
+    with open(markdown_path, 'w', encoding='utf-8') as f:
+        f.write(synthetic_datasheet(pin_count, size))
+    markdown_bytes = os.path.getsize(markdown_path)
+
+    ingestion = IngestionEngine()
+    ingested = ingestion.process_file(markdown_path)
+    extractor = ContentExtractor(StubLLMClient(pin_count))
+    extracted = extractor.extract_all(ingested["content"], sections=ingested["sections"])
+    component, package, pins = extracted["component"], extracted["package"], extracted["pins"]
+
+    symbol_gen = SymbolGenerator()
+    footprint_gen = FootprintGenerator()
+    model_gen = ModelGenerator(export_wrl=True)
+    db = DBManager(os.path.join(work_dir, "bench.db"))
+    db.initialize_db(SCHEMA_PATH)
+    model_dir = os.path.join(work_dir, "models")
+
+    def build_model() -> None:
+        # Fresh generator each run so the STEP/mesh cache is not measured
+        ModelGenerator(export_wrl=True).generate_model(package, model_dir)
+
+    # (callable, work units, unit label)
+    plan = {
+        "ingestion": (lambda: ingestion.process_file(markdown_path), markdown_bytes / 2 ** 20, "MB/s"),
+        "extraction": (lambda: extractor.extract_all(ingested["content"], sections=ingested["sections"]),
+                       pin_count, "pins/s"),
+        "symbol": (lambda: symbol_gen.generate_symbol(component, pins), pin_count, "pins/s"),
+        "footprint": (lambda: footprint_gen.generate_footprint(package), pin_count, "pins/s"),
+        "model": (build_model, 1, "models/s"),
+        "db": (lambda: db.save_component(component, package, pins), pin_count, "pins/s"),
+    }
+    if "model" in stages and not HAS_CQ:
+        logger.warning("CadQuery not installed; skipping model stage.")
+    elif "model" in stages:
+        # Pay the CadQuery import before timing
+        model_gen.build_solid(package)
+
+    results = {"pins": pin_count, "markdown_bytes": markdown_bytes, "stages": {}}
+    for stage in stages:
+        if stage == "model" and not HAS_CQ:
+            continue
+        func, units, unit = plan[stage]
+        stats = measure(func, repeat)
+        stats["throughput"] = units / stats["seconds"] if stats["seconds"] else float("inf")
+        stats["unit"] = unit
+        results["stages"][stage] = {k: round(v, 6) if isinstance(v, float) else v for k, v in stats.items()}
+        logger.info(f"{case_name(pin_count, size)} {stage}: {results['stages'][stage]}")
+    return results
+
+
+def run_suite(cases: Sequence[Tuple[int, int]] = DEFAULT_CASES, repeat: int = 3,
+              stages: Sequence[str] = STAGES) -> Dict[str, Any]:
+    """Runs all cases and returns the JSON-serializable result document."""
+    with tempfile.TemporaryDirectory(prefix="pipeline-bench-") as work_dir:
+        results = {case_name(p, s): run_case(p, s, work_dir, repeat, stages) for p, s in cases}
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "cases": results,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], time_tolerance: float = 0.5,
+            memory_tolerance: float = 0.25, min_seconds: float = 0.005) -> List[Dict[str, Any]]:
+    """
+    Compares results against a baseline document.
+
+    A stage regresses when its time exceeds the baseline by more than
+    `time_tolerance` (fraction) and by at least `min_seconds`, or when its
+    peak memory exceeds the baseline by more than `memory_tolerance`.
+    Cases or stages missing from the baseline are not compared.
+
+    Returns:
+        One dict per regression with case, stage, metric, baseline, current and ratio.
+    """
+    regressions = []
+    for case, data in results.get("cases", {}).items():
+        base_stages = baseline.get("cases", {}).get(case, {}).get("stages", {})
+        for stage, current in data["stages"].items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+            checks = [
+                ("seconds", time_tolerance, min_seconds),
+                ("peak_mb", memory_tolerance, 0.0),
+            ]
+            for metric, tolerance, min_delta in checks:
+                old, new = base.get(metric), current.get(metric)
+                if not old or new is None:
+                    continue
+                if new > old * (1 + tolerance) and new - old >= min_delta:
+                    regressions.append({"case": case, "stage": stage, "metric": metric,
+                                        "baseline": old, "current": new, "ratio": round(new / old, 3)})
+    return regressions
+
+
+def format_table(results: Dict[str, Any]) -> str:
+    lines = [f"{'case':<18}{'stage':<12}{'seconds':>12}{'peak MB':>10}{'throughput':>16}"]
+    for case, data in results["cases"].items():
+        for stage, s in data["stages"].items():
+            lines.append(f"{case:<18}{stage:<12}{s['seconds']:>12.4f}{s['peak_mb']:>10.2f}"
+                         f"{s['throughput']:>12.1f} {s['unit']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Small cases only")
+    parser.add_argument("--case", action="append", metavar="PINS:BYTES",
+                        help="Custom case, e.g. 5000:2000000 (repeatable)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE,
+                        help="Fail on regressions against this baseline (default: the stored one)")
+    parser.add_argument("--update-baseline", metavar="PATH", help="Store the results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.5)
+    parser.add_argument("--memory-tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        cases = [tuple(int(v) for v in c.split(":")) for c in args.case]
+    else:
+        cases = QUICK_CASES if args.quick else DEFAULT_CASES
+
+    results = run_suite(cases, args.repeat, args.stages)
+    print(format_table(results))
+
+    for path in (args.json, args.update_baseline):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['case']} {r['stage']} {r['metric']}: "
+                  f"{r['baseline']} -> {r['current']} (x{r['ratio']})")
+        if regressions:
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Verifies that extraction prompts hit vLLM's automatic prefix cache.
+
+Runs ContentExtractor over several synthetic datasheets and target subsets,
+then compares the hit rate implied by the prompt layout with the one reported
+by the server's /metrics endpoint (mock vLLM server by default):
+
+    python -m src.benchmarks.prefix_cache --datasheets 8
+    python -m src.benchmarks.prefix_cache --base-url http://gpu-box:8000/v1 --model Qwen/Qwen2.5-Coder-32B-Instruct
+"""
+import re
+import json
+import logging
+import argparse
+import urllib.request
+from typing import Any, Dict, List, Optional, Sequence
+from src.backend.extractor import ContentExtractor, ALL_TARGETS
+from src.backend.ingestion import IngestionEngine
+from src.backend.prompts import PromptTemplate, DEFAULT_TEMPLATE, get_template, common_prefix_length
+from src.benchmarks.llm_throughput import make_client
+from src.benchmarks.mock_vllm import MockVLLMServer
+from src.benchmarks.pipeline import synthetic_datasheet
+
+logger = logging.getLogger(__name__)
+
+# vLLM V1 exports token counters (gpu_ prefix before 0.10); V0 only a hit-rate gauge
+_COUNTER_RE = re.compile(r"^vllm:(?:gpu_)?prefix_cache_(queries|hits)(?:_total)?(?:\{[^}]*\})?\s+([0-9.eE+-]+)$")
+_GAUGE_RE = re.compile(r"^vllm:gpu_prefix_cache_hit_rate(?:\{[^}]*\})?\s+([0-9.eE+-]+)$")
+
+# Target subsets sent by full and incremental extractions
+TARGET_SETS: List[List[str]] = [list(ALL_TARGETS), ["package"], ["pins"], ["component", "package"]]
+
+
+def parse_prefix_cache_metrics(text: str) -> Dict[str, float]:
+    """
+    Extracts prefix-cache counters from vLLM's Prometheus text.
+
+    Returns:
+        {'queries', 'hits'} in tokens summed over all series, or {'hit_rate'}
+        for servers that only export the gauge. Empty if neither is present.
+    """
+    counters: Dict[str, float] = {}
+    hit_rate = None
+    for line in text.splitlines():
+        match = _COUNTER_RE.match(line.strip())
+        if match:
+            counters[match.group(1)] = counters.get(match.group(1), 0.0) + float(match.group(2))
+            continue
+        match = _GAUGE_RE.match(line.strip())
+        if match:
+            hit_rate = float(match.group(1))
+    if "queries" in counters and "hits" in counters:
+        return counters
+    return {"hit_rate": hit_rate} if hit_rate is not None else {}
+
+
+def scrape(base_url: str, timeout: float = 10.0) -> Dict[str, float]:
+    """Reads prefix-cache metrics from the server behind an OpenAI-style base URL."""
+    metrics_url = re.sub(r"/v1/?$", "", base_url.rstrip("/")) + "/metrics"
+    with urllib.request.urlopen(metrics_url, timeout=timeout) as response:
+        return parse_prefix_cache_metrics(response.read().decode("utf-8"))
+
+
+def measured_hit_rate(before: Dict[str, float], after: Dict[str, float]) -> Optional[float]:
+    """Token hit rate between two scrapes; the gauge value if counters are unavailable."""
+    if "queries" in before and "queries" in after:
+        queries = after["queries"] - before["queries"]
+        return (after["hits"] - before["hits"]) / queries if queries else None
+    return after.get("hit_rate")
+
+
+def expected_hit_rate(prompts: List[str]) -> float:
+    """
+    Hit rate guaranteed by the prompt layout alone: every prompt after the
+    first reuses the prefix shared by all prompts. Similar datasheets can
+    share more, so a healthy server reports at least this (less block rounding).
+    """
+    if len(prompts) < 2:
+        return 0.0
+    shared = common_prefix_length(prompts)
+    return shared * (len(prompts) - 1) / sum(len(p) for p in prompts)
+
+
+def run(base_url: str, model_name: str, datasheets: int = 8, template: PromptTemplate = DEFAULT_TEMPLATE,
+        target_sets: Sequence[List[str]] = TARGET_SETS) -> Dict[str, Any]:
+    """
+    Sends one extraction per datasheet and target subset and reports hit rates.
+
+    Returns:
+        Dict with the template version, request count, shared prefix length
+        (characters), and the expected and measured hit rates.
+    """
+    extractor = ContentExtractor(make_client(base_url, model_name), template=template)
+    ingestion = IngestionEngine()
+    before = scrape(base_url)
+
+    prompts = []
+    for i in range(datasheets):
+        sections = ingestion._identify_sections(synthetic_datasheet(8 + 8 * i, 4000))
+        for targets in target_sets:
+            system_prompt, user_prompt = extractor.build_prompt("", sections, targets)
+            prompts.append(f"<|system|>{system_prompt}<|user|>{user_prompt}")
+            extractor.extract_all("", sections=sections, targets=targets)
+
+    measured = measured_hit_rate(before, scrape(base_url))
+    return {
+        "template": template.version,
+        "requests": len(prompts),
+        "shared_prefix_chars": common_prefix_length(prompts),
+        "expected_hit_rate": round(expected_hit_rate(prompts), 4),
+        "measured_hit_rate": round(measured, 4) if measured is not None else None,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", help="Check an existing vLLM server instead of the mock server")
+    parser.add_argument("--model", default="mock-model")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE.version)
+    parser.add_argument("--datasheets", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    server = None if args.base_url else MockVLLMServer(model_name=args.model).start()
+    try:
+        result = run(args.base_url or server.base_url, args.model, args.datasheets, get_template(args.template))
+    finally:
+        if server:
+            server.stop()
+
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measures lazy indexing against full parsing of KiCAD symbol libraries.
+
+Indexing only locates the top-level symbols; parsing builds every node.
+Runs on a synthetic library by default, or on the stock KiCAD libraries:
+
+    python -m src.benchmarks.sexpr_parse --symbols 2000 --pins 32
+    python -m src.benchmarks.sexpr_parse --library-dir /usr/share/kicad/symbols
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+from src.generators import sexpr
+from src.generators.symbol_library import SymbolLibraryWriter
+from src.models.data_models import Component, Pin
+
+
+def write_synthetic_library(path: str, symbols: int, pin_count: int) -> None:
+    """Writes `symbols` generated parts with `pin_count` pins each to a .kicad_sym file."""
+    with SymbolLibraryWriter(path) as lib:
+        for i in range(symbols):
+            component = Component(datasheet_id=1, part_number=f"PART-{i}", description="Synthetic part")
+            pins = [Pin(package_id=0, number=str(n), name=f"P{n}", electrical_type="input")
+                    for n in range(1, pin_count + 1)]
+            lib.upsert(component, pins)
+
+
+def benchmark_library(path: str) -> Dict[str, Any]:
+    """
+    Indexes a symbol library, then parses every symbol in it.
+
+    Returns:
+        Dict[str, Any]: 'library', 'symbols', 'index_seconds' and 'parse_seconds'.
+    """
+    start = time.perf_counter()
+    symbols = sexpr.load_symbol_library(path)
+    index_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for symbol in symbols.values():
+        symbol.node
+    parse_seconds = time.perf_counter() - start
+    return {
+        "library": os.path.basename(path),
+        "symbols": len(symbols),
+        "index_seconds": round(index_seconds, 4),
+        "parse_seconds": round(parse_seconds, 4),
+    }
+
+
+def run_benchmark(symbols: int = 2000, pin_count: int = 32, library_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Benchmarks every .kicad_sym in `library_dir`, or one synthetic library if None."""
+    if library_dir:
+        return [benchmark_library(os.path.join(library_dir, name))
+                for name in sorted(os.listdir(library_dir)) if name.endswith(".kicad_sym")]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "Synthetic.kicad_sym")
+        write_synthetic_library(path, symbols, pin_count)
+        return [benchmark_library(path)]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=2000, help="Symbols in the synthetic library")
+    parser.add_argument("--pins", type=int, default=32, help="Pins per synthetic symbol")
+    parser.add_argument("--library-dir", default=os.environ.get("KICAD_SYMBOL_DIR"),
+                        help="Benchmark these .kicad_sym files instead (default: $KICAD_SYMBOL_DIR)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.symbols, args.pins, args.library_dir)
+    total_symbols = sum(r["symbols"] for r in results)
+    index_seconds = sum(r["index_seconds"] for r in results)
+    parse_seconds = sum(r["parse_seconds"] for r in results)
+    print(f"{len(results)} libraries, {total_symbols} symbols: "
+          f"indexed in {index_seconds:.3f}s, parsed in {parse_seconds:.3f}s "
+          f"({parse_seconds / max(index_seconds, 1e-9):.1f}x)")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
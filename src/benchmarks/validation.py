@@ -0,0 +1,56 @@
+"""
+Times the rule-based validation that runs after every extraction.
+
+    python -m src.benchmarks.validation --parts 10000 --pins 64
+"""
+import json
+import time
+import argparse
+from typing import Any, Dict, Optional, Sequence
+from src.backend.validation import validate
+from src.models.data_models import Component, Package, Pin
+
+
+def benchmark_validation(parts: int = 10000, pin_count: int = 64) -> Dict[str, Any]:
+    """
+    Validates one consistent TQFP part `parts` times.
+
+    Returns:
+        Dict[str, Any]: 'parts', 'pins', 'issues' and 'us_per_part'.
+    """
+    component = Component(datasheet_id=1, part_number="BENCH-1")
+    package = Package(component_id=1, name=f"TQFP-{pin_count}",
+                      dimensions={"pitch": 0.5, "body_width": 10.0, "height": 1.2})
+    pins = [Pin(package_id=1, number=str(n), name=f"P{n}", electrical_type="Input")
+            for n in range(1, pin_count + 1)]
+
+    issues = validate(component, package, pins)
+    start = time.perf_counter()
+    for _ in range(parts):
+        validate(component, package, pins)
+    seconds = time.perf_counter() - start
+    return {
+        "parts": parts,
+        "pins": pin_count,
+        "issues": len(issues),
+        "us_per_part": round(seconds / max(parts, 1) * 1e6, 2),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--parts", type=int, default=10000, help="Validations to time")
+    parser.add_argument("--pins", type=int, default=64, help="Pins per part")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = benchmark_validation(args.parts, args.pins)
+    print(f"{results['parts']} parts of {results['pins']} pins: {results['us_per_part']:.1f} us per part")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
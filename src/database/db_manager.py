@@ -3,6 +3,8 @@ import os
 from typing import List, Dict, Any, Optional, Tuple
 import json
 from datetime import datetime
+from src.models.data_models import Component, Package, Pin
+from src.telemetry import tracer
 
 class DBManager:
     def __init__(self, db_path: str = "pdf2comp.db"):
@@ -29,6 +31,7 @@ class DBManager:
         finally:
             conn.close()
 
+    @tracer.traced("db.write")
     def execute_query(self, query: str, params: Tuple = ()) -> int:
         """Executes a query (INSERT, UPDATE, DELETE) and returns the last row id."""
         conn = self.get_connection()
@@ -92,3 +95,90 @@ class DBManager:
         )
         
         return self.execute_query(query, params)
+
+    def save_extraction(self,
+                        source_key: str,
+                        section_hashes: Dict[str, str],
+                        raw_json: Dict[str, Any],
+                        datasheet_id: Optional[int] = None) -> int:
+        """
+        Stores an extraction result together with the section hashes it was built from.
+        """
+        query = """
+            INSERT INTO extractions (source_key, datasheet_id, section_hashes, raw_json)
+            VALUES (?, ?, ?, ?)
+        """
+        params = (
+            source_key,
+            datasheet_id,
+            json.dumps(section_hashes),
+            json.dumps(raw_json)
+        )
+        return self.execute_query(query, params)
+
+    def get_latest_extraction(self, source_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the most recent extraction for a document, with JSON fields decoded.
+        """
+        row = self.fetch_one(
+            "SELECT * FROM extractions WHERE source_key = ? ORDER BY id DESC LIMIT 1",
+            (source_key,)
+        )
+        if row:
+            row["section_hashes"] = json.loads(row["section_hashes"] or "{}")
+            row["raw_json"] = json.loads(row["raw_json"] or "{}")
+        return row
+
+    def save_document_signature(self, source_key: str, signature: bytes) -> int:
+        """
+        Stores the MinHash signature of a document, replacing any earlier one.
+        """
+        return self.execute_query(
+            "INSERT OR REPLACE INTO document_signatures (source_key, signature) VALUES (?, ?)",
+            (source_key, sqlite3.Binary(signature))
+        )
+
+    def get_document_signatures(self) -> List[Dict[str, Any]]:
+        """
+        Returns every stored signature as {'source_key', 'signature'} rows, oldest first.
+        """
+        return self.fetch_all("SELECT source_key, signature FROM document_signatures ORDER BY id")
+
+    @tracer.traced("db.write")
+    def save_component(self, component: Component, package: Optional[Package] = None,
+                       pins: Optional[List[Pin]] = None) -> int:
+        """
+        Stores a component with its package and pins in a single transaction.
+        Pins are inserted with one executemany call.
+
+        Returns:
+            The new component id.
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO components (datasheet_id, part_number, description, manufacturer) VALUES (?, ?, ?, ?)",
+                (component.datasheet_id, component.part_number, component.description, component.manufacturer)
+            )
+            component_id = cursor.lastrowid
+
+            if package is not None:
+                cursor.execute(
+                    "INSERT INTO packages (component_id, name, package_type, dimensions, model_params) VALUES (?, ?, ?, ?, ?)",
+                    (component_id, package.name, package.package_type,
+                     json.dumps(package.dimensions or {}), json.dumps(package.model_params or {}))
+                )
+                package_id = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT INTO pins (package_id, number, name, electrical_type, description) VALUES (?, ?, ?, ?, ?)",
+                    [(package_id, p.number, p.name, p.electrical_type, p.description) for p in pins or []]
+                )
+
+            conn.commit()
+            return component_id
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
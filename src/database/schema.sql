@@ -50,8 +50,26 @@ CREATE TABLE IF NOT EXISTS correction_log (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE TABLE IF NOT EXISTS extractions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_key TEXT NOT NULL, -- Stable document identity across revisions (e.g. filename)
+    datasheet_id INTEGER,
+    section_hashes JSON, -- {section_name: sha256} from IngestionEngine
+    raw_json JSON, -- Merged LLM output for component, package and pins
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (datasheet_id) REFERENCES datasheets(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS document_signatures (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_key TEXT NOT NULL UNIQUE, -- Same identity as extractions.source_key
+    signature BLOB NOT NULL, -- MinHash signature (uint32 array) of the section text
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_datasheets_hash ON datasheets(file_hash);
 CREATE INDEX IF NOT EXISTS idx_components_datasheet ON components(datasheet_id);
 CREATE INDEX IF NOT EXISTS idx_packages_component ON packages(component_id);
 CREATE INDEX IF NOT EXISTS idx_pins_package ON pins(package_id);
+CREATE INDEX IF NOT EXISTS idx_extractions_source ON extractions(source_key);
@@ -1,20 +1,50 @@
-from typing import List, Dict, Tuple, Optional
+from typing import Any, List, Dict, Tuple, Optional
 import math
 from datetime import datetime
+import numpy as np
 from src.models.data_models import Package
+from src.telemetry import tracer
+from src.generators.land_pattern import LandPatternCalculator, FILLET_TABLES, lead_limits, lead_style_for
+from src.generators.package_names import fill_dimensions, resolve_package_type
+
+# Precompiled line templates (bound str.format) for the per-pad hot path
+PAD_LINE = '    (pad "{}" smd rect (at {:g} {:g}) (size {:g} {:g}) (layers "F.Cu" "F.Paste" "F.Mask"))'.format
+BALL_LINE = '    (pad "{}" smd circle (at {:g} {:g}) (size {:g} {:g}) (layers "F.Cu" "F.Paste" "F.Mask"))'.format
+
+# JEDEC JEP95 row letters: I, O, Q, S, X and Z are never used
+GRID_ROW_LETTERS = "ABCDEFGHJKLMNPRTUVWY"
+
+# Pads of SOT outlines with uneven rows, per pin number as (side, slot):
+# side -1 is the pin 1 row, slot counts pitches from the centre (downwards positive)
+SOT_LAYOUTS: Dict[Tuple[str, int], List[Tuple[int, int]]] = {
+    ("sot-23", 3): [(-1, -1), (-1, 1), (1, 0)],
+    ("sot-23", 5): [(-1, -1), (-1, 0), (-1, 1), (1, 1), (1, -1)],
+    ("sot-223", 4): [(-1, -1), (-1, 0), (-1, 1), (1, 0)],
+}
+
+
+def sot_layout(pkg_type: str, pin_count: int) -> Optional[List[Tuple[int, int]]]:
+    """Pad layout for SOT-23 style (also SOT-323/SC-70) and SOT-223 packages, if tabulated."""
+    if "223" in pkg_type:
+        outline = "sot-223"
+    elif ("sot" in pkg_type and "89" not in pkg_type) or "sc-70" in pkg_type or "sc70" in pkg_type:
+        outline = "sot-23"
+    else:
+        return None
+    return SOT_LAYOUTS.get((outline, pin_count))
+
 
 class FootprintGenerator:
     """Generates KiCAD footprint files (.kicad_mod) from package data."""
 
-    def __init__(self):
-        # IPC-7351B Nominal Density (simplified)
-        self.toe_fillet = 0.35  # mm
-        self.heel_fillet = 0.35 # mm
-        self.side_fillet = 0.05 # mm
-        self.courtyard_excess = 0.25 # mm
+    def __init__(self, density: str = "N"):
+        # IPC-7351B density level: "M" (most), "N" (nominal) or "L" (least)
+        self.density = density
         self.fabrication_tolerance = 0.05 # mm
         self.placement_tolerance = 0.05 # mm
+        self.land_pattern = LandPatternCalculator(self.fabrication_tolerance, self.placement_tolerance)
 
+    @tracer.traced("generation.footprint")
     def generate_footprint(self, package: Package) -> str:
         """
         Generates the S-expression string for a KiCAD footprint.
@@ -26,7 +56,8 @@ class FootprintGenerator:
             String containing the .kicad_mod content.
         """
         name = package.name
-        dims = package.dimensions or {}
+        # Standard packages need no extracted dimensions: missing ones come from the name
+        dims = fill_dimensions(name, package.dimensions)
         
         # Header
         content = [
@@ -44,163 +75,151 @@ class FootprintGenerator:
         ]
 
         # Determine package type and generate pads
-        pkg_type = (package.package_type or "").lower()
+        pkg_type = resolve_package_type(package.package_type, name)
         
-        if "qfn" in pkg_type or "qfp" in pkg_type:
-            content.extend(self._generate_quad_pads(dims))
+        if "bga" in pkg_type or "lga" in pkg_type or "csp" in pkg_type:
+            pad_lines, extent = self._generate_grid_array_pads(dims, package.model_params or {})
+        elif "qfn" in pkg_type or "qfp" in pkg_type:
+            pad_lines, extent = self._generate_quad_pads(dims, pkg_type)
+        elif sot_layout(pkg_type, int(dims.get("pin_count", 0))):
+            pad_lines, extent = self._generate_sot_pads(dims, pkg_type)
         elif "soic" in pkg_type or "sop" in pkg_type or "sot" in pkg_type:
-            content.extend(self._generate_dual_row_pads(dims))
+            pad_lines, extent = self._generate_dual_row_pads(dims, pkg_type)
         else:
             # Fallback or generic handling
-            content.extend(self._generate_dual_row_pads(dims))
+            pad_lines, extent = self._generate_dual_row_pads(dims, pkg_type)
+        content.extend(pad_lines)
 
         # Add Courtyard
-        content.extend(self._generate_courtyard(dims))
+        content.extend(self._generate_courtyard(dims, extent))
 
         content.append('  )') # End footprint
         content.append(')')   # End file
         
         return '\n'.join(content)
 
-    def _calculate_pad_dims(self, lead_len: float, lead_width: float, is_exposed: bool = False) -> Tuple[float, float]:
-        """Calculates pad dimensions based on IPC-7351B formulas."""
-        if is_exposed:
-            # For exposed pads, we usually just match the size or reduce slightly for paste
-            return lead_len, lead_width
-            
-        # Z_max = L_max + 2*J_T + sqrt(Tol_L^2 + Tol_F^2 + Tol_P^2) ... simplified
-        # Pad Length = Lead Length + Toe + Heel
-        pad_len = lead_len + self.toe_fillet + self.heel_fillet
-        
-        # Pad Width = Lead Width + 2 * Side
-        pad_width = lead_width + (2 * self.side_fillet)
-        
-        return pad_len, pad_width
+    def _land_pattern(self, dims: Dict[str, float], pkg_type: str, span_offset: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Calculates IPC-7351B pad geometry for the package leads."""
+        limits = lead_limits(dims, pkg_type)
+        span_min, span_max = limits["lead_span_min"], limits["lead_span_max"]
+        if span_offset is not None:
+            # Quad packages: one span per axis, computed in the same call
+            span_min, span_max = span_min + span_offset, span_max + span_offset
 
-    def _generate_dual_row_pads(self, dims: Dict[str, float]) -> List[str]:
+        return self.land_pattern.calculate(
+            span_min, span_max,
+            limits["lead_length_min"], limits["lead_length_max"],
+            limits["lead_width_min"], limits["lead_width_max"],
+            lead_style=lead_style_for(pkg_type),
+            density=self.density,
+            pitch=limits["pitch"],
+        )
+
+    def _pad_lines(self, numbers: np.ndarray, xs: np.ndarray, ys: np.ndarray,
+                   widths: np.ndarray, heights: np.ndarray) -> List[str]:
+        # Round once for the whole array; +0.0 turns -0.0 into 0.0
+        xs, ys, widths, heights = (np.round(a, 4) + 0.0 for a in (xs, ys, widths, heights))
+        return list(map(PAD_LINE, numbers.tolist(), xs.tolist(), ys.tolist(), widths.tolist(), heights.tolist()))
+
+    def _generate_dual_row_pads(self, dims: Dict[str, float], pkg_type: str = "") -> Tuple[List[str], Tuple[float, float]]:
         lines = []
         
         # Extract dimensions with defaults
         body_w = dims.get("body_width", 4.0)
         body_l = dims.get("body_length", 5.0)
         pitch = dims.get("pitch", 1.27)
-        lead_w = dims.get("lead_width", 0.4)
-        lead_l = dims.get("lead_length", 0.8) # Foot length
         num_pins = int(dims.get("pin_count", 8))
         
-        pad_len, pad_width = self._calculate_pad_dims(lead_l, lead_w)
-        
-        # Calculate X position (center of pad)
-        # Span = Body Width + 2 * Lead Length (approx)
-        # Real IPC calc uses min/max, here we simplify
-        span = body_w + (2 * lead_l)
-        x_pos = (span / 2) + (self.toe_fillet - self.heel_fillet)/2 # Adjust for fillets
+        lp = self._land_pattern(dims, pkg_type)
+        pad_len, pad_width, x_pos = float(lp["pad_length"]), float(lp["pad_width"]), float(lp["pad_center"])
         
         pins_per_side = num_pins // 2
-        total_h = (pins_per_side - 1) * pitch
-        start_y = -(total_h / 2)
-        
-        for i in range(pins_per_side):
-            y = start_y + (i * pitch)
-            
-            # Left side (Pins 1 to N/2)
-            pin_num = i + 1
-            lines.append(
-                f'    (pad "{pin_num}" smd rect (at {-x_pos} {y}) (size {pad_len} {pad_width}) (layers "F.Cu" "F.Paste" "F.Mask"))'
-            )
-            
-            # Right side (Pins N to N/2 + 1)
-            pin_num_right = num_pins - i
-            lines.append(
-                f'    (pad "{pin_num_right}" smd rect (at {x_pos} {y}) (size {pad_len} {pad_width}) (layers "F.Cu" "F.Paste" "F.Mask"))'
-            )
+        idx = np.arange(pins_per_side)
+        y = (idx - (pins_per_side - 1) / 2) * pitch
+
+        # Left side (Pins 1 to N/2, top-down), right side (Pins N to N/2 + 1, top-down)
+        numbers = np.concatenate([idx + 1, num_pins - idx])
+        xs = np.repeat([-x_pos, x_pos], pins_per_side)
+        ys = np.tile(y, 2)
+        order = np.argsort(numbers, kind="stable")
+        lines.extend(self._pad_lines(
+            numbers[order], xs[order], ys[order],
+            np.full(num_pins, pad_len), np.full(num_pins, pad_width)
+        ))
             
-        # Draw Body Outline (Silk)
-        lines.append(
-            f'    (fp_line (start {-body_w/2} {-body_l/2}) (end {body_w/2} {-body_l/2}) (stroke (width 0.12) (type solid)) (layer "F.SilkS"))'
+        lines.extend(self._body_outline(body_w, body_l))
+        
+        extent = (
+            max(body_w, float(lp["z_max"])) + 2 * float(lp["courtyard_excess"]),
+            max(body_l, (pins_per_side - 1) * pitch + pad_width) + 2 * float(lp["courtyard_excess"]),
         )
-        lines.append(
-            f'    (fp_line (start {-body_w/2} {body_l/2}) (end {body_w/2} {body_l/2}) (stroke (width 0.12) (type solid)) (layer "F.SilkS"))'
+        return lines, extent
+
+    def _generate_sot_pads(self, dims: Dict[str, float], pkg_type: str) -> Tuple[List[str], Tuple[float, float]]:
+        """
+        Pads for SOT outlines whose rows hold different pin counts (SOT-23,
+        SOT-23-5, SOT-223), placed from SOT_LAYOUTS. A lone pin with a
+        'tab_width' dimension (the SOT-223 tab) gets a pad that wide plus the
+        usual side fillets.
+        """
+        body_w = dims.get("body_width", 1.3)
+        body_l = dims.get("body_length", 2.9)
+        pitch = dims.get("pitch", 0.95)
+        sides, slots = (np.array(v) for v in zip(*sot_layout(pkg_type, int(dims["pin_count"]))))
+
+        lp = self._land_pattern(dims, pkg_type)
+        pad_len, pad_width, x_pos = float(lp["pad_length"]), float(lp["pad_width"]), float(lp["pad_center"])
+
+        widths = np.full(len(sides), pad_width)
+        if "tab_width" in dims:
+            tab = sides == 1
+            widths[tab] += dims["tab_width"] - dims.get("lead_width", pad_width)
+
+        lines = self._pad_lines(np.arange(1, len(sides) + 1), sides * x_pos, slots * pitch,
+                                np.full(len(sides), pad_len), widths)
+        lines.extend(self._body_outline(body_w, body_l))
+
+        extent = (
+            max(body_w, float(lp["z_max"])) + 2 * float(lp["courtyard_excess"]),
+            max(body_l, float(np.max(np.abs(slots * pitch) + widths / 2)) * 2) + 2 * float(lp["courtyard_excess"]),
         )
-        
-        return lines
+        return lines, extent
 
-    def _generate_quad_pads(self, dims: Dict[str, float]) -> List[str]:
-        # Simplified Quad implementation
+    def _body_outline(self, body_w: float, body_l: float) -> List[str]:
+        """Silkscreen lines along the body edges without leads."""
+        return [
+            f'    (fp_line (start {-body_w/2} {-body_l/2}) (end {body_w/2} {-body_l/2}) (stroke (width 0.12) (type solid)) (layer "F.SilkS"))',
+            f'    (fp_line (start {-body_w/2} {body_l/2}) (end {body_w/2} {body_l/2}) (stroke (width 0.12) (type solid)) (layer "F.SilkS"))',
+        ]
+
+    def _generate_quad_pads(self, dims: Dict[str, float], pkg_type: str = "qfn") -> Tuple[List[str], Tuple[float, float]]:
         lines = []
         body_w = dims.get("body_width", 5.0)
         body_l = dims.get("body_length", 5.0)
         pitch = dims.get("pitch", 0.5)
-        lead_w = dims.get("lead_width", 0.25)
-        lead_l = dims.get("lead_length", 0.4)
         num_pins = int(dims.get("pin_count", 32))
         
-        pad_len, pad_width = self._calculate_pad_dims(lead_l, lead_w)
+        # Leads on the left/right sides span the body width, top/bottom the body length
+        lp = self._land_pattern(dims, pkg_type, span_offset=np.array([0.0, body_l - body_w]))
+        pad_len, pad_width = float(lp["pad_length"][0]), float(lp["pad_width"][0])
+        offset_w, offset_l = (float(v) for v in lp["pad_center"])
         
         pins_per_side = num_pins // 4
+        half_span = (pins_per_side - 1) * pitch / 2
+        step = np.arange(pins_per_side) * pitch - half_span
+        zeros = np.zeros(pins_per_side)
         
-        # Offsets
-        offset_w = (body_w / 2) + (lead_l / 2) # Approx
-        offset_l = (body_l / 2) + (lead_l / 2)
-        
-        # Helper to generate a row
-        def gen_row(start_pin, count, x_fixed, y_start, x_step, y_step, w, h, angle):
-            for i in range(count):
-                x = x_fixed + (i * x_step)
-                y = y_start + (i * y_step)
-                lines.append(
-                    f'    (pad "{start_pin + i}" smd rect (at {x} {y} {angle}) (size {w} {h}) (layers "F.Cu" "F.Paste" "F.Mask"))'
-                )
-
-        span = (pins_per_side - 1) * pitch
-        half_span = span / 2
-        
-        # Left (1 to N/4)
-        gen_row(1, pins_per_side, -offset_w, -half_span, 0, pitch, pad_len, pad_width, 0)
-        
-        # Bottom (N/4+1 to N/2)
-        gen_row(pins_per_side + 1, pins_per_side, -half_span, offset_l, pitch, 0, pad_width, pad_len, 0)
-        
-        # Right (N/2+1 to 3N/4) - Order is usually bottom-up or top-down depending on numbering.
-        # Standard QFN is CCW.
-        # Right side goes Bottom to Top? No, usually Top to Bottom is standard for dual, but Quad is CCW.
-        # 1..N Left (Top-Down)
-        # N..2N Bottom (Left-Right)
-        # 2N..3N Right (Bottom-Top)
-        # 3N..4N Top (Right-Left)
-        
-        # Let's assume CCW starting Top-Left
-        
-        # Re-doing logic for CCW standard
-        # Left: -X, Y varies
-        # Bottom: X varies, +Y
-        # Right: +X, Y varies
-        # Top: X varies, -Y
-        
-        # Left (Top to Bottom)
-        gen_row(1, pins_per_side, -offset_w, -half_span, 0, pitch, pad_len, pad_width, 0)
-        
-        # Bottom (Left to Right)
-        gen_row(pins_per_side + 1, pins_per_side, -half_span, offset_l, pitch, 0, pad_width, pad_len, 0)
-        
-        # Right (Bottom to Top)
-        # Note: KiCAD rotation 0 means width is X.
-        # For Right side, we want pad_len to be width-wise.
-        # Y goes from +half_span to -half_span
-        for i in range(pins_per_side):
-            pin = pins_per_side * 2 + 1 + i
-            y = half_span - (i * pitch)
-            lines.append(
-                f'    (pad "{pin}" smd rect (at {offset_w} {y}) (size {pad_len} {pad_width}) (layers "F.Cu" "F.Paste" "F.Mask"))'
-            )
-            
-        # Top (Right to Left)
-        for i in range(pins_per_side):
-            pin = pins_per_side * 3 + 1 + i
-            x = half_span - (i * pitch)
-            lines.append(
-                f'    (pad "{pin}" smd rect (at {x} {-offset_l}) (size {pad_width} {pad_len}) (layers "F.Cu" "F.Paste" "F.Mask"))'
-            )
+        # Standard QFN numbering is CCW starting top-left:
+        # Left (top to bottom), Bottom (left to right), Right (bottom to top), Top (right to left)
+        # KiCAD rotation 0 means size X is the first value, so left/right pads
+        # are long in X and top/bottom pads are long in Y.
+        xs = np.concatenate([zeros - offset_w, step, zeros + offset_w, -step])
+        ys = np.concatenate([step, zeros + offset_l, -step, zeros - offset_l])
+        horizontal = np.repeat([True, False, True, False], pins_per_side)
+        widths = np.where(horizontal, pad_len, pad_width)
+        heights = np.where(horizontal, pad_width, pad_len)
+        numbers = np.arange(1, 4 * pins_per_side + 1)
+        lines.extend(self._pad_lines(numbers, xs, ys, widths, heights))
 
         # Body Outline
         lines.append(
@@ -216,17 +235,109 @@ class FootprintGenerator:
             f'    (fp_line (start {-body_w/2} {body_l/2}) (end {-body_w/2} {-body_l/2}) (stroke (width 0.12) (type solid)) (layer "F.SilkS"))'
         )
 
-        return lines
+        excess = 2 * float(lp["courtyard_excess"][0])
+        extent = (
+            max(body_w, float(lp["z_max"][0])) + excess,
+            max(body_l, float(lp["z_max"][1])) + excess,
+        )
+        return lines, extent
 
-    def _generate_courtyard(self, dims: Dict[str, float]) -> List[str]:
-        # Simple bounding box + excess
-        body_w = dims.get("body_width", 5.0)
-        body_l = dims.get("body_length", 5.0)
-        
-        # Assume max span includes pads
-        # This is a rough approximation
-        w = body_w + 2.0 # Arbitrary padding if lead_len unknown
-        l = body_l + 2.0
+    def _generate_grid_array_pads(self, dims: Dict[str, float], model_params: Dict[str, Any]) -> Tuple[List[str], Tuple[float, float]]:
+        """
+        Ball grid array pads with A1-style names.
+
+        Geometry comes from dimensions ('pitch', 'rows', 'columns' or 'pin_count',
+        'ball_diameter', 'perimeter_rows', 'center_rows', 'center_columns',
+        'stagger'); individually depopulated balls are listed by name in
+        model_params['depopulated_balls'].
+        """
+        lines = []
+        pitch = dims.get("pitch", 1.0)
+        pin_count = int(dims.get("pin_count", 0))
+        side = max(math.ceil(math.sqrt(pin_count)), 1) if pin_count else 10
+        rows = int(dims.get("rows", side))
+        cols = int(dims.get("columns", rows if "rows" in dims else side))
+        body_w = dims.get("body_width", cols * pitch)
+        body_l = dims.get("body_length", rows * pitch)
+        ball = dims.get("ball_diameter", 0.6 * pitch)
+
+        names, xs, ys = self._grid_positions(rows, cols, pitch, dims, model_params.get("depopulated_balls", []))
+        land = round(ball * self._ball_land_factor(ball), 3)
+        sizes = np.full(len(names), land)
+        xs, ys = np.round(xs, 4) + 0.0, np.round(ys, 4) + 0.0
+        lines.extend(map(BALL_LINE, names.tolist(), xs.tolist(), ys.tolist(), sizes.tolist(), sizes.tolist()))
+
+        # Body outline with a chamfered A1 corner
+        hw, hl = body_w / 2, body_l / 2
+        chamfer = min(1.0, hw, hl)
+        outline = [(-hw + chamfer, -hl), (hw, -hl), (hw, hl), (-hw, hl), (-hw, -hl + chamfer), (-hw + chamfer, -hl)]
+        for (x0, y0), (x1, y1) in zip(outline, outline[1:]):
+            lines.append(
+                f'    (fp_line (start {x0:g} {y0:g}) (end {x1:g} {y1:g}) (stroke (width 0.12) (type solid)) (layer "F.SilkS"))'
+            )
+
+        excess = 2 * FILLET_TABLES["flat_no_lead"][self.density][3]
+        return lines, (body_w + excess, body_l + excess)
+
+    def _grid_positions(self, rows: int, cols: int, pitch: float, dims: Dict[str, float],
+                        depopulated: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Computes names and coordinates of all populated balls in one array pass."""
+        r, c = np.indices((rows, cols))
+        mask = np.ones((rows, cols), dtype=bool)
+
+        # Peripheral arrays: only the outer N rings are populated
+        perimeter = int(dims.get("perimeter_rows", 0))
+        if perimeter:
+            ring = np.minimum(np.minimum(r, rows - 1 - r), np.minimum(c, cols - 1 - c))
+            mask &= ring < perimeter
+
+        # Centered depopulated block
+        center_rows = int(dims.get("center_rows", 0))
+        center_cols = int(dims.get("center_columns", center_rows))
+        if center_rows and center_cols:
+            r0, c0 = (rows - center_rows) // 2, (cols - center_cols) // 2
+            mask[r0:r0 + center_rows, c0:c0 + center_cols] = False
+
+        # Staggered grids populate every other site, checkerboard fashion
+        if dims.get("stagger"):
+            mask &= (r + c) % 2 == 0
+
+        row_names = np.array(self._grid_row_names(rows))
+        col_names = np.array([str(i + 1) for i in range(cols)])
+        grid_names = np.char.add(row_names[:, None], col_names[None, :])
+
+        if depopulated:
+            mask &= ~np.isin(grid_names, list(depopulated))
+
+        xs = (c[mask] - (cols - 1) / 2) * pitch
+        ys = (r[mask] - (rows - 1) / 2) * pitch
+        return grid_names[mask], xs, ys
+
+    def _grid_row_names(self, rows: int) -> List[str]:
+        # A..Y, then AA, AB, ... as used by JEDEC for large arrays
+        letters = GRID_ROW_LETTERS
+        names = list(letters)
+        for first in letters:
+            if len(names) >= rows:
+                break
+            names.extend(first + second for second in letters)
+        return names[:rows]
+
+    def _ball_land_factor(self, ball_diameter: float) -> float:
+        # IPC-7351B land reduction for collapsing balls
+        if ball_diameter >= 0.75:
+            return 0.75
+        if ball_diameter >= 0.4:
+            return 0.8
+        return 0.85
+
+    def _generate_courtyard(self, dims: Dict[str, float], extent: Optional[Tuple[float, float]] = None) -> List[str]:
+        # Bounding box of body and pads plus the IPC courtyard excess
+        if extent is None:
+            w = dims.get("body_width", 5.0) + 2.0 # Arbitrary padding if pads unknown
+            l = dims.get("body_length", 5.0) + 2.0
+        else:
+            w, l = (round(v, 2) for v in extent)
         
         lines = [
             f'    (fp_rect (start {-w/2} {-l/2}) (end {w/2} {l/2}) (stroke (width 0.05) (type default)) (layer "F.CrtYd"))'
@@ -0,0 +1,215 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import tempfile
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from src.models.data_models import Package
+from src.generators.footprint_generator import FootprintGenerator
+from src.generators.package_names import geometry_key
+from src.generators.sexpr import footprint_from_text, is_equivalent
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".footprint_hashes.json"
+WRITE_BUFFER_SIZE = 1 << 16
+
+_worker_generator: Optional[FootprintGenerator] = None
+
+
+def footprint_filename(package: Package) -> str:
+    """Returns a filesystem-safe .kicad_mod filename for the package."""
+    safe = re.sub(r'[^A-Za-z0-9_.+-]', '_', package.name).strip('.') or "footprint"
+    return f"{safe}.kicad_mod"
+
+
+def _init_worker(density: str) -> None:
+    global _worker_generator
+    _worker_generator = FootprintGenerator(density=density)
+
+
+def _write_chunk(library_dir: str, items: List[Tuple[dict, Optional[str]]]) -> List[Tuple[str, Optional[str], str]]:
+    """
+    Generates and writes a chunk of footprints inside a worker.
+
+    Args:
+        library_dir: Target .pretty directory.
+        items: (package dict, previously written content hash) pairs.
+
+    Returns:
+        (filename, content hash, status) per item; status is 'written',
+        'unchanged' or 'failed: <reason>'.
+    """
+    results = []
+    for package_data, known_hash in items:
+        package = Package(**package_data)
+        filename = footprint_filename(package)
+        try:
+            data = _worker_generator.generate_footprint(package).encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+            path = os.path.join(library_dir, filename)
+
+            if os.path.exists(path) and (digest == known_hash or _same_footprint(path, data)):
+                results.append((filename, digest, "unchanged"))
+                continue
+
+            _atomic_write(library_dir, path, data)
+            results.append((filename, digest, "written"))
+        except Exception as e:
+            results.append((filename, None, f"failed: {e}"))
+    return results
+
+
+def _atomic_write(library_dir: str, path: str, data: bytes) -> None:
+    # Packages sharing a name (many 'SOIC-8') can land in different workers,
+    # so every write needs its own temp file
+    fd, tmp_path = tempfile.mkstemp(dir=library_dir, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _same_footprint(path: str, data: bytes) -> bool:
+    # Files not in the manifest (or edited since) are compared structurally,
+    # so reformatting or a KiCAD re-save does not force a rewrite.
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            existing = f.read()
+        return is_equivalent(footprint_from_text(existing), footprint_from_text(data.decode('utf-8')))
+    except (OSError, UnicodeDecodeError, ValueError):
+        return False
+
+
+class FootprintLibraryWriter:
+    """
+    Streams .kicad_mod files for many packages into a KiCAD .pretty library.
+
+    Content hashes of written footprints are kept in a manifest inside the
+    library, so unchanged footprints are never rewritten.
+    """
+
+    def __init__(self, library_dir: str, density: str = "N", workers: Optional[int] = None,
+                 chunk_size: int = 256):
+        """
+        Args:
+            library_dir: Path of the .pretty directory (created if missing).
+            density: IPC-7351B density level passed to FootprintGenerator.
+            workers: Process pool size. None uses os.cpu_count(); 1 runs in-process.
+            chunk_size: Packages handed to a worker per task.
+        """
+        self.library_dir = library_dir
+        self.density = density
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.manifest_path = os.path.join(library_dir, MANIFEST_NAME)
+
+    def write_library(self, packages: Iterable[Package]) -> Dict[str, int]:
+        """
+        Generates footprints for all packages and writes the changed ones.
+
+        The iterable is consumed lazily, so arbitrarily large libraries can be
+        streamed from the database without materializing them.
+
+        Returns:
+            Counts of 'written', 'unchanged' and 'failed' footprints.
+        """
+        os.makedirs(self.library_dir, exist_ok=True)
+        manifest = self._load_manifest()
+        stats = {"written": 0, "unchanged": 0, "failed": 0}
+
+        for results in self._run(self._chunks(packages, manifest)):
+            for filename, digest, status in results:
+                if status.startswith("failed"):
+                    logger.error(f"Footprint {filename} {status}")
+                    stats["failed"] += 1
+                    continue
+                manifest[filename] = digest
+                stats[status] += 1
+
+        self._save_manifest(manifest)
+        logger.info(f"Footprint library {self.library_dir}: {stats}")
+        return stats
+
+    def _chunks(self, packages: Iterable[Package], manifest: Dict[str, str]) -> Iterator[List[Tuple[dict, Optional[str]]]]:
+        seen: Set[Tuple[str, str]] = set()
+        claimed: Set[str] = set()
+        iterator = iter(packages)
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            items = []
+            for package in chunk:
+                package = self._claim_filename(package, seen, claimed)
+                if package is not None:
+                    items.append((package.model_dump(), manifest.get(footprint_filename(package))))
+            if items:
+                yield items
+
+    @staticmethod
+    def _claim_filename(package: Package, seen: Set[Tuple[str, str]], claimed: Set[str]) -> Optional[Package]:
+        """
+        Resolves filename collisions before packages are handed to workers.
+
+        Chunks run on different workers, so two packages writing the same file
+        would race and the manifest could disagree with the file on disk.
+        Repeats of a package are dropped; a different package with the same
+        filename gets a geometry suffix, as in PackageRegistry.
+
+        Returns:
+            The package to write, possibly renamed, or None for a repeat.
+        """
+        key = geometry_key(package)
+        if (package.name, key) in seen:
+            return None
+        seen.add((package.name, key))
+        filename = footprint_filename(package)
+        if filename in claimed:
+            package = package.model_copy(update={"name": f"{package.name}_{key[:8]}"})
+            logger.warning(f"Footprint {filename} is taken by a different package; "
+                           f"writing {footprint_filename(package)}")
+        claimed.add(footprint_filename(package))
+        return package
+
+    def _run(self, chunks: Iterator[List[Tuple[dict, Optional[str]]]]) -> Iterator[List[Tuple[str, Optional[str], str]]]:
+        if self.workers == 1:
+            _init_worker(self.density)
+            for chunk in chunks:
+                yield _write_chunk(self.library_dir, chunk)
+            return
+
+        # Keep a bounded number of chunks in flight so the input stays lazy
+        max_pending = self.workers * 2
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.density,)) as pool:
+            pending: List[Future] = []
+            for chunk in chunks:
+                pending.append(pool.submit(_write_chunk, self.library_dir, chunk))
+                if len(pending) >= max_pending:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+
+    def _load_manifest(self) -> Dict[str, str]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable footprint manifest: {e}")
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, str]) -> None:
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,244 @@
+from typing import Dict, Iterable, List, Optional, Union
+import numpy as np
+from src.models.data_models import Package
+
+ArrayLike = Union[float, Iterable[float], np.ndarray]
+
+DENSITY_LEVELS = ("M", "N", "L")  # Most (A), Nominal (B), Least (C)
+
+# IPC-7351B solder fillet goals: (toe, heel, side, courtyard excess) per density level
+FILLET_TABLES: Dict[str, Dict[str, tuple]] = {
+    "gull_wing": {
+        "M": (0.55, 0.45, 0.05, 0.50),
+        "N": (0.35, 0.35, 0.03, 0.25),
+        "L": (0.15, 0.25, 0.01, 0.10),
+    },
+    # Gull-wing leads with pitch <= 0.625 mm use reduced side fillets
+    "gull_wing_fine_pitch": {
+        "M": (0.55, 0.45, 0.01, 0.50),
+        "N": (0.35, 0.35, -0.02, 0.25),
+        "L": (0.15, 0.25, -0.04, 0.10),
+    },
+    "flat_no_lead": {
+        "M": (0.40, 0.00, -0.04, 0.50),
+        "N": (0.30, 0.00, -0.04, 0.25),
+        "L": (0.20, 0.00, -0.04, 0.10),
+    },
+    "j_lead": {
+        "M": (0.55, 0.10, 0.05, 0.50),
+        "N": (0.35, 0.00, 0.03, 0.25),
+        "L": (0.15, -0.10, 0.01, 0.10),
+    },
+    "chip": {
+        "M": (0.55, -0.05, 0.05, 0.50),
+        "N": (0.35, -0.05, 0.00, 0.25),
+        "L": (0.15, -0.05, -0.05, 0.10),
+    },
+}
+
+FINE_PITCH_LIMIT = 0.625  # mm
+
+
+def lead_style_for(package_type: Optional[str]) -> str:
+    """Maps a package type to its IPC-7351 lead style."""
+    pkg_type = (package_type or "").lower()
+    if "qfn" in pkg_type or "dfn" in pkg_type or "son" in pkg_type:
+        return "flat_no_lead"
+    if "soj" in pkg_type or "plcc" in pkg_type:
+        return "j_lead"
+    if pkg_type in ("chip", "resistor", "capacitor") or pkg_type.startswith(("0402", "0603", "0805", "1206")):
+        return "chip"
+    return "gull_wing"
+
+
+class LandPatternCalculator:
+    """
+    Vectorized IPC-7351B land pattern calculator.
+
+    All inputs broadcast as NumPy arrays, so a single call computes the pads
+    for one lead, every lead of a package, or a whole library of packages.
+    """
+
+    def __init__(self, fabrication_tolerance: float = 0.05, placement_tolerance: float = 0.05,
+                 round_off: float = 0.01):
+        """
+        Args:
+            fabrication_tolerance: Board fabrication tolerance F (mm).
+            placement_tolerance: Part placement tolerance P (mm).
+            round_off: Pad dimensions are rounded to this grid (mm). 0 disables rounding.
+        """
+        self.fabrication_tolerance = fabrication_tolerance
+        self.placement_tolerance = placement_tolerance
+        self.round_off = round_off
+
+    def fillets(self, lead_style: str, density: Union[str, Iterable[str]] = "N",
+                pitch: Optional[ArrayLike] = None, lead_ndim: int = 0) -> Dict[str, np.ndarray]:
+        """
+        Looks up fillet goals for one or several density levels.
+
+        Returns:
+            Dict with 'toe', 'heel', 'side' and 'courtyard' arrays, shaped to
+            broadcast against lead arrays of `lead_ndim` dimensions. A sequence
+            of densities adds a leading density axis.
+        """
+        if lead_style not in FILLET_TABLES:
+            raise ValueError(f"Unknown lead style: {lead_style}")
+
+        levels = [density] if isinstance(density, str) else list(density)
+        shape = (4,) + ((len(levels),) if not isinstance(density, str) else ()) + (1,) * lead_ndim
+
+        def lookup(style: str) -> np.ndarray:
+            return np.array([FILLET_TABLES[style][d] for d in levels]).T.reshape(shape)
+
+        table = lookup(lead_style)
+        if lead_style == "gull_wing" and pitch is not None:
+            is_fine = np.asarray(pitch, dtype=float) <= FINE_PITCH_LIMIT
+            table = np.where(is_fine, lookup("gull_wing_fine_pitch"), table)
+
+        toe, heel, side, courtyard = table
+        return {"toe": toe, "heel": heel, "side": side, "courtyard": courtyard}
+
+    def calculate(self,
+                  lead_span_min: ArrayLike, lead_span_max: ArrayLike,
+                  lead_length_min: ArrayLike, lead_length_max: ArrayLike,
+                  lead_width_min: ArrayLike, lead_width_max: ArrayLike,
+                  lead_style: str = "gull_wing",
+                  density: Union[str, Iterable[str]] = "N",
+                  pitch: Optional[ArrayLike] = None) -> Dict[str, np.ndarray]:
+        """
+        Computes Zmax, Gmin and Xmax with RMS tolerance stacking.
+
+        Zmax = Lmin + 2*Jt + sqrt(CL^2 + F^2 + P^2)
+        Gmin = Smax - 2*Jh - sqrt(CS^2 + F^2 + P^2)
+        Xmax = Wmin + 2*Js + sqrt(CW^2 + F^2 + P^2)
+
+        Args:
+            lead_span_min, lead_span_max: Overall toe-to-toe lead span L (mm).
+            lead_length_min, lead_length_max: Terminal (foot) length T (mm).
+            lead_width_min, lead_width_max: Terminal width W (mm).
+            lead_style: Key into FILLET_TABLES.
+            density: 'M', 'N' or 'L', or a sequence of levels to compute at once.
+            pitch: Lead pitch, used to pick fine-pitch gull-wing fillets.
+
+        Returns:
+            Dict of arrays: 'z_max', 'g_min', 'x_max', 'pad_length', 'pad_width',
+            'pad_center' (distance from the package center to the pad center) and
+            'courtyard_excess'.
+        """
+        l_min, l_max = np.asarray(lead_span_min, float), np.asarray(lead_span_max, float)
+        t_min, t_max = np.asarray(lead_length_min, float), np.asarray(lead_length_max, float)
+        w_min, w_max = np.asarray(lead_width_min, float), np.asarray(lead_width_max, float)
+
+        lead_ndim = max(np.ndim(v) for v in (l_min, l_max, t_min, t_max, w_min, w_max,
+                                             0.0 if pitch is None else pitch))
+        f = self.fillets(lead_style, density, pitch, lead_ndim)
+        board_sq = self.fabrication_tolerance ** 2 + self.placement_tolerance ** 2
+
+        c_l = l_max - l_min
+        c_t = t_max - t_min
+        c_w = w_max - w_min
+
+        # Inner heel-to-heel distance S; its raw tolerance stacks L and both Ts,
+        # so IPC replaces it with the RMS of those tolerances.
+        s_min = l_min - 2 * t_max
+        s_max = l_max - 2 * t_min
+        c_s_rms = np.sqrt(c_l ** 2 + 2 * c_t ** 2)
+        s_max = s_max - ((s_max - s_min) - c_s_rms) / 2
+
+        z_max = l_min + 2 * f["toe"] + np.sqrt(c_l ** 2 + board_sq)
+        g_min = s_max - 2 * f["heel"] - np.sqrt(c_s_rms ** 2 + board_sq)
+        x_max = w_min + 2 * f["side"] + np.sqrt(c_w ** 2 + board_sq)
+
+        z_max = self._round(z_max, np.ceil)
+        g_min = self._round(g_min, np.floor)
+        x_max = self._round(x_max, np.ceil)
+
+        return {
+            "z_max": z_max,
+            "g_min": g_min,
+            "x_max": x_max,
+            "pad_length": (z_max - g_min) / 2,
+            "pad_width": x_max,
+            "pad_center": (z_max + g_min) / 4,
+            "courtyard_excess": np.broadcast_to(f["courtyard"], np.shape(z_max)),
+        }
+
+    def calculate_nominal(self, lead_span: ArrayLike, lead_length: ArrayLike, lead_width: ArrayLike,
+                          tolerance: ArrayLike = 0.0, **kwargs) -> Dict[str, np.ndarray]:
+        """Convenience wrapper for nominal dimensions with a symmetric +/- tolerance."""
+        tol = np.asarray(tolerance, float)
+        span, length, width = (np.asarray(v, float) for v in (lead_span, lead_length, lead_width))
+        return self.calculate(span - tol, span + tol, length - tol, length + tol,
+                              width - tol, width + tol, **kwargs)
+
+    def calculate_packages(self, packages: List[Package], density: Union[str, Iterable[str]] = "N") -> Dict[str, np.ndarray]:
+        """
+        Computes land patterns for many packages in one batched call per lead style.
+
+        Returns:
+            Dict of arrays indexed like `packages` (with a leading density axis
+            when several densities are requested), plus 'lead_style'.
+        """
+        count = len(packages)
+        fields = ("lead_span_min", "lead_span_max", "lead_length_min", "lead_length_max",
+                  "lead_width_min", "lead_width_max", "pitch")
+        columns = {k: np.empty(count) for k in fields}
+        styles = np.empty(count, dtype=object)
+
+        for i, package in enumerate(packages):
+            limits = lead_limits(package.dimensions or {}, package.package_type)
+            for k in fields:
+                columns[k][i] = limits[k]
+            styles[i] = lead_style_for(package.package_type)
+
+        result: Dict[str, np.ndarray] = {}
+        for style in set(styles):
+            mask = styles == style
+            part = self.calculate(*(columns[k][mask] for k in fields[:-1]),
+                                  lead_style=style, density=density, pitch=columns["pitch"][mask])
+            for key, values in part.items():
+                if key not in result:
+                    result[key] = np.empty(values.shape[:-1] + (count,))
+                result[key][..., mask] = values
+        result["lead_style"] = styles
+        return result
+
+    def _round(self, values: np.ndarray, func) -> np.ndarray:
+        if not self.round_off:
+            return values
+        # Round to the grid after removing float noise (e.g. 5.0000000001)
+        return func(np.round(values / self.round_off, 6)) * self.round_off
+
+
+def lead_limits(dims: Dict[str, float], package_type: Optional[str] = None) -> Dict[str, float]:
+    """
+    Derives min/max lead dimensions from a Package.dimensions dict.
+
+    Explicit '<name>_min' / '<name>_max' keys win; otherwise the nominal value
+    is used for both limits. The lead span defaults to the body width plus two
+    lead lengths, matching the footprint generator's historical approximation.
+    """
+    style = lead_style_for(package_type)
+    defaults = {
+        "body_width": 5.0 if style == "flat_no_lead" else 4.0,
+        "lead_length": 0.4 if style == "flat_no_lead" else 0.8,
+        "lead_width": 0.25 if style == "flat_no_lead" else 0.4,
+        "pitch": 0.5 if style == "flat_no_lead" else 1.27,
+    }
+
+    def nominal(name: str) -> float:
+        return float(dims.get(name, defaults.get(name, 0.0)))
+
+    lead_length = nominal("lead_length")
+    if style == "flat_no_lead":
+        # No-lead terminals sit under the body edge: span equals body size
+        span = float(dims.get("lead_span", nominal("body_width")))
+    else:
+        span = float(dims.get("lead_span", nominal("body_width") + 2 * lead_length))
+
+    nominals = {"lead_span": span, "lead_length": lead_length, "lead_width": nominal("lead_width")}
+    limits = {"pitch": nominal("pitch")}
+    for name, value in nominals.items():
+        limits[f"{name}_min"] = float(dims.get(f"{name}_min", value))
+        limits[f"{name}_max"] = float(dims.get(f"{name}_max", value))
+    return limits
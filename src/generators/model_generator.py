@@ -1,77 +1,389 @@
 import os
-from typing import Dict, Any, Optional
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, Future
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
 from src.models.data_models import Package
+from src.lazy_import import lazy_import, is_available
+from src.telemetry import tracer
+from src.generators.package_names import fill_dimensions, geometry_key, resolve_package_type
+
+# CadQuery/OCCT takes seconds to import, so it is loaded on first model build
+cq = lazy_import("cadquery")
+HAS_CQ = is_available("cadquery")
+
+logger = logging.getLogger(__name__)
+
+# Bump when the builders change so cached solids are not reused
+MODEL_VERSION = 2
+
+# KiCAD reads VRML in units of 0.1 inch
+VRML_SCALE = 1 / 2.54
+VRML_BODY_COLOR = (0.15, 0.15, 0.15)
+
+_worker_generator: Optional["ModelGenerator"] = None
+
+
+def model_cache_key(package: Package) -> str:
+    """
+    Cache key of a package's model: its geometry_key() salted with MODEL_VERSION.
+
+    Packages with the same geometry (e.g. every SOIC-8 with the same body)
+    share a key regardless of name, dict ordering or float noise.
+    """
+    return geometry_key(package, version=str(MODEL_VERSION))
+
+
+def decimate_mesh(vertices: np.ndarray, triangles: np.ndarray, max_triangles: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces a triangle mesh to at most `max_triangles` by vertex clustering.
+
+    Vertices are snapped to a uniform grid and merged per cell (at their
+    mean position); triangles that collapse are dropped. The grid is
+    coarsened until the budget is met.
+
+    Args:
+        vertices: (N, 3) float array.
+        triangles: (M, 3) int array of vertex indices.
+        max_triangles: Triangle budget; must be positive.
+
+    Returns:
+        The decimated (vertices, triangles).
+
+    Raises:
+        ValueError: If `max_triangles` is not positive; no clustering reaches it.
+    """
+    if max_triangles <= 0:
+        raise ValueError(f"max_triangles must be positive, got {max_triangles}")
+    if len(triangles) <= max_triangles:
+        return vertices, triangles
+
+    origin = vertices.min(axis=0)
+    cell = float(np.ptp(vertices, axis=0).max()) / 256 or 1.0
+    while True:
+        cells = np.floor((vertices - origin) / cell).astype(np.int64)
+        _, cluster = np.unique(cells, axis=0, return_inverse=True)
+        cluster = cluster.reshape(-1)
+        counts = np.bincount(cluster)
+        merged = np.zeros((counts.size, 3))
+        np.add.at(merged, cluster, vertices)
+        merged /= counts[:, None]
+
+        tris = cluster[triangles]
+        tris = tris[(tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 0] != tris[:, 2])]
+        # Drop duplicate faces that clustering folded onto each other
+        _, first = np.unique(np.sort(tris, axis=1), axis=0, return_index=True)
+        tris = tris[np.sort(first)]
+        if len(tris) <= max_triangles:
+            break
+        cell *= 1.5
+
+    # Compact away vertices no longer referenced
+    used, tris = np.unique(tris, return_inverse=True)
+    return merged[used], tris.reshape(-1, 3)
+
+
+def write_vrml(vertices: np.ndarray, triangles: np.ndarray,
+               color: Tuple[float, float, float] = VRML_BODY_COLOR) -> bytes:
+    """
+    Serializes a mesh (in mm) as a VRML 2.0 IndexedFaceSet in KiCAD units.
+    """
+    points = np.round(vertices * VRML_SCALE, 5) + 0.0
+    point_text = ",".join(" ".join(f"{c:g}" for c in row) for row in points.tolist())
+    index_text = ",".join(f"{a},{b},{c},-1" for a, b, c in triangles.tolist())
+    r, g, b = color
+    return (
+        "#VRML V2.0 utf8\n"
+        "Shape {\n"
+        f"appearance Appearance {{material Material {{diffuseColor {r:g} {g:g} {b:g} "
+        "specularColor 0.3 0.3 0.3 shininess 0.2}}\n"
+        "geometry IndexedFaceSet {\n"
+        "creaseAngle 0.5\n"
+        f"coord Coordinate {{point [{point_text}]}}\n"
+        f"coordIndex [{index_text}]\n"
+        "}\n"
+        "}\n"
+    ).encode('utf-8')
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    # CadQuery/OCCT import once per worker process, not per model
+    global _worker_generator
+    _worker_generator = ModelGenerator(**options)
+
+
+def _build_chunk(items: List[Tuple[str, dict]]) -> List[Tuple[str, Optional[Dict[str, bytes]], Optional[str]]]:
+    """
+    Builds model data for a chunk of unique geometries inside a worker.
+
+    Returns:
+        (cache key, {extension: bytes} or None, error message or None) per item.
+    """
+    results = []
+    for key, package_data in items:
+        try:
+            results.append((key, _worker_generator.build_exports(Package(**package_data)), None))
+        except Exception as e:
+            results.append((key, None, str(e)))
+    return results
 
-try:
-    import cadquery as cq
-    HAS_CQ = True
-except ImportError:
-    HAS_CQ = False
 
 class ModelGenerator:
     """Generates 3D models (.step, .wrl) using CadQuery."""
 
-    def __init__(self):
-        pass
+    def __init__(self, cache_dir: Optional[str] = None, export_wrl: bool = True,
+                 wrl_tolerance: float = 0.01, wrl_angular_tolerance: float = 0.2,
+                 max_triangles: Optional[int] = 2000):
+        """
+        Args:
+            cache_dir: Optional directory for model data shared across runs,
+                keyed by model_cache_key(). Built models are always cached in
+                memory for the lifetime of the generator.
+            export_wrl: Also write a .wrl mesh next to each STEP model.
+            wrl_tolerance: Linear tessellation tolerance (mm).
+            wrl_angular_tolerance: Angular tessellation tolerance (rad).
+            max_triangles: Triangle budget per WRL mesh; None disables decimation.
+        """
+        if max_triangles is not None and max_triangles <= 0:
+            raise ValueError(f"max_triangles must be positive or None, got {max_triangles}")
+        self.cache_dir = cache_dir
+        self.export_wrl = export_wrl
+        self.wrl_tolerance = wrl_tolerance
+        self.wrl_angular_tolerance = wrl_angular_tolerance
+        self.max_triangles = max_triangles
+        self._cache: Dict[str, bytes] = {}
+        self._mesh_cache: Dict[Tuple[str, float, float], Tuple[np.ndarray, np.ndarray]] = {}
 
+    @property
+    def formats(self) -> Tuple[str, ...]:
+        return ("step", "wrl") if self.export_wrl else ("step",)
+
+    @tracer.traced("generation.model")
     def generate_model(self, package: Package, output_dir: str) -> bool:
         """
         Generates STEP and WRL models for the package.
-        
+
         Args:
             package: The package metadata.
             output_dir: Directory to save the models.
-            
+
         Returns:
             True if successful, False otherwise.
         """
-        if not HAS_CQ:
-            print("Warning: CadQuery not installed. Skipping 3D model generation.")
-            return False
-
-        name = package.name
-        dims = package.dimensions or {}
-        pkg_type = (package.package_type or "").lower()
-        
+        key = model_cache_key(package)
+        exports = self._cached_exports(key)
+        if exports is None:
+            if not HAS_CQ:
+                logger.warning("CadQuery not installed. Skipping 3D model generation.")
+                return False
+            try:
+                exports = self.build_exports(package)
+            except Exception as e:
+                logger.error(f"Error generating model for {package.name}: {e}")
+                return False
+            self._store_exports(key, exports)
+
+        self._write_model(output_dir, package.name, exports)
+        return True
+
+    @tracer.traced("generation.models")
+    def generate_models(self, packages: Iterable[Package], output_dir: str,
+                        workers: Optional[int] = None, chunk_size: int = 16) -> Dict[str, int]:
+        """
+        Generates STEP (and WRL) models for many packages across a process pool.
+
+        Packages are deduplicated by model_cache_key(), so each distinct
+        geometry is built once and its model data written for every package
+        that shares it.
+
+        Args:
+            packages: Packages to generate models for.
+            output_dir: Directory to save the models.
+            workers: Process pool size. None uses os.cpu_count(); 1 runs in-process.
+            chunk_size: Unique geometries handed to a worker per task.
+
+        Returns:
+            Counts of 'built' geometries, 'cached' geometries served from the
+            cache, 'written' model files and 'failed' packages.
+        """
+        stats = {"built": 0, "cached": 0, "written": 0, "failed": 0}
+        by_key: Dict[str, List[Package]] = {}
+        for package in packages:
+            by_key.setdefault(model_cache_key(package), []).append(package)
+
+        to_build: List[Tuple[str, dict]] = []
+        for key, group in by_key.items():
+            exports = self._cached_exports(key)
+            if exports is None:
+                to_build.append((key, group[0].model_dump()))
+                continue
+            stats["cached"] += 1
+            for package in group:
+                self._write_model(output_dir, package.name, exports)
+                stats["written"] += 1
+
+        if to_build and not HAS_CQ:
+            logger.warning("CadQuery not installed. Skipping 3D model generation.")
+            stats["failed"] += sum(len(by_key[key]) for key, _ in to_build)
+            return stats
+
+        for results in self._run(self._chunks(to_build, chunk_size), workers or os.cpu_count() or 1):
+            for key, exports, error in results:
+                group = by_key[key]
+                if exports is None:
+                    logger.error(f"Error generating model for {group[0].name}: {error}")
+                    stats["failed"] += len(group)
+                    continue
+                stats["built"] += 1
+                self._store_exports(key, exports)
+                for package in group:
+                    self._write_model(output_dir, package.name, exports)
+                    stats["written"] += 1
+
+        logger.info(f"3D models in {output_dir}: {stats}")
+        return stats
+
+    def build_exports(self, package: Package) -> Dict[str, bytes]:
+        """Builds the package solid once and returns data for every enabled format."""
+        model = self.build_solid(package)
+        exports = {"step": self._export_step(model)}
+        if self.export_wrl:
+            exports["wrl"] = self._export_wrl(model, model_cache_key(package))
+        return exports
+
+    def build_step(self, package: Package) -> bytes:
+        """Builds the package solid and returns it as STEP data."""
+        return self._export_step(self.build_solid(package))
+
+    def build_wrl(self, package: Package) -> bytes:
+        """Builds the package solid and returns it as a decimated VRML mesh."""
+        return self._export_wrl(self.build_solid(package), model_cache_key(package))
+
+    def tessellate(self, model: Any, key: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tessellates a CadQuery model at the configured tolerances.
+
+        Meshes are cached per geometry key and tolerance, so different
+        triangle budgets reuse one tessellation.
+
+        Returns:
+            (vertices, triangles) arrays in mm.
+        """
+        cache_key = (key, self.wrl_tolerance, self.wrl_angular_tolerance)
+        if key is not None and cache_key in self._mesh_cache:
+            return self._mesh_cache[cache_key]
+
+        shapes = [v for v in model.vals() if isinstance(v, cq.Shape)]
+        shape = shapes[0] if len(shapes) == 1 else cq.Compound.makeCompound(shapes)
+        points, faces = shape.tessellate(self.wrl_tolerance, self.wrl_angular_tolerance)
+        mesh = (np.array([p.toTuple() for p in points], dtype=float).reshape(-1, 3),
+                np.array(faces, dtype=np.int64).reshape(-1, 3))
+        if key is not None:
+            self._mesh_cache[cache_key] = mesh
+        return mesh
+
+    def _export_wrl(self, model: Any, key: Optional[str] = None) -> bytes:
+        vertices, triangles = self.tessellate(model, key)
+        if self.max_triangles is not None:
+            vertices, triangles = decimate_mesh(vertices, triangles, self.max_triangles)
+        return write_vrml(vertices, triangles)
+
+    def _export_step(self, model: Any) -> bytes:
+        fd, tmp_path = tempfile.mkstemp(suffix=".step")
+        os.close(fd)
         try:
-            model = None
-            
-            if "qfn" in pkg_type:
-                model = self._make_qfn(dims)
-            elif "soic" in pkg_type or "sop" in pkg_type:
-                model = self._make_soic(dims)
-            else:
-                # Default to a simple box
-                model = self._make_box(dims)
-                
-            if model:
-                # Ensure output directory exists
-                os.makedirs(output_dir, exist_ok=True)
-                
-                step_path = os.path.join(output_dir, f"{name}.step")
-                # wrl_path = os.path.join(output_dir, f"{name}.wrl")
-                
-                # Export STEP
-                cq.exporters.export(model, step_path)
-                
-                # Export WRL (CadQuery support for WRL is limited/experimental in some versions, 
-                # but usually we export STEP for KiCAD mechanical and WRL for visual if needed.
-                # KiCAD can use STEP directly for 3D view now.)
-                # For now, we just export STEP as it's the most important.
-                
-                return True
-                
-        except Exception as e:
-            print(f"Error generating model for {name}: {e}")
-            return False
-            
-        return False
+            cq.exporters.export(model, tmp_path)
+            with open(tmp_path, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(tmp_path)
+
+    def build_solid(self, package: Package) -> Any:
+        """Builds the CadQuery workplane for the package."""
+        # Same inputs as model_cache_key(), so equal keys build equal solids
+        dims = fill_dimensions(package.name, package.dimensions)
+        pkg_type = resolve_package_type(package.package_type, package.name)
+
+        if "qfn" in pkg_type:
+            return self._make_qfn(dims)
+        elif "soic" in pkg_type or "sop" in pkg_type:
+            return self._make_soic(dims)
+        # Default to a simple box
+        return self._make_box(dims)
+
+    def _chunks(self, items: List[Tuple[str, dict]], chunk_size: int) -> Iterator[List[Tuple[str, dict]]]:
+        iterator = iter(items)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _run(self, chunks: Iterator[List[Tuple[str, dict]]],
+             workers: int) -> Iterator[List[Tuple[str, Optional[Dict[str, bytes]], Optional[str]]]]:
+        if workers == 1:
+            global _worker_generator
+            _worker_generator = self
+            for chunk in chunks:
+                yield _build_chunk(chunk)
+            return
+
+        options = {"export_wrl": self.export_wrl, "wrl_tolerance": self.wrl_tolerance,
+                   "wrl_angular_tolerance": self.wrl_angular_tolerance, "max_triangles": self.max_triangles}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(options,)) as pool:
+            pending: List[Future] = [pool.submit(_build_chunk, chunk) for chunk in chunks]
+            for future in pending:
+                yield future.result()
+
+    def _cache_name(self, key: str, ext: str) -> str:
+        if ext == "wrl":
+            # Meshes also depend on the tessellation settings
+            key = f"{key}_{self.wrl_tolerance:g}_{self.wrl_angular_tolerance:g}_{self.max_triangles}"
+        return f"{key}.{ext}"
+
+    def _cached_exports(self, key: str) -> Optional[Dict[str, bytes]]:
+        exports = {}
+        for ext in self.formats:
+            name = self._cache_name(key, ext)
+            data = self._cache.get(name)
+            if data is None and self.cache_dir:
+                path = os.path.join(self.cache_dir, name)
+                if os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                    self._cache[name] = data
+            if data is None:
+                return None
+            exports[ext] = data
+        return exports
+
+    def _store_exports(self, key: str, exports: Dict[str, bytes]) -> None:
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        for ext, data in exports.items():
+            name = self._cache_name(key, ext)
+            self._cache[name] = data
+            if self.cache_dir:
+                self._atomic_write(os.path.join(self.cache_dir, name), data)
+
+    def _write_model(self, output_dir: str, name: str, exports: Dict[str, bytes]) -> None:
+        os.makedirs(output_dir, exist_ok=True)
+        for ext, data in exports.items():
+            self._atomic_write(os.path.join(output_dir, f"{name}.{ext}"), data)
+
+    def _atomic_write(self, path: str, data: bytes) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
 
     def _make_box(self, dims: Dict[str, float]) -> Any:
         w = dims.get("body_width", 5.0)
         l = dims.get("body_length", 5.0)
         h = dims.get("height", 1.0)
-        
+
         return cq.Workplane("XY").box(l, w, h)
 
     def _make_qfn(self, dims: Dict[str, float]) -> Any:
@@ -79,7 +391,7 @@ class ModelGenerator:
         body_w = dims.get("body_width", 5.0)
         body_l = dims.get("body_length", 5.0)
         height = dims.get("height", 0.8)
-        
+
         # Body with Pin 1 mark
         # We start with the box, select the top face (>Z), create a workplane,
         # move to the corner, draw a circle, and cut it into the body.
@@ -92,7 +404,7 @@ class ModelGenerator:
             .circle(0.2)
             .cutBlind(-0.1)
         )
-        
+
         return result
 
     def _make_soic(self, dims: Dict[str, float]) -> Any:
@@ -100,10 +412,10 @@ class ModelGenerator:
         body_w = dims.get("body_width", 4.0)
         body_l = dims.get("body_length", 5.0)
         height = dims.get("height", 1.5)
-        
+
         body = cq.Workplane("XY").box(body_l, body_w, height)
-        
+
         # Legs would be added here in a full implementation
         # For now, just the body
-        
+
         return body
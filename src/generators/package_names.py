@@ -0,0 +1,294 @@
+import re
+import json
+import hashlib
+import functools
+from typing import Any, Dict, List, Optional, Tuple
+from src.models.data_models import Package
+
+# Package names whose number is not the pin count (SOT-23-5 style suffixes override)
+FIXED_PIN_COUNTS: Dict[str, int] = {
+    "SOT-23": 3, "SOT-323": 3, "SOT-523": 3, "SOT-89": 3, "SOT-223": 4,
+    "TO-92": 3, "TO-220": 3, "TO-247": 3, "TO-252": 3, "TO-263": 3, "DPAK": 3, "D2PAK": 3,
+    "SOD-123": 2, "SOD-323": 2, "SOD-523": 2, "SMA": 2, "SMB": 2, "SMC": 2, "SC-70": 3,
+}
+
+# "SOT-23", "SOT23" and "SOT-23-5" all match the SOT-23 entry
+FIXED_PIN_PATTERNS = [(re.compile(re.escape(base).replace(r"\-", "-?") + r"(?:[-_](\d+))?"), base, count)
+                      for base, count in FIXED_PIN_COUNTS.items()]
+
+FAMILY_ALIASES: Dict[str, str] = {"SO": "SOIC", "PDIP": "DIP", "HTSSOP": "TSSOP", "VSSOP": "MSOP"}
+
+# Lead geometry shared by a whole family (mm). Body size and pitch vary per
+# member and come from the name or STANDARD_PACKAGES.
+FAMILY_DEFAULTS: Dict[str, Dict[str, float]] = {
+    "SOIC": {"lead_length": 0.835, "lead_width": 0.41, "height": 1.75},
+    "TSSOP": {"lead_length": 0.6, "lead_width": 0.245, "height": 1.2},
+    "MSOP": {"lead_length": 0.55, "lead_width": 0.3, "height": 1.1},
+    "SOT-23": {"lead_length": 0.45, "lead_width": 0.4, "height": 1.12},
+    "SOT-223": {"lead_length": 0.9, "lead_width": 0.7, "height": 1.8},
+    "LQFP": {"lead_length": 0.6, "height": 1.6},
+    "TQFP": {"lead_length": 0.6, "height": 1.2},
+    "QFN": {"lead_length": 0.4, "height": 0.9},
+    "VQFN": {"lead_length": 0.4, "height": 1.0},
+    "WQFN": {"lead_length": 0.4, "height": 0.8},
+    "DFN": {"lead_length": 0.4, "height": 0.9},
+    "SON": {"lead_length": 0.4, "height": 0.9},
+    "DIP": {"lead_length": 3.3, "lead_width": 0.46, "height": 5.33},
+}
+
+# Nominal body (width across the leads x length along a row), pitch and lead
+# span from the JEDEC outlines. Only sizes that a family and pin count pin
+# down unambiguously are listed; QFN bodies, for example, vary too much and
+# need the size in the name.
+STANDARD_PACKAGES: Dict[Tuple[str, int], Dict[str, float]] = {
+    # MS-012 (narrow) and MS-013 (wide, "SOIC-16W")
+    ("SOIC", 8): {"body_width": 3.9, "body_length": 4.9, "pitch": 1.27, "lead_span": 6.0},
+    ("SOIC", 14): {"body_width": 3.9, "body_length": 8.65, "pitch": 1.27, "lead_span": 6.0},
+    ("SOIC", 16): {"body_width": 3.9, "body_length": 9.9, "pitch": 1.27, "lead_span": 6.0},
+    ("SOIC-W", 16): {"body_width": 7.5, "body_length": 10.3, "pitch": 1.27, "lead_span": 10.3},
+    ("SOIC-W", 20): {"body_width": 7.5, "body_length": 12.8, "pitch": 1.27, "lead_span": 10.3},
+    ("SOIC-W", 24): {"body_width": 7.5, "body_length": 15.4, "pitch": 1.27, "lead_span": 10.3},
+    ("SOIC-W", 28): {"body_width": 7.5, "body_length": 17.9, "pitch": 1.27, "lead_span": 10.3},
+    # MO-153
+    ("TSSOP", 8): {"body_width": 4.4, "body_length": 3.0, "pitch": 0.65, "lead_span": 6.4},
+    ("TSSOP", 14): {"body_width": 4.4, "body_length": 5.0, "pitch": 0.65, "lead_span": 6.4},
+    ("TSSOP", 16): {"body_width": 4.4, "body_length": 5.0, "pitch": 0.65, "lead_span": 6.4},
+    ("TSSOP", 20): {"body_width": 4.4, "body_length": 6.5, "pitch": 0.65, "lead_span": 6.4},
+    ("TSSOP", 24): {"body_width": 4.4, "body_length": 7.8, "pitch": 0.65, "lead_span": 6.4},
+    ("TSSOP", 28): {"body_width": 4.4, "body_length": 9.7, "pitch": 0.65, "lead_span": 6.4},
+    # MO-187
+    ("MSOP", 8): {"body_width": 3.0, "body_length": 3.0, "pitch": 0.65, "lead_span": 4.9},
+    ("MSOP", 10): {"body_width": 3.0, "body_length": 3.0, "pitch": 0.5, "lead_span": 4.9, "lead_width": 0.22},
+    # TO-236 and MO-178
+    ("SOT-23", 3): {"body_width": 1.3, "body_length": 2.9, "pitch": 0.95, "lead_span": 2.4},
+    ("SOT-23", 5): {"body_width": 1.6, "body_length": 2.9, "pitch": 0.95, "lead_span": 2.8},
+    ("SOT-23", 6): {"body_width": 1.6, "body_length": 2.9, "pitch": 0.95, "lead_span": 2.8},
+    # TO-261
+    ("SOT-223", 4): {"body_width": 3.5, "body_length": 6.5, "pitch": 2.3, "lead_span": 7.0, "tab_width": 3.0},
+    # MS-026
+    ("LQFP", 32): {"body_width": 7.0, "body_length": 7.0, "pitch": 0.8, "lead_span": 9.0},
+    ("LQFP", 44): {"body_width": 10.0, "body_length": 10.0, "pitch": 0.8, "lead_span": 12.0},
+    ("LQFP", 48): {"body_width": 7.0, "body_length": 7.0, "pitch": 0.5, "lead_span": 9.0},
+    ("LQFP", 64): {"body_width": 10.0, "body_length": 10.0, "pitch": 0.5, "lead_span": 12.0},
+    ("LQFP", 100): {"body_width": 14.0, "body_length": 14.0, "pitch": 0.5, "lead_span": 16.0},
+    ("LQFP", 144): {"body_width": 20.0, "body_length": 20.0, "pitch": 0.5, "lead_span": 22.0},
+    # MS-001 (300 mil rows)
+    ("DIP", 8): {"body_width": 6.35, "body_length": 9.27, "pitch": 2.54, "lead_span": 7.62},
+    ("DIP", 14): {"body_width": 6.35, "body_length": 19.05, "pitch": 2.54, "lead_span": 7.62},
+    ("DIP", 16): {"body_width": 6.35, "body_length": 19.3, "pitch": 2.54, "lead_span": 7.62},
+    # EIA chip sizes: length across the terminals, then width
+    ("0402", 2): {"body_width": 1.0, "body_length": 0.5, "lead_span": 1.0, "lead_length": 0.25, "lead_width": 0.5},
+    ("0603", 2): {"body_width": 1.6, "body_length": 0.8, "lead_span": 1.6, "lead_length": 0.3, "lead_width": 0.8},
+    ("0805", 2): {"body_width": 2.0, "body_length": 1.25, "lead_span": 2.0, "lead_length": 0.4, "lead_width": 1.25},
+    ("1206", 2): {"body_width": 3.2, "body_length": 1.6, "lead_span": 3.2, "lead_length": 0.5, "lead_width": 1.6},
+    ("1210", 2): {"body_width": 3.2, "body_length": 2.5, "lead_span": 3.2, "lead_length": 0.5, "lead_width": 2.5},
+}
+
+# TQFP shares the LQFP footprints (only the height differs)
+STANDARD_PACKAGES.update({("TQFP", pins): dims for (family, pins), dims in list(STANDARD_PACKAGES.items())
+                          if family == "LQFP"})
+
+CHIP_SIZES = {family for family, _ in STANDARD_PACKAGES if family.isdigit()}
+
+# Terminal width of fine-pitch leads, when neither table nor name gives one
+LEAD_WIDTH_BY_PITCH: Dict[float, float] = {0.4: 0.2, 0.5: 0.25, 0.65: 0.3, 0.8: 0.37, 0.95: 0.4, 1.27: 0.41}
+
+# Keys that fix a footprint; lead geometry falls back to family defaults
+REQUIRED_DIMENSIONS = ("pin_count", "body_width", "body_length", "pitch")
+
+_BASE_RE = re.compile(r"(?P<family>[A-Z]+)-?(?P<pins>\d+)(?P<wide>W)?(?:-(?P<ep>\d+)EP)?")
+_BODY_RE = re.compile(r"(\d+(?:\.\d+)?)X(\d+(?:\.\d+)?)(?:X(\d+(?:\.\d+)?))?(?:MM)?")
+_PREFIXED_RE = re.compile(r"(P|W|H)(\d+(?:\.\d+)?)(?:MM)?")
+_PREFIXED_KEYS = {"P": "pitch", "W": "lead_span", "H": "height"}
+_SEPARATOR_RE = re.compile(r"[\s_,]+")
+
+# Families recognised in free text; anything else with a number (part
+# numbers, revisions) is not a package name
+TEXT_FAMILIES = set(FAMILY_DEFAULTS) | set(FIXED_PIN_COUNTS) | {
+    "SOP", "SSOP", "QSOP", "QFP", "PLCC", "SOJ", "BGA", "LGA", "WLCSP", "UQFN", "USON",
+}
+
+# Candidate names in free text, e.g. "SOIC-8", "SO8", "QFN-32-1EP_5x5mm_P0.5mm"
+_TEXT_NAME_RE = re.compile(r"(?<![A-Z0-9])[A-Z][A-Z0-9]{1,5}-?\d{1,3}W?(?:-\d+EP)?(?:-\d)?"
+                           r"(?:_[0-9.]+X[0-9.]+MM)?(?:_P[0-9.]+MM)?(?![A-Z0-9.])")
+
+
+def _family_of(name: str) -> str:
+    return FAMILY_ALIASES.get(name, name)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse(name: str) -> Tuple[Tuple[str, Any], ...]:
+    # Spelled-out sizes such as "4.9 x 3.9 mm" become "4.9X3.9MM"
+    text = re.sub(r"(?<=\d)\s*[X×]\s*(?=\d)", "X", name.strip().upper())
+    text = re.sub(r"(\d)\s+MM\b", r"\1MM", text)
+    base, *tokens = _SEPARATOR_RE.split(text)
+    parsed: Dict[str, Any] = {}
+
+    for pattern, fixed, count in FIXED_PIN_PATTERNS:
+        match = pattern.fullmatch(base)
+        if match:
+            parsed.update(family=fixed, pin_count=int(match.group(1)) if match.group(1) else count)
+            break
+    else:
+        if base in CHIP_SIZES:
+            parsed.update(family=base, pin_count=2)
+        else:
+            match = _BASE_RE.fullmatch(base)
+            if not match:
+                return ()
+            family = _family_of(match.group("family"))
+            parsed.update(family=family + "-W" if match.group("wide") else family,
+                          pin_count=int(match.group("pins")))
+            if match.group("ep"):
+                parsed["exposed_pads"] = int(match.group("ep"))
+
+    for token in tokens:
+        match = _BODY_RE.fullmatch(token)
+        if match:
+            parsed["body_width"], parsed["body_length"] = float(match.group(1)), float(match.group(2))
+            if match.group(3):
+                parsed["height"] = float(match.group(3))
+            continue
+        match = _PREFIXED_RE.fullmatch(token)
+        if match:
+            parsed[_PREFIXED_KEYS[match.group(1)]] = float(match.group(2))
+    return tuple(parsed.items())
+
+
+def parse_package_name(name: Optional[str]) -> Dict[str, Any]:
+    """
+    Parses a package name in datasheet or KiCad style.
+
+    Understands names such as 'SOIC-8', 'SOIC-8 3.9x4.9mm P1.27mm',
+    'QFN-32-1EP_5x5mm_P0.5mm', 'SOT-23-5', 'DIP-8_W7.62mm' and '0603'.
+
+    Returns:
+        Dict with 'family' and 'pin_count', 'exposed_pads' if any, and the
+        dimensions spelled out in the name (body as width x length, pitch,
+        row spacing as lead_span). Empty if the name is not recognised.
+    """
+    return dict(_parse(name or ""))
+
+
+def standard_dimensions(family: str, pin_count: int) -> Dict[str, float]:
+    """Family defaults and JEDEC/EIA nominal dimensions for a package, if tabulated."""
+    dims = dict(FAMILY_DEFAULTS.get(family.removesuffix("-W"), {}))
+    dims.update(STANDARD_PACKAGES.get((family, pin_count), {}))
+    return dims
+
+
+def package_dimensions(name: Optional[str]) -> Dict[str, float]:
+    """
+    Dimensions a package name determines on its own.
+
+    Values spelled out in the name win over the standard table, which wins
+    over family defaults. Lead width is derived from the pitch when nothing
+    else gives it.
+
+    Returns:
+        Dict[str, float]: Package.dimensions keys; empty for unknown names.
+    """
+    parsed = parse_package_name(name)
+    if not parsed:
+        return {}
+    dims = standard_dimensions(parsed["family"], parsed["pin_count"])
+    dims.update({k: float(v) for k, v in parsed.items() if k != "family"})
+    if "lead_width" not in dims and dims.get("pitch") in LEAD_WIDTH_BY_PITCH:
+        dims["lead_width"] = LEAD_WIDTH_BY_PITCH[dims["pitch"]]
+    return dims
+
+
+def fill_dimensions(name: Optional[str], dimensions: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """
+    Completes extracted or user-entered dimensions with those implied by the name.
+
+    Given values are kept. The tabulated lead span is only used together with
+    the tabulated body, since it is otherwise derived from body and lead length.
+    """
+    dimensions = dict(dimensions or {})
+    defaults = package_dimensions(name)
+    if "body_width" in dimensions or "lead_length" in dimensions:
+        defaults.pop("lead_span", None)
+    return {**defaults, **dimensions}
+
+
+def package_type_of(name: Optional[str]) -> Optional[str]:
+    """Package type for FootprintGenerator dispatch, e.g. 'SOIC', 'LQFP' or 'chip'."""
+    family = parse_package_name(name).get("family")
+    if family is None:
+        return None
+    if family in CHIP_SIZES:
+        return "chip"
+    return family.removesuffix("-W")
+
+
+def resolve_package_type(package_type: Optional[str], name: Optional[str]) -> str:
+    """Lower-cased package type, taken from the name when extraction left it empty or 'unknown'."""
+    pkg_type = (package_type or "").strip().lower()
+    if pkg_type in ("", "unknown"):
+        pkg_type = (package_type_of(name) or "").lower()
+    return pkg_type
+
+
+def package_geometry(package: Package) -> Dict[str, Any]:
+    """
+    Everything that shapes a package's footprint and 3D model.
+
+    Dimensions are completed from the name (fill_dimensions), so 'SOIC-16'
+    without extracted dimensions keeps its 16 pins once the name is dropped.
+    Floats are rounded to remove extraction noise.
+
+    Returns:
+        Dict with 'type', 'dimensions' and 'params' (model_params).
+    """
+    dims = fill_dimensions(package.name, package.dimensions)
+    return {
+        "type": resolve_package_type(package.package_type, package.name),
+        "dimensions": {k: round(float(v), 6) for k, v in dims.items()},
+        "params": _normalize_params(package.model_params or {}),
+    }
+
+
+def geometry_key(package: Package, version: str = "") -> str:
+    """
+    Canonical hash of package_geometry(): every package with the same
+    geometry gets the same key regardless of name, dict order or float noise.
+
+    Args:
+        package: Package to key.
+        version: Salt for caches whose output also depends on generator code.
+    """
+    canonical = json.dumps(dict(package_geometry(package), version=version),
+                           sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _normalize_params(params: Any) -> Any:
+    if isinstance(params, dict):
+        return {str(k): _normalize_params(v) for k, v in params.items()}
+    if isinstance(params, (list, tuple, set)):
+        items = [_normalize_params(v) for v in params]
+        return sorted(items, key=repr) if isinstance(params, set) else items
+    if isinstance(params, float):
+        return round(params, 6)
+    return params
+
+
+def is_determined(dimensions: Dict[str, float]) -> bool:
+    """True if `dimensions` fix the footprint without further extraction."""
+    required = REQUIRED_DIMENSIONS if dimensions.get("pin_count", 0) > 2 else REQUIRED_DIMENSIONS[:3]
+    return all(key in dimensions for key in required)
+
+
+def packages_in_text(text: str) -> List[str]:
+    """
+    Recognised package names mentioned in datasheet text, in order of first
+    appearance, e.g. ['SOIC-8', 'TSSOP-14'] from an ordering table.
+    """
+    found: Dict[str, None] = {}
+    for match in _TEXT_NAME_RE.finditer(text.upper()):
+        family = parse_package_name(match.group(0)).get("family", "")
+        if family.removesuffix("-W") in TEXT_FAMILIES:
+            found.setdefault(match.group(0), None)
+    return list(found)
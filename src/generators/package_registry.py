@@ -0,0 +1,146 @@
+import os
+import logging
+from typing import Any, Dict, List, Optional
+from src.models.data_models import Package
+from src.generators.footprint_generator import FootprintGenerator
+from src.generators.model_generator import ModelGenerator
+from src.generators.package_names import (CHIP_SIZES, fill_dimensions, geometry_key, package_geometry,
+                                          parse_package_name)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIBRARY_NAME = "MinerU_KiCAD"
+
+
+def canonical_name(package: Package) -> str:
+    """
+    Derives a KiCAD-style name from geometry, e.g. 'SOIC-8_3.9x4.9mm_P1.27mm'.
+
+    Body size is width x length, the order package names are parsed in, so
+    the name maps back to the same geometry.
+    """
+    geometry = package_geometry(package)
+    dims = geometry["dimensions"]
+    family = parse_package_name(package.name).get("family", "")
+    if family in CHIP_SIZES:
+        name = family
+    else:
+        name = geometry["type"].upper() or "PKG"
+        if "pin_count" in dims:
+            name += f"-{int(dims['pin_count'])}"
+    if "body_width" in dims and "body_length" in dims:
+        name += f"_{dims['body_width']:g}x{dims['body_length']:g}mm"
+    if "pitch" in dims:
+        name += f"_P{dims['pitch']:g}mm"
+    return name
+
+
+class PackageRegistry:
+    """
+    Registry of canonical package geometries shared by many parts.
+
+    Each distinct geometry gets one canonical package, one footprint and one
+    3D model; parts reference those shared artifacts by name (e.g. in the
+    symbol's Footprint property) instead of carrying their own copies.
+    """
+
+    def __init__(self, library_name: str = DEFAULT_LIBRARY_NAME,
+                 footprint_generator: Optional[FootprintGenerator] = None,
+                 model_generator: Optional[ModelGenerator] = None):
+        """
+        Args:
+            library_name: Footprint library nickname used in footprint references.
+            footprint_generator: Generator for shared footprints.
+            model_generator: Generator for shared 3D models.
+        """
+        self.library_name = library_name
+        self.footprint_generator = footprint_generator or FootprintGenerator()
+        self.model_generator = model_generator or ModelGenerator()
+
+        self._packages: Dict[str, Package] = {}
+        self._names: Dict[str, str] = {}
+        self._footprints: Dict[str, str] = {}
+        self._models: Dict[str, str] = {}
+        self._stats = {"registered": 0, "footprint_hits": 0, "footprint_misses": 0,
+                       "model_hits": 0, "model_misses": 0}
+
+    def register(self, package: Package) -> str:
+        """
+        Registers a part's package and returns the canonical package name.
+        """
+        self._stats["registered"] += 1
+        return self._canonical(package).name
+
+    def canonical_package(self, package: Package) -> Package:
+        """Returns the shared package (with its canonical name) for this geometry."""
+        return self._canonical(package)
+
+    def footprint(self, package: Package) -> str:
+        """Returns the shared .kicad_mod content for the package's geometry."""
+        key = geometry_key(package)
+        content = self._footprints.get(key)
+        if content is not None:
+            self._stats["footprint_hits"] += 1
+            return content
+
+        self._stats["footprint_misses"] += 1
+        content = self.footprint_generator.generate_footprint(self._canonical(package, key))
+        self._footprints[key] = content
+        return content
+
+    def footprint_ref(self, package: Package) -> str:
+        """Returns the 'Library:Footprint' reference for a symbol's Footprint property."""
+        return f"{self.library_name}:{self._canonical(package).name}"
+
+    def model(self, package: Package, output_dir: str) -> Optional[str]:
+        """
+        Generates the shared STEP model for the package's geometry once.
+
+        Returns:
+            Path of the shared model, or None if generation failed.
+        """
+        key = geometry_key(package)
+        if key in self._models:
+            self._stats["model_hits"] += 1
+            return self._models[key]
+
+        self._stats["model_misses"] += 1
+        canonical = self._canonical(package, key)
+        if not self.model_generator.generate_model(canonical, output_dir):
+            return None
+        path = os.path.join(output_dir, f"{canonical.name}.step")
+        self._models[key] = path
+        return path
+
+    def packages(self) -> List[Package]:
+        """
+        Returns one canonical package per registered geometry, e.g. for
+        FootprintLibraryWriter.write_library() or ModelGenerator.generate_models().
+        """
+        return list(self._packages.values())
+
+    def stats(self) -> Dict[str, int]:
+        """Returns registry counters plus the number of distinct geometries."""
+        return dict(self._stats, geometries=len(self._packages))
+
+    def _canonical(self, package: Package, key: Optional[str] = None) -> Package:
+        key = key or geometry_key(package)
+        canonical = self._packages.get(key)
+        if canonical is None:
+            name = canonical_name(package)
+            if self._names.get(name, key) != key:
+                # Same headline dimensions but different geometry otherwise
+                name = f"{name}_{key[:8]}"
+            self._names[name] = key
+            # Completed dimensions and type travel with the package, so the
+            # generators do not need the original name to recover them
+            dims = fill_dimensions(name, fill_dimensions(package.name, package.dimensions))
+            canonical = package.model_copy(update={
+                "id": None,
+                "name": name,
+                "package_type": package_geometry(package)["type"].upper() or package.package_type,
+                "dimensions": dims,
+            }, deep=True)
+            self._packages[key] = canonical
+            logger.debug(f"New package geometry {name} ({key[:12]})")
+        return canonical
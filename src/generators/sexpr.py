@@ -0,0 +1,331 @@
+import os
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+
+# A parsed node is a list whose first element is its keyword, e.g.
+# ['pad', '1', 'smd', 'rect', ['at', '-2.5', '0'], ...]. Atoms are strings;
+# quoted strings are unquoted (KiCAD does not distinguish them semantically).
+Node = List[Any]
+
+# Tokens: parens, quoted strings (with escapes) and bare atoms
+TOKEN = re.compile(r'\(|\)|"((?:[^"\\]|\\.)*)"|[^\s()"]+')
+
+_ESCAPE = re.compile(r'\\(.)')
+_NUMBER = re.compile(r'^[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?$')
+
+# Attributes that change on every save and carry no design meaning
+DEFAULT_IGNORE = frozenset({"tedit", "tstamp", "uuid", "generator", "generator_version"})
+
+
+class SExprError(ValueError):
+    """Raised on malformed S-expressions."""
+
+
+def parse(text: str, start: int = 0, end: Optional[int] = None) -> Node:
+    """
+    Fully parses one S-expression.
+
+    Args:
+        text: Source text.
+        start, end: Optional slice of `text` holding the expression.
+
+    Returns:
+        The nested list representation.
+    """
+    stack: List[Node] = []
+    result: Optional[Node] = None
+    for match in TOKEN.finditer(text, start, len(text) if end is None else end):
+        token = match.group(0)
+        if token == '(':
+            stack.append([])
+        elif token == ')':
+            if not stack:
+                raise SExprError(f"Unbalanced ')' at offset {match.start()}")
+            node = stack.pop()
+            if stack:
+                stack[-1].append(node)
+            else:
+                result = node
+                break
+        elif stack:
+            quoted = match.group(1)
+            if quoted is not None:
+                stack[-1].append(_ESCAPE.sub(r'\1', quoted) if '\\' in quoted else quoted)
+            else:
+                stack[-1].append(token)
+        else:
+            raise SExprError(f"Atom outside of a list at offset {match.start()}")
+
+    if result is None:
+        raise SExprError("Unterminated S-expression")
+    return result
+
+
+def iter_children(text: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+    """
+    Yields the (start, end) spans of the direct child lists of the first
+    list in text[start:end], without materializing anything.
+
+    Nesting depth is computed for every byte at once with NumPy cumulative
+    sums (quote parity masks out parens inside strings), so locating the
+    thousands of symbols in a large library needs no per-token Python work.
+    """
+    end = len(text) if end is None else end
+    chunk = text[start:end]
+    encoded = chunk.encode('utf-8')
+    starts, ends = child_spans(encoded)
+
+    if len(encoded) != len(chunk):
+        # Multi-byte UTF-8: convert byte offsets to character offsets
+        data = np.frombuffer(encoded, dtype=np.uint8)
+        continuation = np.cumsum((data & 0xC0) == 0x80, dtype=np.int64)
+        starts = starts - np.concatenate(([0], continuation))[starts]
+        ends = ends - continuation[ends - 1]
+
+    return iter(zip((starts + start).tolist(), (ends + start).tolist()))
+
+
+def child_spans(buffer) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Byte offsets of the direct child lists of the first list in `buffer`.
+
+    Works on any bytes-like object, including an mmap, so a library can be
+    indexed without decoding it.
+
+    Returns:
+        (starts, ends) arrays; each child spans buffer[start:end].
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+
+    quotes = data == ord('"')
+    positions = np.flatnonzero(quotes)
+    if positions.size:
+        # A quote is escaped only after an odd run of backslashes: in "C:\\"
+        # the backslash is escaped and the quote still closes the string
+        quotes[_escaped(data, positions)] = False
+    # int8 cumsum wraps around, which preserves parity
+    outside = (np.cumsum(quotes, dtype=np.int8) & 1) == 0
+
+    opens = (data == ord('(')) & outside
+    closes = (data == ord(')')) & outside
+    depth = np.cumsum(opens.astype(np.int16) - closes.astype(np.int16), dtype=np.int16)
+
+    root_end = np.flatnonzero(closes & (depth == 0))
+    if not root_end.size:
+        raise SExprError("Unterminated S-expression")
+    limit = root_end[0]
+
+    starts = np.flatnonzero(opens & (depth == 2))
+    ends = np.flatnonzero(closes & (depth == 1)) + 1
+    return starts[starts < limit], ends[ends <= limit]
+
+
+def _escaped(data: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Subset of quote `positions` preceded by an odd run of backslashes."""
+    backslash = ord('\\')
+    candidates = positions[(positions > 0) & (data[positions - 1] == backslash)]
+    # Rare in KiCAD files, so the runs are counted per candidate
+    escaped = []
+    for position in candidates.tolist():
+        run = 1
+        while position - run - 1 >= 0 and data[position - run - 1] == backslash:
+            run += 1
+        if run % 2:
+            escaped.append(position)
+    return np.asarray(escaped, dtype=np.int64)
+
+
+class LazyNode:
+    """
+    A subtree located by its span in the source text.
+
+    Only the keyword and name are read up front; the full tree is parsed on
+    first access to `node`.
+    """
+
+    __slots__ = ("text", "start", "end", "head", "name", "_node")
+
+    def __init__(self, text: str, start: int, end: int):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.head = None
+        self.name = None
+        # Keyword and name are the first two atoms after the opening paren
+        tokens = TOKEN.finditer(text, start + 1, end)
+        for i, match in zip(range(2), tokens):
+            token = match.group(0)
+            if token in ('(', ')'):
+                break
+            value = match.group(1) if match.group(1) is not None else token
+            if i == 0:
+                self.head = value
+            else:
+                self.name = value
+        self._node: Optional[Node] = None
+
+    @property
+    def source(self) -> str:
+        return self.text[self.start:self.end]
+
+    @property
+    def node(self) -> Node:
+        if self._node is None:
+            self._node = parse(self.text, self.start, self.end)
+        return self._node
+
+    def children(self) -> Iterator["LazyNode"]:
+        for start, end in iter_children(self.text, self.start, self.end):
+            yield LazyNode(self.text, start, end)
+
+    def __repr__(self) -> str:
+        return f"LazyNode({self.head!r}, {self.name!r}, span={self.start}:{self.end})"
+
+
+def load_symbol_library(path: str) -> Dict[str, LazyNode]:
+    """
+    Indexes the top-level symbols of a .kicad_sym file by name.
+    Symbols are parsed only when their `node` is accessed.
+
+    The file is read into memory whole (the index is spans into its text);
+    only parsing is deferred, so memory still grows with the file size.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    return symbols_from_text(text)
+
+
+def symbols_from_text(text: str) -> Dict[str, LazyNode]:
+    """Indexes the top-level symbols of .kicad_sym content by name."""
+    root_start = text.index('(')
+    symbols = {}
+    for start, end in iter_children(text, root_start):
+        child = LazyNode(text, start, end)
+        if child.head == "symbol":
+            symbols[child.name] = child
+    return symbols
+
+
+def load_footprint(path: str) -> LazyNode:
+    """Loads a .kicad_mod file (read whole, parsed lazily) and returns its footprint node."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    return footprint_from_text(text)
+
+
+def footprint_from_text(text: str) -> LazyNode:
+    """
+    Returns the footprint node of .kicad_mod content. Handles both the
+    standard layout and FootprintGenerator's kicad_mod wrapper.
+    """
+    start = text.index('(')
+    root = LazyNode(text, start, len(text.rstrip()))
+    if root.head in ("footprint", "module"):
+        return root
+    for child in root.children():
+        if child.head in ("footprint", "module"):
+            return child
+    raise SExprError("No footprint found")
+
+
+def load_footprint_library(pretty_dir: str) -> Dict[str, str]:
+    """Maps footprint names to .kicad_mod paths in a .pretty directory (no parsing)."""
+    return {
+        entry.name[:-len(".kicad_mod")]: entry.path
+        for entry in os.scandir(pretty_dir)
+        if entry.name.endswith(".kicad_mod")
+    }
+
+
+def diff(old: Union[Node, LazyNode, str], new: Union[Node, LazyNode, str],
+         ignore: frozenset = DEFAULT_IGNORE) -> List[Tuple[str, Any, Any]]:
+    """
+    Structural diff of two S-expressions.
+
+    Child lists are matched by identity (keyword plus pad/pin number,
+    property name etc.) rather than position, and numeric atoms compare by
+    value, so reordering and formatting differences are not reported.
+
+    Returns:
+        (path, old, new) tuples; old or new is None for added/removed nodes.
+    """
+    changes: List[Tuple[str, Any, Any]] = []
+    _diff(_as_node(old), _as_node(new), _label(_as_node(new)), ignore, changes)
+    return changes
+
+
+def is_equivalent(old: Union[Node, LazyNode, str], new: Union[Node, LazyNode, str],
+                  ignore: frozenset = DEFAULT_IGNORE) -> bool:
+    """True if the two expressions have no structural differences."""
+    return not diff(old, new, ignore)
+
+
+def _as_node(value: Union[Node, LazyNode, str]) -> Node:
+    if isinstance(value, LazyNode):
+        return value.node
+    if isinstance(value, str):
+        return parse(value)
+    return value
+
+
+def _label(node: Node) -> str:
+    return str(node[0]) if node else "()"
+
+
+def _atoms_equal(a: Any, b: Any) -> bool:
+    if a == b:
+        return True
+    if isinstance(a, str) and isinstance(b, str) and _NUMBER.match(a) and _NUMBER.match(b):
+        return float(a) == float(b)
+    return False
+
+
+def _identity(node: Node) -> Tuple:
+    head = node[0] if node else None
+    if head == "pin":
+        # (pin type style (at ...) ... (number "1" ...))
+        for child in node[1:]:
+            if isinstance(child, list) and child and child[0] == "number" and len(child) > 1:
+                return (head, child[1])
+        return (head,)
+    if head in ("pad", "property", "symbol", "fp_text", "footprint", "model") and len(node) > 1 \
+            and not isinstance(node[1], list):
+        return (head, node[1])
+    return (head,)
+
+
+def _diff(old: Node, new: Node, path: str, ignore: frozenset, changes: List[Tuple[str, Any, Any]]) -> None:
+    old_atoms = [a for a in old if not isinstance(a, list)]
+    new_atoms = [a for a in new if not isinstance(a, list)]
+    if len(old_atoms) != len(new_atoms) or not all(map(_atoms_equal, old_atoms, new_atoms)):
+        changes.append((path, old_atoms, new_atoms))
+
+    # Key children by identity plus occurrence, so duplicates pair up in order
+    def keyed(node: Node) -> Dict[Tuple, Node]:
+        counts: Dict[Tuple, int] = defaultdict(int)
+        result = {}
+        for child in node:
+            if isinstance(child, list) and child and child[0] not in ignore:
+                identity = _identity(child)
+                result[identity + (counts[identity],)] = child
+                counts[identity] += 1
+        return result
+
+    old_children, new_children = keyed(old), keyed(new)
+    for key, old_child in old_children.items():
+        child_path = f"{path}/{_format_key(key)}"
+        if key in new_children:
+            _diff(old_child, new_children[key], child_path, ignore, changes)
+        else:
+            changes.append((child_path, old_child, None))
+    for key, new_child in new_children.items():
+        if key not in old_children:
+            changes.append((f"{path}/{_format_key(key)}", None, new_child))
+
+
+def _format_key(key: Tuple) -> str:
+    *identity, occurrence = key
+    label = ":".join(str(part) for part in identity)
+    return f"{label}[{occurrence}]" if occurrence else label
@@ -1,6 +1,21 @@
 from typing import List, Dict, Tuple
 import math
+import re
+from itertools import groupby
 from src.models.data_models import Component, Pin
+from src.telemetry import tracer
+
+# Pin-name conventions that identify an I/O bank or port
+BANK_PATTERNS = [
+    re.compile(r"(?i)\bbank\s*_?(\d+)"),      # "BANK 34" in name or description
+    re.compile(r"(?i)^IO_\w*?_(\d+)$"),       # Xilinx style: IO_L1P_T0_34
+    re.compile(r"(?i)^P([A-Z])\d+"),          # MCU ports: PA0, PB12
+    re.compile(r"(?i)^GPIO(\d+)_"),           # GPIO3_IO07
+]
+
+LIBRARY_HEADER = '(kicad_symbol_lib (version 20211014) (generator kicad_symbol_editor)'
+
+POWER_NAME_PATTERN = re.compile(r"(?i)^(?:v(?:cc|dd|ss|ee|ref)|gnd|agnd|dgnd|avdd|dvdd)")
 
 class SymbolGenerator:
     """Generates KiCAD symbol files (.kicad_sym) from component data."""
@@ -11,23 +26,45 @@ class SymbolGenerator:
         self.pin_spacing = 2.54
         self.origin_x = 0
         self.origin_y = 0
+        self.max_pins_per_unit = 64
 
-    def generate_symbol(self, component: Component, pins: List[Pin]) -> str:
+    def generate_symbol(self, component: Component, pins: List[Pin], footprint: str = "") -> str:
         """
         Generates the S-expression string for a KiCAD symbol library.
         
         Args:
             component: The component metadata.
             pins: List of Pin objects.
+            footprint: Optional 'Library:Footprint' reference.
             
         Returns:
             String containing the .kicad_sym content.
         """
+        content = [
+            LIBRARY_HEADER,
+            self.generate_symbol_block(component, pins, footprint),
+            ')',     # End lib
+        ]
+        return '\n'.join(content)
+
+    @tracer.traced("generation.symbol")
+    def generate_symbol_block(self, component: Component, pins: List[Pin], footprint: str = "") -> str:
+        """
+        Generates the top-level (symbol ...) block for a component, without
+        the kicad_symbol_lib wrapper, for merging into shared libraries.
+        
+        Args:
+            component: The component metadata.
+            pins: List of Pin objects.
+            footprint: Optional 'Library:Footprint' reference.
+            
+        Returns:
+            String containing the symbol block.
+        """
         lib_name = component.part_number
         
         # Header
         content = [
-            '(kicad_symbol_lib (version 20211014) (generator kicad_symbol_editor)',
             f'  (symbol "{lib_name}" (in_bom yes) (on_board yes)',
             f'    (property "Reference" "U" (id 0) (at 0 5 0)',
             '      (effects (font (size 1.27 1.27)))',
@@ -35,7 +72,7 @@ class SymbolGenerator:
             f'    (property "Value" "{lib_name}" (id 1) (at 0 -5 0)',
             '      (effects (font (size 1.27 1.27)))',
             '    )',
-            f'    (property "Footprint" "" (id 2) (at 0 -10 0)',
+            f'    (property "Footprint" "{footprint}" (id 2) (at 0 -10 0)',
             '      (effects (font (size 1.27 1.27) hide yes))',
             '    )',
             f'    (property "Datasheet" "" (id 3) (at 0 -15 0)',
@@ -44,9 +81,21 @@ class SymbolGenerator:
             f'    (property "Description" "{component.description or ""}" (id 4) (at 0 0 0)',
             '      (effects (font (size 1.27 1.27) hide yes))',
             '    )',
-            f'    (symbol "{lib_name}_1_1"',
         ]
 
+        # Large parts are split into one unit per bank/function group
+        for unit, unit_pins in enumerate(self._partition_units(pins), start=1):
+            content.append(f'    (symbol "{lib_name}_{unit}_1"')
+            content.extend(self._generate_unit_body(unit_pins))
+            content.append('    )') # End symbol_N_1
+
+        content.append('  )')   # End symbol
+        
+        return '\n'.join(content)
+
+    def _generate_unit_body(self, pins: List[Pin]) -> List[str]:
+        content = []
+
         # Sort and group pins
         left_pins, right_pins, top_pins, bottom_pins = self._group_pins(pins)
         
@@ -76,11 +125,68 @@ class SymbolGenerator:
         content.extend(self._place_pins(top_pins, -half_w, half_h, "top"))
         content.extend(self._place_pins(bottom_pins, -half_w, -half_h, "bottom"))
 
-        content.append('    )') # End symbol_1_1
-        content.append('  )')   # End symbol
-        content.append(')')     # End lib
-        
-        return '\n'.join(content)
+        return content
+
+    def _partition_units(self, pins: List[Pin]) -> List[List[Pin]]:
+        """
+        Splits pins into symbol units of at most max_pins_per_unit pins.
+
+        Pins are sorted once by (group, pin number), then consecutive groups
+        are packed into units; groups larger than a unit get split across
+        several. Sorting dominates, so this is O(n log n).
+        """
+        if len(pins) <= self.max_pins_per_unit:
+            return [pins]
+
+        decorated = sorted(
+            (self._unit_group(pin), self._pin_sort_key(pin), i, pin)
+            for i, pin in enumerate(pins)
+        )
+
+        units = []
+        current = []
+        for _, items in groupby(decorated, key=lambda item: item[0]):
+            group = [item[3] for item in items]
+            if len(group) > self.max_pins_per_unit:
+                if current:
+                    units.append(current)
+                    current = []
+                for start in range(0, len(group), self.max_pins_per_unit):
+                    units.append(group[start:start + self.max_pins_per_unit])
+            elif len(current) + len(group) > self.max_pins_per_unit:
+                units.append(current)
+                current = group
+            else:
+                current.extend(group)
+        if current:
+            units.append(current)
+        return units
+
+    def _unit_group(self, pin: Pin) -> Tuple[int, Tuple]:
+        # Banks/ports first (in natural order), then other signals, power last
+        name = pin.name or ""
+        etype = (pin.electrical_type or "").lower()
+        if "power" in etype or "ground" in etype or POWER_NAME_PATTERN.match(name):
+            return (2, ())
+        for pattern in BANK_PATTERNS:
+            match = pattern.search(name)
+            if match:
+                return (0, self._natural_key(match.group(1)))
+        match = BANK_PATTERNS[0].search(pin.description or "")
+        if match:
+            return (0, self._natural_key(match.group(1)))
+        return (1, ())
+
+    def _natural_key(self, text: str) -> Tuple:
+        # Digit runs compare numerically; tagging keeps ints and strings comparable
+        return tuple(
+            (0, int(part), "") if part.isdigit() else (1, 0, part)
+            for part in re.findall(r"\d+|\D+", text.upper())
+        )
+
+    def _pin_sort_key(self, pin: Pin) -> Tuple:
+        # Numeric pins in numeric order; BGA names (A1, AA10) by row then column
+        return self._natural_key(pin.number or "")
 
     def _group_pins(self, pins: List[Pin]) -> Tuple[List[Pin], List[Pin], List[Pin], List[Pin]]:
         left = []
@@ -106,17 +212,11 @@ class SymbolGenerator:
                 # Default to left if unknown
                 left.append(pin)
                 
-        # Sort by number if possible, otherwise keep order
-        def try_int(p):
-            try:
-                return int(p.number)
-            except:
-                return 9999
-        
-        left.sort(key=try_int)
-        right.sort(key=try_int)
-        top.sort(key=try_int)
-        bottom.sort(key=try_int)
+        # Sort by number (natural order, so BGA names like A2 < A10 < B1)
+        left.sort(key=self._pin_sort_key)
+        right.sort(key=self._pin_sort_key)
+        top.sort(key=self._pin_sort_key)
+        bottom.sort(key=self._pin_sort_key)
         
         return left, right, top, bottom
 
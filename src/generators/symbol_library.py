@@ -0,0 +1,237 @@
+import os
+import mmap
+import logging
+from typing import Dict, List, Optional, Tuple
+from src.models.data_models import Component, Pin
+from src.generators.symbol_generator import SymbolGenerator, LIBRARY_HEADER
+from src.generators.sexpr import LazyNode, child_spans, is_equivalent
+
+logger = logging.getLogger(__name__)
+
+# Bytes decoded to read a block's keyword and name
+HEAD_READ_SIZE = 4096
+
+COPY_CHUNK_SIZE = 1 << 20
+
+
+class SymbolLibraryWriter:
+    """
+    Maintains a shared .kicad_sym library holding many symbols.
+
+    The byte offset and length of every top-level symbol block is indexed,
+    so adding, replacing or removing symbols only generates the changed
+    blocks; everything else is copied as raw byte ranges. Changes are staged
+    and written in one pass to a temporary file that atomically replaces
+    the library on commit.
+
+    Usage:
+        with SymbolLibraryWriter("MyParts.kicad_sym") as lib:
+            lib.upsert(component, pins)
+            lib.remove("OLD-PART")
+    """
+
+    def __init__(self, path: str, generator: Optional[SymbolGenerator] = None, structural_compare: bool = True):
+        """
+        Args:
+            path: Library file path. Created on first commit if missing.
+            generator: SymbolGenerator used to render staged components.
+            structural_compare: Treat symbols that differ only in formatting,
+                ordering or timestamps as unchanged.
+        """
+        self.path = path
+        self.generator = generator or SymbolGenerator()
+        self.structural_compare = structural_compare
+        self.index: Dict[str, Tuple[int, int]] = {}
+        self._end_offset = 0
+        self._pending: Dict[str, Optional[bytes]] = {}
+        self._load_index()
+
+    def __enter__(self) -> "SymbolLibraryWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self._pending.clear()
+
+    def __contains__(self, name: str) -> bool:
+        if name in self._pending:
+            return self._pending[name] is not None
+        return name in self.index
+
+    def names(self) -> List[str]:
+        """Returns symbol names in library order, including staged additions."""
+        names = [n for n in self.index if self._pending.get(n, b"") is not None]
+        names.extend(n for n, block in self._pending.items() if n not in self.index and block is not None)
+        return names
+
+    def get(self, name: str) -> Optional[str]:
+        """Returns the symbol block for `name`, reading only its byte range."""
+        if name in self._pending:
+            block = self._pending[name]
+            return block.decode('utf-8') if block is not None else None
+        if name not in self.index:
+            return None
+        return self._read_block(name).decode('utf-8')
+
+    def upsert(self, component: Component, pins: List[Pin], footprint: str = "") -> None:
+        """Stages a generated symbol for addition or replacement."""
+        block = self.generator.generate_symbol_block(component, pins, footprint)
+        self.upsert_block(component.part_number, block)
+
+    def upsert_block(self, name: str, block: str) -> None:
+        """Stages a pre-rendered top-level (symbol ...) block."""
+        self._pending[name] = (block.rstrip('\n') + '\n').encode('utf-8')
+
+    def remove(self, name: str) -> None:
+        """Stages removal of a symbol."""
+        if name in self.index or name in self._pending:
+            self._pending[name] = None
+
+    def commit(self) -> Dict[str, int]:
+        """
+        Writes staged changes.
+
+        Returns:
+            Counts of 'added', 'updated', 'removed' and 'unchanged' symbols.
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        changes = self._effective_changes(stats)
+        self._pending.clear()
+        if not changes and os.path.exists(self.path):
+            return stats
+
+        tmp_path = self.path + ".tmp"
+        new_index: Dict[str, Tuple[int, int]] = {}
+        try:
+            with open(tmp_path, 'wb') as out:
+                if os.path.exists(self.path):
+                    with open(self.path, 'rb') as src:
+                        self._splice(src, out, changes, new_index)
+                else:
+                    out.write(LIBRARY_HEADER.encode('utf-8') + b'\n')
+                    self._append(out, changes, new_index)
+                end_offset = out.tell()
+                out.write(b')\n')
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.index = new_index
+        self._end_offset = end_offset
+        logger.info(f"Symbol library {self.path}: {stats}")
+        return stats
+
+    def _effective_changes(self, stats: Dict[str, int]) -> Dict[str, Optional[bytes]]:
+        # Drop staged blocks that are identical to what is on disk
+        changes = {}
+        for name, block in self._pending.items():
+            if block is None:
+                if name in self.index:
+                    changes[name] = None
+                    stats["removed"] += 1
+            elif name not in self.index:
+                changes[name] = block
+                stats["added"] += 1
+            elif self._is_unchanged(self._read_block(name), block):
+                stats["unchanged"] += 1
+            else:
+                changes[name] = block
+                stats["updated"] += 1
+        return changes
+
+    def _is_unchanged(self, old: bytes, new: bytes) -> bool:
+        if old == new:
+            return True
+        return self.structural_compare and is_equivalent(old.decode('utf-8'), new.decode('utf-8'))
+
+    def _read_block(self, name: str) -> bytes:
+        offset, length = self.index[name]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def _splice(self, src, out, changes: Dict[str, Optional[bytes]], new_index: Dict[str, Tuple[int, int]]) -> None:
+        blocks = sorted(self.index.items(), key=lambda item: item[1][0])
+        header_end = blocks[0][1][0] if blocks else self._end_offset
+        self._copy_range(src, out, 0, header_end)
+
+        # Unchanged neighbours are coalesced into a single range copy
+        run_start = None
+        run_names: List[Tuple[str, int, int]] = []
+        for name, (offset, length) in blocks:
+            if name in changes:
+                self._flush_run(src, out, run_start, run_names, new_index)
+                run_start, run_names = None, []
+                replacement = changes[name]
+                if replacement is not None:
+                    new_index[name] = (out.tell(), len(replacement))
+                    out.write(replacement)
+            else:
+                if run_start is None:
+                    run_start = offset
+                run_names.append((name, offset, length))
+        self._flush_run(src, out, run_start, run_names, new_index)
+
+        self._append(out, {n: b for n, b in changes.items() if n not in self.index}, new_index)
+
+    def _flush_run(self, src, out, run_start: Optional[int], run_names: List[Tuple[str, int, int]],
+                   new_index: Dict[str, Tuple[int, int]]) -> None:
+        if run_start is None:
+            return
+        shift = out.tell() - run_start
+        _, last_offset, last_length = run_names[-1]
+        self._copy_range(src, out, run_start, last_offset + last_length)
+        for name, offset, length in run_names:
+            new_index[name] = (offset + shift, length)
+
+    def _append(self, out, blocks: Dict[str, Optional[bytes]], new_index: Dict[str, Tuple[int, int]]) -> None:
+        for name, block in blocks.items():
+            if block is None:
+                continue
+            new_index[name] = (out.tell(), len(block))
+            out.write(block)
+
+    def _copy_range(self, src, out, start: int, end: int) -> None:
+        src.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = src.read(min(COPY_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            out.write(chunk)
+            remaining -= len(chunk)
+
+    def _load_index(self) -> None:
+        self.index = {}
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+
+        with open(self.path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # The library's own closing paren is the last one in the file
+                self._end_offset = mm.rfind(b')')
+                # Top-level children from the S-expression structure, so any
+                # indentation (KiCAD re-saves with tabs) is indexed
+                starts = []
+                for start, end in zip(*child_spans(mm)):
+                    head = mm[start:min(end, start + HEAD_READ_SIZE)].decode('utf-8', errors='ignore')
+                    child = LazyNode(head, 0, len(head))
+                    if child.head == "symbol" and child.name is not None:
+                        starts.append((self._line_start(mm, int(start)), child.name))
+
+        for i, (start, name) in enumerate(starts):
+            end = starts[i + 1][0] if i + 1 < len(starts) else self._end_offset
+            self.index[name] = (start, end - start)
+
+    @staticmethod
+    def _line_start(mm: mmap.mmap, offset: int) -> int:
+        # A block owns its indentation, so splicing keeps the file's layout
+        while offset > 0 and mm[offset - 1:offset] in (b' ', b'\t'):
+            offset -= 1
+        return offset
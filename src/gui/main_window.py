@@ -1,6 +1,8 @@
 import sys
 import os
+import json
 import asyncio
+import logging
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QSplitter, QTreeWidget, QTreeWidgetItem, QTabWidget,
                                QFileDialog, QToolBar, QMessageBox, QMenu, QStatusBar, QLabel)
@@ -13,9 +15,14 @@ from src.gui.editors.package_editor import PackageEditor
 from src.gui.editors.pin_editor import PinEditor
 
 from src.backend.ingestion import IngestionEngine
-from src.backend.llm_client import LLMClient
-from src.backend.extractor import ContentExtractor
+from src.backend.page_filter import HAS_FITZ, page_filter_from_env, relevant_pdf_path
+from src.backend.llm_router import LLMRouter, client_from_env, fast_client_from_env
+from src.backend.extractor import ContentExtractor, ALL_TARGETS
+from src.backend.few_shot import FewShotRetriever
+from src.backend.incremental_extractor import IncrementalExtractor
+from src.backend.near_duplicates import NearDuplicateDetector
 from src.backend.correction_logger import CorrectionLogger
+from src.backend.validation import ValidationIssue, ERROR, validate, normalize_pins, has_errors
 from src.database.db_manager import DBManager
 from src.models.data_models import Component, Package, Pin, Datasheet
 
@@ -23,6 +30,10 @@ from src.models.data_models import Component, Package, Pin, Datasheet
 from src.generators.symbol_generator import SymbolGenerator
 from src.generators.footprint_generator import FootprintGenerator
 from src.generators.model_generator import ModelGenerator
+from src.generators.package_registry import PackageRegistry
+from src.telemetry import configure_from_env
+
+logger = logging.getLogger(__name__)
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -36,16 +47,27 @@ class MainWindow(QMainWindow):
         # Initialize Backend Components
         self.db_manager = DBManager("component_data.db") # Use local DB for now
         self.ingestion_engine = IngestionEngine()
-        llm_base_url = os.getenv("LLM_BASE_URL", "http://localhost:8000/v1")
-        llm_model = os.getenv("LLM_MODEL", "Qwen/Qwen2.5-Coder-32B-Instruct")
-        self.llm_client = LLMClient(base_url=llm_base_url, model_name=llm_model)
-        self.extractor = ContentExtractor(self.llm_client)
+        # Only pages likely to hold pinouts and dimensions reach MinerU and the LLM (PAGE_FILTER=0 disables)
+        self.page_filter = page_filter_from_env()
+        # LLM_BASE_URL may list several vLLM replicas, comma-separated
+        self.llm_client = client_from_env()
+        # LLM_FAST_MODEL enables the small-model-first extraction cascade
+        fast_client = fast_client_from_env()
+        for client in (self.llm_client, fast_client):
+            if isinstance(client, LLMRouter):
+                client.start_health_checks()
+        # Verified corrections of similar datasheets become few-shot examples
+        self.extractor = ContentExtractor(self.llm_client, fast_client=fast_client,
+                                          few_shot=FewShotRetriever(self.db_manager))
         self.correction_logger = CorrectionLogger(self.db_manager)
+        # Republished datasheets can reuse the extraction of their earlier version
+        self.duplicate_detector = NearDuplicateDetector(self.db_manager)
         
         # Initialize Generators
         self.symbol_gen = SymbolGenerator()
         self.footprint_gen = FootprintGenerator()
         self.model_gen = ModelGenerator()
+        self.package_registry = PackageRegistry()
 
         # Data State
         self.current_datasheet: Datasheet = None
@@ -53,6 +75,10 @@ class MainWindow(QMainWindow):
         self.current_package: Package = None
         self.current_pins: list[Pin] = []
         self.current_file_path: str = None
+        self.validation_issues: list[ValidationIssue] = []
+        self.current_content: str = ""
+        self.current_sections: dict = {}
+        self.current_raw_json: dict = {}
 
         # UI Setup
         self._setup_ui()
@@ -194,8 +220,11 @@ class MainWindow(QMainWindow):
         self.update_status("Processing with LLM... (This may take a moment)")
         
         try:
-            # Check for corresponding .md file (MinerU output)
+            # Check for corresponding .md file (MinerU output), also when MinerU ran on the filtered PDF
             md_path = self.current_file_path.replace('.pdf', '.md')
+            relevant_md_path = relevant_pdf_path(self.current_file_path).replace('.pdf', '.md')
+            if not os.path.exists(md_path) and os.path.exists(relevant_md_path):
+                md_path = relevant_md_path
             content = ""
             sections = {}
             
@@ -213,39 +242,103 @@ class MainWindow(QMainWindow):
                     ingestion_result = self.ingestion_engine.process_file(json_path)
                     content = str(ingestion_result.get("raw_data", "")) # Convert JSON to string for now
                     sections = ingestion_result.get("sections", {})
+                elif self.page_filter is not None and HAS_FITZ:
+                    content, sections = self.read_relevant_pages(self.current_file_path)
                 
                 if not content:
                     # If no pre-processed content, we can't do much without running MinerU.
                     QMessageBox.warning(self, "Missing Content", 
                                         f"Could not find MinerU output (.md) for {self.current_datasheet.filename}.\n"
-                                        "Please run the ingestion script first.\n\n"
+                                        "Please run MinerU first. 'python -m src.backend.page_filter <pdf>' "
+                                        "writes the relevant pages to a smaller PDF to run it on.\n\n"
                                         "Attempting to proceed with empty content (will likely fail to extract data).")
                     self.update_status("Processing aborted: No content found.")
                     return
 
+            source_key = self.current_datasheet.filename
+            incremental = IncrementalExtractor(self.extractor, self.db_manager, self.ingestion_engine,
+                                               duplicates=self.duplicate_detector)
+            # A new revision of a known datasheet is diffed against its own last
+            # extraction; a new datasheet against a near-duplicate, if the user agrees
+            if self.db_manager.get_latest_extraction(source_key) is not None:
+                reuse_from = source_key
+            else:
+                reuse_from = self.offer_near_duplicate(source_key, content, sections)
+
             # Call Extractor
             self.update_status("Sending content to LLM...")
-            extracted_data = self.extractor.extract_all(content, datasheet_id=1, sections=sections)
+            if reuse_from:
+                extracted_data = incremental.extract(source_key, content, sections, reuse_from=reuse_from)
+            else:
+                extracted_data = self.extractor.extract_all(content, datasheet_id=1, sections=sections)
+                if extracted_data:
+                    self.remember_extraction(incremental, source_key, content, sections, extracted_data)
             
             if not extracted_data:
                 raise Exception("Extraction returned no data.")
 
+            self.current_content, self.current_sections = content, sections
+            self.current_raw_json = extracted_data.get("raw_json") or {}
             self.current_component = extracted_data.get("component")
             self.current_package = extracted_data.get("package")
-            self.current_pins = extracted_data.get("pins")
+            self.current_pins = normalize_pins(extracted_data.get("pins") or [])
             
-            # DEBUG: Print response
-            if self.current_component:
-                print(f"Response: {self.current_component.model_dump_json()}")
-            print("----------------------")
+            if self.current_component and logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Extracted component: {self.current_component.model_dump_json()}")
             
             self.update_ui_from_data()
-            self.update_status("LLM Processing Complete.")
+            issues = self.run_validation()
+            self.update_status("LLM Processing Complete." + (f" {len(issues)} validation issue(s)." if issues else ""))
             
         except Exception as e:
             self.update_status(f"Error: {str(e)}")
             QMessageBox.critical(self, "Error", f"Failed to process file: {str(e)}")
 
+    def read_relevant_pages(self, pdf_path: str):
+        """
+        Extracts text from the relevant pages of a PDF that has no MinerU output yet.
+
+        The kept pages are also written to '<name>.relevant.pdf', so MinerU can
+        later be run on them instead of the whole datasheet.
+
+        Returns:
+            (content, sections) of the kept pages.
+        """
+        filtered = self.page_filter.filter_pdf(pdf_path, relevant_pdf_path(pdf_path))
+        report = filtered["report"]
+        self.update_status(f"Page filter kept {report['kept_pages']}/{report['total_pages']} pages")
+        ingestion_result = self.ingestion_engine.process_text(filtered["text"])
+        return ingestion_result.get("content", ""), ingestion_result.get("sections", {})
+
+    def offer_near_duplicate(self, source_key: str, content: str, sections: dict):
+        """
+        Asks whether to reuse the stored extraction of a near-duplicate datasheet.
+
+        Returns:
+            The near-duplicate's source key if the user accepted, else None.
+        """
+        try:
+            match = self.duplicate_detector.best_reusable(sections, content, exclude=source_key)
+        except Exception as e:
+            logger.warning(f"Near-duplicate lookup failed: {e}")
+            return None
+        if not match:
+            return None
+        reply = QMessageBox.question(
+            self, "Near-Duplicate Datasheet",
+            f"{source_key} is {match['similarity']:.0%} similar to {match['source_key']}, "
+            "which was already extracted.\n\n"
+            "Reuse that extraction and only re-extract the sections that differ?")
+        return match["source_key"] if reply == QMessageBox.StandardButton.Yes else None
+
+    def remember_extraction(self, incremental: IncrementalExtractor, source_key: str, content: str,
+                            sections: dict, extracted_data: dict):
+        """Stores an extraction so later revisions and near-duplicates can reuse it."""
+        try:
+            incremental.store(source_key, content, sections, extracted_data.get("raw_json") or {})
+        except Exception as e:
+            logger.warning(f"Could not store extraction of {source_key}: {e}")
+
     def update_ui_from_data(self):
         if self.current_component:
             # Update Component Editor
@@ -283,18 +376,37 @@ class MainWindow(QMainWindow):
                 QTreeWidgetItem(comp, [f"{len(self.current_pins)} Pins"])
             self.project_tree.expandAll()
 
+    def run_validation(self) -> list[ValidationIssue]:
+        """Checks the current part and lists the findings in the status bar tooltip."""
+        self.validation_issues = validate(self.current_component, self.current_package, self.current_pins)
+        for issue in self.validation_issues:
+            logger.info(f"Validation {issue.severity}: {issue.field}: {issue.message}")
+        self.status_label.setToolTip("\n".join(f"[{i.severity}] {i.message}" for i in self.validation_issues))
+        return self.validation_issues
+
     def generate_files(self):
         if not self.current_component:
             QMessageBox.warning(self, "Warning", "No component loaded.")
             return
 
+        # Inconsistent data would only produce a footprint that has to be redone
+        issues = self.run_validation()
+        if has_errors(issues):
+            errors = "\n".join(f"- {i.message}" for i in issues if i.severity == ERROR)
+            self.update_status("Generation blocked by validation errors.")
+            QMessageBox.warning(self, "Validation Failed", f"Fix these issues before generating:\n{errors}")
+            return
+
         try:
             self.update_status("Generating files...")
+            # Footprints are shared by every part with the same package geometry
+            fp_ref = self.package_registry.footprint_ref(self.current_package) if self.current_package else ""
+
             # Generate Symbol
-            sym_content = self.symbol_gen.generate_symbol(self.current_component, self.current_pins)
+            sym_content = self.symbol_gen.generate_symbol(self.current_component, self.current_pins, fp_ref)
             
             # Generate Footprint
-            fp_content = self.footprint_gen.generate_footprint(self.current_package)
+            fp_content = self.footprint_gen.generate_footprint(self.package_registry.canonical_package(self.current_package))
             
             # Generate Model
             # model_path = self.model_gen.generate_model(self.current_package)
@@ -302,8 +414,9 @@ class MainWindow(QMainWindow):
             # Save to disk (Mocking save dialog)
             # In real app, ask user where to save
             
-            print("Generated Symbol:\n", sym_content)
-            print("Generated Footprint:\n", fp_content)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Generated symbol:\n{sym_content}")
+                logger.debug(f"Generated footprint:\n{fp_content}")
             
             self.update_status("Files generated successfully.")
             QMessageBox.information(self, "Success", "Files generated successfully (printed to console for now).")
@@ -317,10 +430,15 @@ class MainWindow(QMainWindow):
         # In a real scenario, we'd compare original LLM output with current editor state
         if self.current_component:
             try:
+                corrected = {"component": self.current_component.model_dump(mode="json")}
+                if self.current_package:
+                    corrected["package"] = self.current_package.model_dump(mode="json")
+                corrected["pins"] = [pin.model_dump(mode="json") for pin in self.current_pins or []]
+                # Logged under the extraction context so few-shot retrieval can find it
                 self.correction_logger.log_correction(
-                    prompt="Extract component data",
-                    original_output="{}", # Mock original
-                    user_corrected_output=self.current_component.model_dump_json()
+                    prompt=self.extractor.build_context(self.current_content, self.current_sections, ALL_TARGETS),
+                    original_output=self.current_raw_json,
+                    user_corrected_output=json.dumps(corrected)
                 )
                 self.update_status("Correction logged.")
                 QMessageBox.information(self, "Success", "Correction logged.")
@@ -329,6 +447,8 @@ class MainWindow(QMainWindow):
                 QMessageBox.critical(self, "Error", f"Failed to log correction: {str(e)}")
 
 def main():
+    # Opt-in trace file / Prometheus endpoint via TRACE_JSONL_PATH and METRICS_PORT
+    configure_from_env()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -1,8 +1,13 @@
-import fitz  # PyMuPDF
+import logging
+from src.lazy_import import lazy_import
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QScrollArea, QLabel, QSizePolicy, QHBoxLayout, QPushButton, QLineEdit
 from PySide6.QtGui import QImage, QPixmap, QPainter, QColor, QBrush, QPen
 from PySide6.QtCore import Qt, QRectF, Signal
 
+fitz = lazy_import("fitz")  # PyMuPDF, loaded when the first PDF is opened
+
+logger = logging.getLogger(__name__)
+
 class PdfPageWidget(QLabel):
     """
     Widget to display a single page of a PDF.
@@ -123,7 +128,7 @@ class PdfViewer(QWidget):
             self.render_page()
             self.update_controls()
         except Exception as e:
-            print(f"Error loading PDF: {e}")
+            logger.error(f"Error loading PDF: {e}")
 
     def render_page(self):
         if not self.doc:
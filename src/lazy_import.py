@@ -0,0 +1,83 @@
+import importlib
+import importlib.util
+import threading
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule(ModuleType):
+    """
+    Module proxy that imports the real module on first attribute access.
+
+    Lets heavy optional dependencies (CadQuery, OpenAI, PyMuPDF) be
+    referenced at module level without paying their import cost until the
+    feature that needs them is actually used.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+class LazyAttribute:
+    """Proxy for a module attribute (e.g. a class) resolved on first use."""
+
+    def __init__(self, module: LazyModule, attr: str):
+        self._module = module
+        self._attr = attr
+
+    def resolve(self) -> Any:
+        return getattr(self._module, self._attr)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy attribute '{self._module.__name__}.{self._attr}'>"
+
+
+def lazy_import(name: str, attr: Optional[str] = None) -> Any:
+    """
+    Returns a lazy proxy for a module, or for one of its attributes.
+
+    Args:
+        name: Fully qualified module name.
+        attr: Optional attribute of the module to proxy instead.
+
+    Returns:
+        A LazyModule, or a LazyAttribute when `attr` is given.
+    """
+    module = LazyModule(name)
+    return LazyAttribute(module, attr) if attr else module
+
+
+def is_available(name: str) -> bool:
+    """Checks whether a module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
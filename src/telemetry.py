@@ -0,0 +1,284 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets (seconds) covering sub-ms parsing up to multi-minute LLM calls
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Environment variables read by configure_from_env()
+TRACE_FILE_ENV = "TRACE_JSONL_PATH"
+METRICS_PORT_ENV = "METRICS_PORT"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed unit of work. Attributes can be added while it is open."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_time", "duration", "attributes", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start_time,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Metrics:
+    """Thread-safe counters and histograms rendered in Prometheus text format."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._help: Dict[str, str] = {}
+
+    def inc(self, name: str, value: float = 1.0, help: str = "", **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+            self._help.setdefault(name, help)
+
+    def set_gauge(self, name: str, value: float, help: str = "", **labels: Any) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[self._key(labels)] = value
+            self._help.setdefault(name, help)
+
+    def observe(self, name: str, value: float, help: str = "", **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            # Per-bucket counts, then sum and count
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+            self._help.setdefault(name, help)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(self._key(labels), 0.0)
+
+    def histogram(self, name: str, **labels: Any) -> Dict[str, float]:
+        """Returns {'count', 'sum'} of a histogram series."""
+        with self._lock:
+            state = self._histograms.get(name, {}).get(self._key(labels))
+        return {"count": state[-1], "sum": state[-2]} if state else {"count": 0, "sum": 0.0}
+
+    def gauge(self, name: str, **labels: Any) -> Optional[float]:
+        with self._lock:
+            return self._gauges.get(name, {}).get(self._key(labels))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._gauges.clear()
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for kind, family in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, series in sorted(family.items()):
+                    lines += self._header(name, kind)
+                    lines += [f"{name}{self._labels(key)} {value:g}" for key, value in series.items()]
+            for name, series in sorted(self._histograms.items()):
+                lines += self._header(name, "histogram")
+                for key, state in series.items():
+                    for bound, count in zip(self.buckets, state):
+                        lines.append(f"{name}_bucket{self._labels(key, le=f'{bound:g}')} {count:g}")
+                    lines.append(f"{name}_bucket{self._labels(key, le='+Inf')} {state[-1]:g}")
+                    lines.append(f"{name}_sum{self._labels(key)} {state[-2]:g}")
+                    lines.append(f"{name}_count{self._labels(key)} {state[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, name: str, kind: str) -> List[str]:
+        help_text = self._help.get(name)
+        return ([f"# HELP {name} {help_text}"] if help_text else []) + [f"# TYPE {name} {kind}"]
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    @staticmethod
+    def _labels(key: LabelKey, **extra: str) -> str:
+        pairs = list(key) + list(extra.items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class JsonlExporter:
+    """Appends finished spans to a JSON Lines trace file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8', buffering=1)
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """
+    Records spans for pipeline stages and feeds their durations into
+    `stage_duration_seconds{stage=...}`.
+
+    Usage:
+        with tracer.span("ingestion", path=file_path) as span:
+            ...
+            span.set("sections", len(sections))
+    """
+
+    def __init__(self, metrics: Optional[Metrics] = None):
+        self.metrics = metrics or Metrics()
+        self.exporters: List[Any] = []
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        span = Span(name, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            _current_span.reset(token)
+            self.metrics.observe("stage_duration_seconds", span.duration,
+                                 help="Duration of pipeline stages", stage=name)
+            if span.error:
+                self.metrics.inc("stage_errors_total", help="Failed pipeline stages", stage=name)
+            for exporter in self.exporters:
+                try:
+                    exporter.export(span)
+                except Exception as e:
+                    logger.warning(f"Span export failed: {e}")
+
+    def traced(self, name: str) -> Callable:
+        """Decorator running the function inside a span."""
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+
+class MetricsServer:
+    """Serves `metrics.render_prometheus()` on http://host:port/metrics."""
+
+    def __init__(self, metrics: Metrics, port: int = 9464, host: str = "127.0.0.1"):
+        metrics_ref = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics_ref.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        logger.info(f"Metrics available at http://{host}:{self.port}/metrics")
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+tracer = Tracer()
+metrics = tracer.metrics
+
+
+def configure(trace_path: Optional[str] = None, metrics_port: Optional[int] = None) -> Optional[MetricsServer]:
+    """
+    Enables exporters on the global tracer.
+
+    Args:
+        trace_path: Append finished spans to this JSONL file.
+        metrics_port: Serve Prometheus metrics on this port (0 picks a free one).
+
+    Returns:
+        The metrics server, if one was started.
+    """
+    if trace_path:
+        tracer.exporters.append(JsonlExporter(trace_path))
+        logger.info(f"Writing traces to {trace_path}")
+    if metrics_port is not None:
+        return MetricsServer(metrics, metrics_port)
+    return None
+
+
+def configure_from_env() -> Optional[MetricsServer]:
+    """configure() from TRACE_JSONL_PATH and METRICS_PORT, if set."""
+    port = os.getenv(METRICS_PORT_ENV)
+    return configure(os.getenv(TRACE_FILE_ENV), int(port) if port else None)
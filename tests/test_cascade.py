@@ -0,0 +1,92 @@
+import copy
+import pytest
+from src.backend.extractor import ContentExtractor, escalation_reasons, expected_pin_count
+from src.backend.llm_client import LLMClient
+from src.backend.llm_router import fast_client_from_env
+from src.benchmarks.mock_vllm import MockVLLMServer
+from src.models.data_models import Package
+
+SECTIONS = {
+    "description": "The MOCK-1234 is a low-noise op-amp.",
+    "package_dimensions": "SOT-23, 2.9 x 1.3 mm",
+    "pin_configuration": "| 1 | OUT |",
+}
+
+SOT23_RESPONSE = {
+    "component": {"part_number": "MOCK-23", "manufacturer": "Mock", "description": "N-MOSFET"},
+    "package": {"name": "SOT-23", "package_type": "SOT", "dimensions": {}},
+    "pins": [{"number": str(i), "name": name, "electrical_type": "passive", "description": ""}
+             for i, name in enumerate(["G", "S", "D"], start=1)],
+}
+
+
+def run_cascade(fast_response, fast_failure_rate=0.0):
+    with MockVLLMServer(responses=fast_response, model_name="small", failure_rate=fast_failure_rate) as fast, \
+            MockVLLMServer(responses=SOT23_RESPONSE, model_name="large") as large:
+        extractor = ContentExtractor(LLMClient(base_url=large.base_url, model_name="large"),
+                                     fast_client=LLMClient(base_url=fast.base_url, model_name="small", max_retries=0))
+        result = extractor.extract_all("", sections=SECTIONS)
+    return result, fast.stats["requests"], large.stats["requests"]
+
+
+def test_simple_part_is_answered_by_fast_model():
+    result, fast_calls, large_calls = run_cascade(SOT23_RESPONSE)
+
+    assert (fast_calls, large_calls) == (1, 0)
+    assert result["component"].part_number == "MOCK-23"
+    assert len(result["pins"]) == 3
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda r: r["pins"].pop(),                                  # 2 pins for SOT-23
+    lambda r: r["component"].update(part_number="Unknown"),
+    lambda r: r["pins"][1].update(number="1"),                  # duplicate pin number
+])
+def test_implausible_fast_result_is_escalated(mutate):
+    response = copy.deepcopy(SOT23_RESPONSE)
+    mutate(response)
+
+    result, fast_calls, large_calls = run_cascade(response)
+
+    assert (fast_calls, large_calls) == (1, 1)
+    assert result["component"].part_number == "MOCK-23"
+    assert [p.number for p in result["pins"]] == ["1", "2", "3"]
+
+
+def test_fast_model_failure_is_escalated():
+    result, fast_calls, large_calls = run_cascade(SOT23_RESPONSE, fast_failure_rate=1.0)
+    assert (fast_calls, large_calls) == (1, 1)
+    assert len(result["pins"]) == 3
+
+
+@pytest.mark.parametrize("name, dimensions, expected", [
+    ("SOT-23", {}, 3), ("SOT23-5", {}, 5), ("SOT-223", {}, 4), ("TO-220", {}, 3),
+    ("SOIC-8", {}, 8), ("TSSOP20", {}, 20), ("QFN", {"pin_count": 16}, 16), ("0805", {}, None),
+])
+def test_expected_pin_count(name, dimensions, expected):
+    assert expected_pin_count(Package(component_id=0, name=name, dimensions=dimensions)) == expected
+
+
+def test_exposed_pad_is_not_a_pin_count_mismatch():
+    extractor = ContentExtractor(llm_client=None)
+    response = copy.deepcopy(SOT23_RESPONSE)
+    response["package"]["name"] = "QFN-4"
+    response["pins"] += [{"number": "4", "name": "VDD"}, {"number": "EP", "name": "GND"}]
+
+    result = extractor.build_result(response)
+
+    assert escalation_reasons(result, ["component", "package", "pins"]) == []
+    assert escalation_reasons(result, ["pins"]) == []
+
+
+def test_fast_client_from_env(monkeypatch):
+    monkeypatch.delenv("LLM_FAST_MODEL", raising=False)
+    assert fast_client_from_env() is None
+
+    monkeypatch.setenv("LLM_BASE_URL", "http://gpu1:8000/v1")
+    monkeypatch.setenv("LLM_FAST_MODEL", "Qwen/Qwen2.5-3B-Instruct")
+    client = fast_client_from_env()
+    assert (client.base_url, client.model_name) == ("http://gpu1:8000/v1", "Qwen/Qwen2.5-3B-Instruct")
+
+    monkeypatch.setenv("LLM_FAST_BASE_URL", "http://gpu2:8001/v1")
+    assert fast_client_from_env().base_url == "http://gpu2:8001/v1"
@@ -0,0 +1,107 @@
+import time
+import threading
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.backend.concurrency import AdaptiveLimiter
+from src.backend.llm_client import LLMClient
+from src.benchmarks.mock_vllm import MockVLLMServer
+from src.telemetry import metrics
+
+
+class Overloaded(Exception):
+    pass
+
+
+def make_limiter(**options):
+    return AdaptiveLimiter(is_overload=lambda e: isinstance(e, Overloaded), name="test", **options)
+
+
+def fail_inside(limiter, error):
+    with pytest.raises(type(error)):
+        with limiter.acquire():
+            raise error
+
+
+def test_overload_cuts_limit_once_per_generation():
+    limiter = make_limiter(initial_limit=10)
+
+    # Three requests in flight fail together: one cut, not three
+    with pytest.raises(Overloaded):
+        with ExitStack() as stack:
+            for _ in range(3):
+                stack.enter_context(limiter.acquire())
+            raise Overloaded()
+    assert limiter.limit == pytest.approx(7.0)
+
+    fail_inside(limiter, Overloaded())
+    assert limiter.limit == pytest.approx(4.9)
+    fail_inside(limiter, ValueError("bad request"))
+    assert limiter.limit == pytest.approx(4.9)
+    assert metrics.counter("llm_concurrency_decreases_total", limiter="test", reason="overload") >= 2
+
+
+def test_limit_grows_only_when_saturated():
+    limiter = make_limiter(initial_limit=2, window=1000)
+    with limiter.acquire():
+        pass
+    assert limiter.limit == 2.0
+
+    with limiter.acquire(), limiter.acquire():
+        pass
+    assert limiter.limit == pytest.approx(2.5)
+    assert metrics.gauge("llm_concurrency_limit", limiter="test") == 2
+
+
+def test_latency_spike_cuts_limit():
+    limiter = make_limiter(initial_limit=8, window=5)
+    for delay in [0.002] * 5 + [0.03] * 5:
+        with limiter.acquire():
+            time.sleep(delay)
+
+    assert limiter.limit == pytest.approx(8 * 0.7)
+    assert 1.0 <= limiter.stats()["baseline_ms"] < 10.0
+
+
+def test_waiters_queue_at_the_limit():
+    limiter = make_limiter(initial_limit=1)
+    release = threading.Event()
+
+    def hold():
+        with limiter.acquire():
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    try:
+        with pytest.raises(TimeoutError):
+            with limiter.acquire(timeout=0.05):
+                pass
+        waiter = threading.Thread(target=hold)
+        waiter.start()
+        deadline = time.time() + 5
+        while limiter.stats()["waiting"] == 0 and time.time() < deadline:
+            time.sleep(0.005)
+        assert metrics.gauge("llm_concurrency_queue_depth", limiter="test") == 1
+    finally:
+        release.set()
+        holder.join()
+        waiter.join()
+    assert limiter.stats()["in_flight"] == limiter.stats()["waiting"] == 0
+
+
+def test_client_limiter_backs_off_on_503_and_grows_under_load():
+    with MockVLLMServer(failure_rate=1.0) as server:
+        client = LLMClient(base_url=server.base_url, model_name=server.model_name, max_retries=0,
+                           adaptive_concurrency=True)
+        for _ in range(3):
+            with pytest.raises(Exception):
+                client.generate("x")
+    assert client.limiter.limit == pytest.approx(4 * 0.7 ** 3)
+
+    with MockVLLMServer(latency_ms=20) as server:
+        client = LLMClient(base_url=server.base_url, model_name=server.model_name, adaptive_concurrency=True)
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(lambda _: client.generate("x"), range(64)))
+    assert client.limiter.limit > 4
+    assert client.limiter.stats()["in_flight"] == 0
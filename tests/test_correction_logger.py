@@ -13,7 +13,7 @@ def test_log_correction(mock_db):
     mock_db.execute_query.assert_called_once()
     args = mock_db.execute_query.call_args[0]
     assert "INSERT INTO correction_log" in args[0]
-    assert args[1] == ("prompt", "original", "corrected")
+    assert args[1] == ("EXTRACTION", "prompt", "original", "corrected")
 
 def test_log_correction_json(mock_db):
     logger = CorrectionLogger(mock_db)
@@ -22,4 +22,4 @@ def test_log_correction_json(mock_db):
     mock_db.execute_query.assert_called_once()
     args = mock_db.execute_query.call_args[0]
     # Check that dicts were converted to json strings
-    assert args[1] == ("prompt", '{"key": "val"}', '{"key": "val2"}')
+    assert args[1] == ("EXTRACTION", "prompt", '{"key": "val"}', '{"key": "val2"}')
@@ -100,6 +100,8 @@ class TestEndToEnd(unittest.TestCase):
             Pin(package_id=1, number="1", name="GND", electrical_type="Power")
         ]
         
+        # A datasheet seen for the first time has no stored extraction to diff against
+        self.window.db_manager.get_latest_extraction.return_value = None
         self.window.extractor.extract_all.return_value = {
             "component": mock_component,
             "package": mock_package,
@@ -153,5 +155,34 @@ class TestEndToEnd(unittest.TestCase):
         
         print("--- End-to-End Test Passed ---")
 
+    def test_generation_blocked_by_validation_errors(self):
+        self.window.current_component = Component(datasheet_id=1, part_number="MOCKED-PART")
+        self.window.current_package = Package(component_id=1, name="SOIC-8")
+        self.window.current_pins = [Pin(package_id=1, number=str(i % 8 or 8)) for i in range(1, 15)]
+
+        self.window.generate_files()
+
+        self.window.footprint_gen.generate_footprint.assert_not_called()
+        self.mock_msg.warning.assert_called_once()
+        self.assertIn("14 pins", self.mock_msg.warning.call_args[0][2])
+        self.assertEqual({i.rule for i in self.window.validation_issues}, {"pin_count", "pin_numbers"})
+
+    def test_reingested_datasheet_is_extracted_incrementally(self):
+        self.window.pdf_viewer.load_document = MagicMock()
+        self.window.load_datasheet("/tmp/dummy_datasheet.pdf")
+        self.window.db_manager.get_latest_extraction.return_value = {"section_hashes": {}, "raw_json": {}}
+
+        with patch('src.gui.main_window.IncrementalExtractor') as incremental_cls, \
+             patch('os.path.exists', return_value=True):
+            incremental_cls.return_value.extract.return_value = {"component": None, "pins": [],
+                                                                 "reextracted": [], "reused_from": None}
+            self.window.process_with_llm()
+
+        # Diffed against its own stored extraction; no near-duplicate prompt
+        incremental_cls.return_value.extract.assert_called_once()
+        self.assertEqual(incremental_cls.return_value.extract.call_args[1]["reuse_from"], "dummy_datasheet.pdf")
+        self.window.extractor.extract_all.assert_not_called()
+        self.mock_msg.question.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
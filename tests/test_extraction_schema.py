@@ -0,0 +1,62 @@
+from src.backend.extractor import ContentExtractor, extraction_schema, SCHEMA_EXCLUDED_FIELDS, DIMENSION_KEYS
+from src.backend.llm_client import LLMClient
+from src.benchmarks.mock_vllm import MockVLLMServer, DEFAULT_RESPONSE
+
+SECTIONS = {
+    "description": "The MOCK-1234 is a low-noise op-amp.",
+    "package_dimensions": "SOIC-8, 4.9 x 3.9 mm",
+    "pin_configuration": "| 1 | OUT |",
+}
+
+
+def _properties(schema, name):
+    return set(schema["$defs"][name]["properties"])
+
+
+def test_schema_is_derived_from_models_without_database_fields():
+    schema = extraction_schema()
+
+    assert schema["required"] == ["component", "package", "pins"]
+    assert _properties(schema, "ComponentExtraction") == {"part_number", "manufacturer", "description"}
+    assert _properties(schema, "PackageExtraction") == {"name", "package_type", "dimensions"}
+    assert _properties(schema, "PinExtraction") == {"number", "name", "electrical_type", "description"}
+    assert schema["properties"]["pins"]["type"] == "array"
+    for definition in schema["$defs"].values():
+        assert not SCHEMA_EXCLUDED_FIELDS & set(definition["properties"])
+
+
+def test_package_dimensions_have_named_keys():
+    dimensions = extraction_schema(["package"])["$defs"]["PackageDimensions"]
+
+    assert set(dimensions["properties"]) == set(DIMENSION_KEYS)
+    assert {"body_width", "body_length", "pitch", "pin_count", "height"} <= set(DIMENSION_KEYS)
+    assert dimensions["additionalProperties"] is False
+    assert "required" not in dimensions
+
+
+def test_schema_covers_only_requested_targets():
+    schema = extraction_schema(["pins", "package"])
+
+    assert list(schema["properties"]) == ["package", "pins"]
+    schema["properties"].clear()
+    assert list(extraction_schema(["pins", "package"])["properties"]) == ["package", "pins"]
+
+
+def test_extractor_sends_schema_instead_of_prompting_for_it():
+    requests = []
+
+    def respond(body):
+        requests.append(body)
+        return DEFAULT_RESPONSE
+
+    with MockVLLMServer(responses=respond) as server:
+        client = LLMClient(base_url=server.base_url, model_name=server.model_name)
+        result = ContentExtractor(client, resolve_packages=False).extract_all("", sections=SECTIONS)
+
+    assert result["component"].part_number == "MOCK-1234"
+    assert len(result["pins"]) == 8
+    body = requests[0]
+    assert body["response_format"]["type"] == "json_schema"
+    assert body["response_format"]["json_schema"]["schema"] == extraction_schema()
+    prompt = body["messages"][-1]["content"]
+    assert "Schema" not in prompt and '"part_number"' not in prompt
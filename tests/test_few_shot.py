@@ -0,0 +1,119 @@
+import os
+import json
+import pytest
+from unittest.mock import MagicMock
+from src.backend.correction_logger import CorrectionLogger
+from src.backend.extractor import ContentExtractor
+from src.backend.few_shot import BM25Index, FewShotRetriever
+from src.backend.prompts import DEFAULT_TEMPLATE
+from src.database.db_manager import DBManager
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'database', 'schema.sql')
+
+
+def correction(part_number, package, pins):
+    return {
+        "component": {"id": 7, "datasheet_id": 3, "part_number": part_number, "manufacturer": "ACME"},
+        "package": {"component_id": 7, "name": package, "dimensions": {}},
+        "pins": [{"package_id": 1, "number": str(i), "name": name, "electrical_type": "power_in"}
+                 for i, name in enumerate(pins, start=1)],
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DBManager(str(tmp_path / "test.db"))
+    db.initialize_db(SCHEMA_PATH)
+    corrections = CorrectionLogger(db)
+    corrections.log_correction("LDO voltage regulator 300 mA low dropout SOT-23-5 enable pin",
+                               {}, correction("LDO300", "SOT-23-5", ["IN", "GND", "EN", "NC", "OUT"]))
+    corrections.log_correction("Dual operational amplifier rail-to-rail SOIC-8",
+                               {}, correction("OPA2", "SOIC-8", ["OUT1", "IN1-", "IN1+", "V-"]))
+    corrections.log_correction("12-bit ADC SPI interface TSSOP-16", {}, correction("ADC12", "TSSOP-16", ["CS"]))
+    return db
+
+
+def test_bm25_ranks_by_shared_rare_terms():
+    index = BM25Index()
+    index.add("ldo", "low dropout regulator LDO SOT-23-5 enable")
+    index.add("opamp", "dual operational amplifier rail-to-rail SOIC-8")
+    index.add("adc", "12-bit ADC SPI SOIC-8")
+
+    assert [key for key, _ in index.search("LDO regulator with enable", k=3)] == ["ldo"]
+    assert index.search("SOIC-8 amplifier", k=1)[0][0] == "opamp"
+    assert index.search("nothing in common") == []
+
+    # Re-adding a key replaces its text
+    index.add("ldo", "buck converter")
+    assert index.search("LDO regulator") == [] and len(index) == 3
+    index.remove("adc")
+    assert [key for key, _ in index.search("SOIC-8", k=3)] == ["opamp"]
+
+
+def test_retriever_returns_similar_verified_outputs(db):
+    retriever = FewShotRetriever(db, k=2)
+
+    examples = retriever.examples("300 mA LDO regulator with enable, SOT-23-5 package")
+
+    assert examples[0]["id"] == 1
+    output = json.loads(examples[0]["json"])
+    assert output["component"] == {"part_number": "LDO300", "manufacturer": "ACME"}
+    assert [p["name"] for p in output["pins"]] == ["IN", "GND", "EN", "NC", "OUT"]
+    assert "package_id" not in output["pins"][0]
+    assert list(json.loads(retriever.examples("LDO regulator", targets=["pins"])[0]["json"])) == ["pins"]
+
+
+def test_new_corrections_are_indexed_incrementally(db):
+    retriever = FewShotRetriever(db)
+    assert retriever.refresh() == 3
+    assert retriever.refresh() == 0
+
+    CorrectionLogger(db).log_correction("Hall effect sensor open drain output SOT-23", {},
+                                        correction("HALL1", "SOT-23", ["VDD", "OUT", "GND"]))
+    examples = retriever.examples("open drain hall effect sensor")
+
+    assert json.loads(examples[0]["json"])["component"]["part_number"] == "HALL1"
+    assert len(retriever.index) == 4
+
+
+def test_budget_and_similarity_threshold(db):
+    retriever = FewShotRetriever(db, k=3, max_chars=400)
+    examples = retriever.examples("LDO regulator SOT-23-5 operational amplifier SOIC-8")
+    assert sum(len(e["json"]) for e in examples) <= 400 and len(examples) == 1
+
+    assert FewShotRetriever(db).examples("unrelated text about nothing") == []
+
+
+def test_unreadable_correction_log_falls_back_to_zero_shot():
+    db = MagicMock()
+    db.fetch_all.side_effect = RuntimeError("no such table: correction_log")
+    assert FewShotRetriever(db).examples("LDO regulator") == []
+
+
+def test_legacy_component_only_corrections_are_used(tmp_path):
+    db = DBManager(str(tmp_path / "legacy.db"))
+    db.initialize_db(SCHEMA_PATH)
+    CorrectionLogger(db).log_correction("Quad comparator", "{}", json.dumps({"part_number": "CMP4", "id": 2}))
+    CorrectionLogger(db).log_correction("Buck converter", "{}", json.dumps({"part_number": "BUCK1"}))
+
+    examples = FewShotRetriever(db).examples("quad comparator datasheet")
+    assert json.loads(examples[0]["json"]) == {"component": {"part_number": "CMP4"}}
+
+
+def test_examples_go_between_shared_prefix_and_datasheet_text(db):
+    client = MagicMock()
+    client.generate.return_value = {}
+    extractor = ContentExtractor(client, few_shot=FewShotRetriever(db, k=1), resolve_packages=False)
+    sections = {"description": "Low dropout LDO regulator, 300 mA, with enable", "pin_configuration": "1 IN"}
+
+    extractor.extract_all("", sections=sections, targets=["component", "pins"])
+
+    prompt = client.generate.call_args[1]["prompt"]
+    assert prompt.startswith(DEFAULT_TEMPLATE.prefix)
+    example_at = prompt.index('{"component":{"part_number":"LDO300"')
+    assert len(DEFAULT_TEMPLATE.prefix) < example_at < prompt.index("Extract only: component, pins")
+    assert '"package"' not in prompt
+
+    # Without a retriever the prompt is unchanged
+    system, user = ContentExtractor(client, resolve_packages=False).build_prompt("", sections, ["pins"])
+    assert "Verified extractions" not in user
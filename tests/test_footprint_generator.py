@@ -0,0 +1,90 @@
+import re
+import pytest
+from src.benchmarks.generators import bga_package
+from src.generators.footprint_generator import FootprintGenerator
+from src.models.data_models import Package
+
+
+@pytest.fixture
+def generator():
+    return FootprintGenerator()
+
+
+def ball_names(content):
+    return re.findall(r'\(pad "(\w+)" smd circle', content)
+
+
+def test_grid_row_names_skip_reserved_letters(generator):
+    names = generator._grid_row_names(22)
+    assert "I" not in names and "O" not in names
+    assert names[:3] == ["A", "B", "C"]
+    assert names[19:] == ["Y", "AA", "AB"]
+
+
+def test_bga_full_grid(generator):
+    pkg = Package(component_id=0, name="BGA-64", package_type="BGA",
+                  dimensions={"rows": 8, "columns": 8, "pitch": 0.8, "ball_diameter": 0.4})
+    content = generator.generate_footprint(pkg)
+    names = ball_names(content)
+
+    assert len(names) == 64
+    assert names[0] == "A1" and names[-1] == "H8"
+    assert '(pad "A1" smd circle (at -2.8 -2.8) (size 0.32 0.32)' in content
+
+
+def test_bga_depopulation(generator):
+    pkg = Package(component_id=0, name="BGA-100", package_type="BGA",
+                  dimensions={"rows": 10, "columns": 10, "pitch": 0.5, "center_rows": 4},
+                  model_params={"depopulated_balls": ["A1", "K10"]})
+    names = ball_names(generator.generate_footprint(pkg))
+
+    assert len(names) == 100 - 16 - 2
+    assert "A1" not in names and "E5" not in names
+    assert "A2" in names
+
+
+def test_bga_perimeter_and_stagger(generator):
+    perimeter = Package(component_id=0, name="BGA-P", package_type="BGA",
+                        dimensions={"rows": 10, "columns": 10, "perimeter_rows": 2})
+    staggered = Package(component_id=0, name="BGA-S", package_type="BGA",
+                        dimensions={"rows": 10, "columns": 10, "stagger": 1})
+
+    assert len(ball_names(generator.generate_footprint(perimeter))) == 100 - 36
+    names = ball_names(generator.generate_footprint(staggered))
+    assert len(names) == 50
+    assert "A1" in names and "A2" not in names and "B2" in names
+
+
+def test_large_bga_names_every_ball(generator):
+    content = generator.generate_footprint(bga_package(54))
+
+    assert len(ball_names(content)) == 2916
+    assert '(pad "BB54" ' in content
+
+
+def pad_positions(content):
+    return {m[0]: (float(m[1]), float(m[2]))
+            for m in re.findall(r'\(pad "(\w+)" smd rect \(at (\S+) (\S+)\)', content)}
+
+
+@pytest.mark.parametrize("name, expected", [
+    # Pin 1 top left; the lone pin of SOT-23 sits opposite the centre
+    ("SOT-23", {"1": (-1, -1), "2": (-1, 1), "3": (1, 0)}),
+    ("SOT-23-5", {"1": (-1, -1), "2": (-1, 0), "3": (-1, 1), "4": (1, 1), "5": (1, -1)}),
+    ("SOT-223", {"1": (-1, -1), "2": (-1, 0), "3": (-1, 1), "4": (1, 0)}),
+])
+def test_sot_pad_layouts_from_name_only(generator, name, expected):
+    content = generator.generate_footprint(Package(component_id=0, name=name, package_type="", dimensions={}))
+    positions = pad_positions(content)
+
+    assert sorted(positions) == sorted(expected)
+    for number, (side, slot) in expected.items():
+        x, y = positions[number]
+        assert (x > 0) - (x < 0) == side
+        assert (y > 0) - (y < 0) == slot
+
+
+def test_sot223_tab_pad_is_wider(generator):
+    content = generator.generate_footprint(Package(component_id=0, name="SOT-223", package_type="SOT-223"))
+    sizes = dict(re.findall(r'\(pad "(\w+)" smd rect \(at \S+ \S+\) \(size \S+ (\S+)\)', content))
+    assert float(sizes["4"]) > 3 * float(sizes["1"])
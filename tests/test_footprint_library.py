@@ -0,0 +1,94 @@
+import os
+import json
+import hashlib
+import pytest
+from src.models.data_models import Package
+from src.generators.footprint_library import MANIFEST_NAME, FootprintLibraryWriter, footprint_filename
+
+
+def make_packages(count):
+    return [
+        Package(component_id=0, name=f"SOIC-{2 * (i + 2)}", package_type="SOIC",
+                dimensions={"pin_count": 2 * (i + 2), "pitch": 1.27})
+        for i in range(count)
+    ]
+
+
+def test_footprint_filename_is_safe():
+    pkg = Package(component_id=0, name="QFN-32/5x5 (EP)", package_type="QFN")
+    assert footprint_filename(pkg) == "QFN-32_5x5__EP_.kicad_mod"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_write_library_skips_unchanged(tmp_path, workers):
+    library = tmp_path / "Test.pretty"
+    writer = FootprintLibraryWriter(str(library), workers=workers, chunk_size=3)
+
+    stats = writer.write_library(iter(make_packages(10)))
+    assert stats == {"written": 10, "unchanged": 0, "failed": 0}
+    assert len([f for f in os.listdir(library) if f.endswith(".kicad_mod")]) == 10
+
+    stats = writer.write_library(make_packages(10))
+    assert stats == {"written": 0, "unchanged": 10, "failed": 0}
+
+
+def test_write_library_rewrites_changed_and_missing(tmp_path):
+    library = tmp_path / "Test.pretty"
+    writer = FootprintLibraryWriter(str(library), workers=1)
+    packages = make_packages(3)
+    writer.write_library(packages)
+
+    os.remove(library / "SOIC-4.kicad_mod")
+    packages[1].dimensions["pitch"] = 0.65
+    stats = writer.write_library(packages)
+
+    assert stats == {"written": 2, "unchanged": 1, "failed": 0}
+    assert " 0.65) (size" in (library / "SOIC-6.kicad_mod").read_text()
+
+
+def test_reformatted_footprint_without_manifest_is_unchanged(tmp_path):
+    library = tmp_path / "Test.pretty"
+    writer = FootprintLibraryWriter(str(library), workers=1)
+    packages = make_packages(1)
+    writer.write_library(packages)
+
+    # Simulate a library copied without its manifest and re-saved with extra whitespace
+    os.remove(library / ".footprint_hashes.json")
+    path = library / "SOIC-4.kicad_mod"
+    path.write_text(path.read_text().replace("\n", "\n\n"))
+
+    stats = writer.write_library(packages)
+    assert stats == {"written": 0, "unchanged": 1, "failed": 0}
+
+
+def test_duplicate_names_across_workers_leave_no_temp_files(tmp_path):
+    library = tmp_path / "Test.pretty"
+    packages = [Package(component_id=0, name="SOIC-8", package_type="SOIC",
+                        dimensions={"pin_count": 8, "pitch": 1.27})] * 12
+    writer = FootprintLibraryWriter(str(library), workers=2, chunk_size=1)
+
+    stats = writer.write_library(packages)
+
+    assert stats["failed"] == 0
+    assert sorted(f for f in os.listdir(library) if not f.startswith(".")) == ["SOIC-8.kicad_mod"]
+
+
+def test_same_name_different_geometry_gets_its_own_file(tmp_path):
+    library = tmp_path / "Test.pretty"
+    narrow = Package(component_id=0, name="SOIC-8", package_type="SOIC",
+                     dimensions={"pin_count": 8, "pitch": 1.27, "body_width": 3.9})
+    wide = narrow.model_copy(update={"dimensions": {"pin_count": 8, "pitch": 1.27, "body_width": 7.5}})
+    writer = FootprintLibraryWriter(str(library), workers=2, chunk_size=1)
+
+    stats = writer.write_library([narrow, wide, narrow, wide])
+
+    files = sorted(f for f in os.listdir(library) if not f.startswith("."))
+    assert stats == {"written": 2, "unchanged": 0, "failed": 0}
+    assert files[0] == "SOIC-8.kicad_mod" and files[1].startswith("SOIC-8_") and len(files) == 2
+    with open(library / MANIFEST_NAME) as f:
+        manifest = json.load(f)
+    for name in files:
+        assert manifest[name] == hashlib.sha256((library / name).read_bytes()).hexdigest()
+
+    # The same batch again resolves to the same files
+    assert writer.write_library([narrow, wide]) == {"written": 0, "unchanged": 2, "failed": 0}
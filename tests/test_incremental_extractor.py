@@ -0,0 +1,105 @@
+import os
+import pytest
+from dataclasses import replace
+from unittest.mock import MagicMock
+from src.backend.extractor import ContentExtractor
+from src.backend.incremental_extractor import IncrementalExtractor, VERSION_KEY
+from src.backend.prompts import DEFAULT_TEMPLATE
+from src.database.db_manager import DBManager
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'database', 'schema.sql')
+
+SECTIONS = {
+    "description": "12-bit ADC",
+    "package_dimensions": "SOIC-8, 3.9 x 4.9 mm",
+    "ordering_information": "ACME123-SO8",
+    "pin_configuration": "1 VDD\n2 GND",
+}
+
+FULL_RESPONSE = {
+    "component": {"part_number": "ACME123", "manufacturer": "ACME", "description": "12-bit ADC"},
+    "package": {"name": "SOIC-8", "package_type": "SOIC", "dimensions": {"width": 3.9}},
+    "pins": [{"number": "1", "name": "VDD"}, {"number": "2", "name": "GND"}],
+}
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DBManager(str(tmp_path / "test.db"))
+    db.initialize_db(SCHEMA_PATH)
+    return db
+
+
+@pytest.fixture
+def llm_client():
+    client = MagicMock()
+    client.generate.return_value = FULL_RESPONSE
+    return client
+
+
+def test_first_extraction_runs_everything(db, llm_client):
+    incremental = IncrementalExtractor(ContentExtractor(llm_client, resolve_packages=False), db)
+    result = incremental.extract("acme123.pdf", "", SECTIONS)
+
+    assert result["reextracted"] == ["component", "package", "pins"]
+    assert result["component"].part_number == "ACME123"
+    assert db.get_latest_extraction("acme123.pdf")["raw_json"] == FULL_RESPONSE
+
+
+def test_unchanged_revision_reuses_stored_result(db, llm_client):
+    incremental = IncrementalExtractor(ContentExtractor(llm_client, resolve_packages=False), db)
+    incremental.extract("acme123.pdf", "", SECTIONS)
+    llm_client.generate.reset_mock()
+
+    # Whitespace-only differences do not count as changes
+    revised = dict(SECTIONS, pin_configuration="1 VDD\n\n2 GND  ")
+    result = incremental.extract("acme123.pdf", "", revised)
+
+    llm_client.generate.assert_not_called()
+    assert result["reextracted"] == []
+    assert [p.name for p in result["pins"]] == ["VDD", "GND"]
+
+
+def test_ordering_change_only_reextracts_package(db, llm_client):
+    incremental = IncrementalExtractor(ContentExtractor(llm_client, resolve_packages=False), db)
+    incremental.extract("acme123.pdf", "", SECTIONS)
+
+    llm_client.generate.return_value = {
+        "package": {"name": "TSSOP-8", "package_type": "TSSOP", "dimensions": {}},
+    }
+    revised = dict(SECTIONS, ordering_information="ACME123-TS8")
+    result = incremental.extract("acme123.pdf", "", revised)
+
+    assert result["reextracted"] == ["package"]
+    prompt = llm_client.generate.call_args[1]["prompt"]
+    assert "ACME123-TS8" in prompt
+    assert "PIN CONFIGURATION" not in prompt
+    assert result["package"].name == "TSSOP-8"
+    assert result["component"].part_number == "ACME123"
+    assert len(result["pins"]) == 2
+
+
+def test_preamble_edit_past_prompt_limit_is_ignored(db, llm_client):
+    incremental = IncrementalExtractor(ContentExtractor(llm_client, resolve_packages=False), db)
+    preamble = "ACME123 12-bit ADC\n" + "x" * 2500
+    incremental.extract("acme123.pdf", "", dict(SECTIONS, preamble=preamble))
+    llm_client.generate.reset_mock()
+
+    # The prompt only reads the first 2000 characters of the preamble
+    result = incremental.extract("acme123.pdf", "", dict(SECTIONS, preamble=preamble + "\nRev. D"))
+
+    llm_client.generate.assert_not_called()
+    assert result["reextracted"] == []
+
+
+def test_prompt_template_change_reextracts_everything(db, llm_client):
+    IncrementalExtractor(ContentExtractor(llm_client, resolve_packages=False), db).extract("acme123.pdf", "", SECTIONS)
+    llm_client.generate.reset_mock()
+
+    # Same sections, but the stored extraction came from another prompt
+    template = replace(DEFAULT_TEMPLATE, version="extraction-test")
+    extractor = ContentExtractor(llm_client, template=template, resolve_packages=False)
+    result = IncrementalExtractor(extractor, db).extract("acme123.pdf", "", SECTIONS)
+
+    assert result["reextracted"] == ["component", "package", "pins"]
+    assert db.get_latest_extraction("acme123.pdf")["section_hashes"][VERSION_KEY] == "extraction-test"
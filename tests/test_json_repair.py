@@ -0,0 +1,33 @@
+import pytest
+from src.backend.json_repair import repair_json, strip_code_fences
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1}', {"a": 1}),
+    ('```json\n{"a": [1, 2]}\n```', {"a": [1, 2]}),
+    ('Here is the data: {"a": 1} Let me know if you need more.', {"a": 1}),
+    ('{"a": [1, 2,], "b": {"c": 3,},}', {"a": [1, 2], "b": {"c": 3}}),
+    ('{"s": "a, b]", "t": "}"}', {"s": "a, b]", "t": "}"}),
+    ('{"name": "VCC', {"name": "VCC"}),
+    ('{"name": "a\\', {"name": "a"}),
+    ('[1, 2, tr', [1, 2]),
+    ('{"a": 1, "b": ', {"a": 1}),
+    ('{"a"', {}),
+])
+def test_repair_json(text, expected):
+    assert repair_json(text) == expected
+
+
+def test_truncated_pin_table_keeps_complete_rows():
+    text = '```json\n{"component": {"part_number": "X"}, "pins": [{"number": "1", "name": "VCC"}, {"number": "2", "na'
+    assert repair_json(text) == {"component": {"part_number": "X"}, "pins": [{"number": "1", "name": "VCC"}]}
+
+
+@pytest.mark.parametrize("text", ["", None, "no json here", "]"])
+def test_unrepairable_text_returns_none(text):
+    assert repair_json(text) is None
+
+
+def test_strip_code_fences():
+    assert strip_code_fences("```\n[1]\n```") == "[1]\n"
+    assert strip_code_fences("plain") == "plain"
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from src.generators.land_pattern import LandPatternCalculator, DENSITY_LEVELS
+from src.generators.footprint_generator import FootprintGenerator
+from src.models.data_models import Package
+
+
+@pytest.fixture
+def calculator():
+    return LandPatternCalculator()
+
+
+def test_soic8_nominal(calculator):
+    # JEDEC MS-012: L 5.80-6.20, T 0.40-1.27, W 0.31-0.51
+    lp = calculator.calculate(5.8, 6.2, 0.4, 1.27, 0.31, 0.51, pitch=1.27)
+
+    assert lp["z_max"] == pytest.approx(6.91)
+    assert lp["g_min"] == pytest.approx(2.98)
+    assert lp["x_max"] == pytest.approx(0.59)
+    assert lp["pad_center"] == pytest.approx((6.91 + 2.98) / 4)
+
+
+def test_all_density_levels_in_one_call(calculator):
+    lp = calculator.calculate(5.8, 6.2, 0.4, 1.27, 0.31, 0.51, density=DENSITY_LEVELS, pitch=1.27)
+
+    assert lp["z_max"].shape == (3,)
+    # Most > Nominal > Least for the outer pad edge
+    assert lp["z_max"][0] > lp["z_max"][1] > lp["z_max"][2]
+    assert lp["g_min"][0] < lp["g_min"][1] < lp["g_min"][2]
+
+
+def test_batched_leads_use_fine_pitch_fillets(calculator):
+    pitch = np.array([1.27, 0.5])
+    lp = calculator.calculate(np.full(2, 5.8), np.full(2, 6.2), 0.4, 1.27, 0.31, 0.51,
+                              density=DENSITY_LEVELS, pitch=pitch)
+
+    assert lp["x_max"].shape == (3, 2)
+    assert np.all(lp["x_max"][:, 1] < lp["x_max"][:, 0])
+
+
+def test_calculate_packages_matches_single(calculator):
+    dims = {"lead_span": 6.0, "lead_length": 0.835, "lead_width": 0.41, "pitch": 1.27}
+    packages = [
+        Package(component_id=0, name="SOIC-8", package_type="SOIC", dimensions=dims),
+        Package(component_id=0, name="QFN-16", package_type="QFN",
+                dimensions={"body_width": 3.0, "lead_length": 0.4, "lead_width": 0.25, "pitch": 0.5}),
+    ] * 50
+    batch = calculator.calculate_packages(packages)
+    single = calculator.calculate(6.0, 6.0, 0.835, 0.835, 0.41, 0.41, pitch=1.27)
+
+    assert batch["pad_length"].shape == (100,)
+    assert batch["pad_length"][0] == pytest.approx(single["pad_length"])
+    assert batch["lead_style"][1] == "flat_no_lead"
+
+
+def test_footprint_uses_land_pattern():
+    pkg = Package(component_id=0, name="SOIC-8", package_type="SOIC", dimensions={
+        "lead_span_min": 5.8, "lead_span_max": 6.2,
+        "lead_length_min": 0.4, "lead_length_max": 1.27,
+        "lead_width_min": 0.31, "lead_width_max": 0.51,
+        "body_width": 3.9, "body_length": 4.9, "pitch": 1.27, "pin_count": 8,
+    })
+    content = FootprintGenerator().generate_footprint(pkg)
+
+    assert '(pad "1" smd rect (at -2.4725 -1.905) (size 1.965 0.59)' in content
+    assert '(pad "8" smd rect (at 2.4725 -1.905)' in content
+    assert content.count("(pad ") == 8
+
+
+def test_quad_footprint_has_one_pad_per_pin():
+    pkg = Package(component_id=0, name="QFN-32", package_type="QFN", dimensions={
+        "body_width": 5.0, "body_length": 5.0, "pitch": 0.5, "pin_count": 32,
+    })
+    content = FootprintGenerator().generate_footprint(pkg)
+
+    assert content.count("(pad ") == 32
+    assert '(pad "32" ' in content
@@ -1,4 +1,6 @@
 import pytest
+import httpx
+import openai
 from unittest.mock import MagicMock, patch
 from src.backend.llm_client import LLMClient
 
@@ -9,7 +11,7 @@ def mock_openai():
 
 def test_llm_client_initialization(mock_openai):
     client = LLMClient(base_url="http://test:8000/v1", model_name="test-model")
-    mock_openai.assert_called_once_with(base_url="http://test:8000/v1", api_key="sk-antigravity")
+    mock_openai.assert_called_once_with(base_url="http://test:8000/v1", api_key="sk-antigravity", max_retries=0)
     assert client.model_name == "test-model"
 
 def test_generate_json(mock_openai):
@@ -46,3 +48,82 @@ def test_generate_json_error(mock_openai):
     
     assert "error" in response
     assert response["error"] == "JSONDecodeError"
+
+def _response(content, finish_reason="stop"):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    response.choices[0].finish_reason = finish_reason
+    return response
+
+def test_transient_errors_are_retried_with_backoff(mock_openai):
+    request = httpx.Request("POST", "http://test/v1/chat/completions")
+    create = mock_openai.return_value.chat.completions.create
+    create.side_effect = [openai.APIConnectionError(request=request),
+                          openai.InternalServerError("overloaded", response=httpx.Response(503, request=request), body=None),
+                          _response('{"key": "value"}')]
+
+    with patch('src.backend.llm_client.time.sleep') as sleep:
+        response = LLMClient(backoff_base=0.5).generate("test prompt")
+
+    assert response == {"key": "value"}
+    assert create.call_count == 3
+    delays = [c.args[0] for c in sleep.call_args_list]
+    assert len(delays) == 2 and 0 <= delays[0] <= 0.5 and 0 <= delays[1] <= 1.0
+
+def test_client_errors_are_not_retried(mock_openai):
+    request = httpx.Request("POST", "http://test/v1/chat/completions")
+    create = mock_openai.return_value.chat.completions.create
+    create.side_effect = openai.BadRequestError("bad", response=httpx.Response(400, request=request), body=None)
+
+    with pytest.raises(openai.BadRequestError):
+        LLMClient().generate("test prompt")
+    assert create.call_count == 1
+
+def test_malformed_json_is_repaired_locally(mock_openai):
+    create = mock_openai.return_value.chat.completions.create
+    create.return_value = _response('```json\n{"pins": [{"number": "1"},],}\n```')
+
+    assert LLMClient().generate("test prompt") == {"pins": [{"number": "1"}]}
+    create.assert_called_once()
+
+def test_truncated_json_is_continued(mock_openai):
+    create = mock_openai.return_value.chat.completions.create
+    create.side_effect = [_response('{"pins": [{"number": "1"}, {"number": "2', "length"),
+                          _response('"}]}')]
+
+    response = LLMClient().generate("test prompt")
+
+    assert response == {"pins": [{"number": "1"}, {"number": "2"}]}
+    follow_up = create.call_args_list[1].kwargs
+    assert follow_up["messages"][-1] == {"role": "assistant", "content": '{"pins": [{"number": "1"}, {"number": "2'}
+    assert follow_up["extra_body"]["continue_final_message"] is True
+    assert follow_up["response_format"] is None
+
+def test_unrecoverable_json_is_reprompted(mock_openai):
+    create = mock_openai.return_value.chat.completions.create
+    create.side_effect = [_response("Sorry, I cannot help with that."), _response('{"key": "value"}')]
+
+    assert LLMClient().generate("test prompt") == {"key": "value"}
+    assert create.call_count == 2
+
+def test_json_schema_is_sent_as_response_format(mock_openai):
+    create = mock_openai.return_value.chat.completions.create
+    create.return_value = _response('{"key": "value"}')
+    schema = {"title": "Extraction", "type": "object", "properties": {"key": {"type": "string"}}}
+
+    LLMClient().generate("test prompt", json_schema=schema)
+
+    kwargs = create.call_args.kwargs
+    assert kwargs["response_format"] == {"type": "json_schema", "json_schema": {"name": "Extraction", "schema": schema}}
+    assert "extra_body" not in kwargs
+
+def test_json_schema_is_sent_as_guided_json(mock_openai):
+    create = mock_openai.return_value.chat.completions.create
+    create.return_value = _response('{"key": "value"}')
+    schema = {"type": "object"}
+
+    LLMClient(structured_output="guided_json").generate("test prompt", json_schema=schema)
+
+    kwargs = create.call_args.kwargs
+    assert kwargs["extra_body"] == {"guided_json": schema}
+    assert kwargs["response_format"] == {"type": "json_object"}
@@ -0,0 +1,109 @@
+import pytest
+from unittest.mock import MagicMock
+from concurrent.futures import ThreadPoolExecutor
+from src.backend.llm_client import LLMClient
+from src.backend.llm_router import LLMRouter, client_from_env
+from src.benchmarks.mock_vllm import MockVLLMServer
+
+PROMPT = "Extract the component data as JSON."
+
+
+@pytest.fixture
+def servers():
+    started = [MockVLLMServer(latency_ms=50).start() for _ in range(2)]
+    yield started
+    for server in started:
+        server.stop()
+
+
+def make_router(servers, **options):
+    return LLMRouter([s.base_url for s in servers], model_name="mock-model", backoff_base=0.0, **options)
+
+
+def test_least_outstanding_spreads_concurrent_requests(servers):
+    router = make_router(servers)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: router.generate(PROMPT), range(16)))
+
+    assert all(r["component"]["part_number"] == "MOCK-1234" for r in results)
+    counts = [s.stats["requests"] for s in servers]
+    assert sum(counts) == 16 and min(counts) >= 6
+    stats = router.stats()
+    assert all(s["outstanding"] == 0 and s["errors"] == 0 for s in stats)
+    assert all(s["latency_p50_ms"] >= 50 and s["latency_p95_ms"] >= s["latency_p50_ms"] for s in stats)
+
+
+def test_failing_endpoint_is_ejected_and_readmitted(servers):
+    bad, good = servers
+    bad.failure_rate = 1.0
+    router = make_router(servers, failure_threshold=2, eject_seconds=0.0, max_retries=0)
+
+    for _ in range(6):
+        assert router.generate(PROMPT)["component"]["part_number"] == "MOCK-1234"
+
+    bad_stats, good_stats = router.stats()
+    assert not bad_stats["healthy"] and bad_stats["ejections"] == 1
+    assert bad_stats["errors"] == 2
+    assert good_stats["healthy"] and good_stats["requests"] == 6
+
+    # /v1/models still answers on the failing replica, so only a fixed one should return
+    bad.failure_rate = 0.0
+    assert router.check_health() == {bad.base_url: True, good.base_url: True}
+    assert router.stats()[0]["healthy"]
+
+
+def test_health_check_ejects_unreachable_endpoint(servers):
+    router = make_router(servers, max_retries=0)
+    servers[0].stop()
+
+    results = router.check_health()
+
+    assert results == {servers[0].base_url: False, servers[1].base_url: True}
+    assert [s["healthy"] for s in router.stats()] == [False, True]
+    assert router.generate(PROMPT)["pins"]
+    assert servers[1].stats["requests"] == 1
+
+
+def test_health_check_rejects_replica_serving_another_model():
+    with MockVLLMServer(model_name="other-model") as server:
+        router = LLMRouter([server.base_url], model_name="mock-model")
+        assert router.check_health() == {server.base_url: False}
+
+
+def test_all_endpoints_down_raises_last_error(servers):
+    for server in servers:
+        server.failure_rate = 1.0
+    router = make_router(servers, max_retries=0)
+
+    with pytest.raises(Exception) as excinfo:
+        router.generate(PROMPT)
+    assert getattr(excinfo.value, "status_code", None) == 503
+    assert sum(s.stats["requests"] for s in servers) == 2
+
+
+def test_bad_request_on_trial_does_not_readmit(servers):
+    router = make_router(servers[:1], max_retries=0)
+    endpoint = router.endpoints[0]
+    endpoint.healthy, endpoint.ejected_at, endpoint.consecutive_failures = False, None, 3
+    endpoint.client.generate = MagicMock(side_effect=ValueError("400: invalid schema"))
+
+    with pytest.raises(ValueError):
+        router.generate(PROMPT)
+
+    stats = router.stats()[0]
+    assert not stats["healthy"]
+    assert stats["outstanding"] == 0 and stats["errors"] == 1
+    assert endpoint.consecutive_failures == 3
+
+
+def test_client_from_env(monkeypatch):
+    monkeypatch.setenv("LLM_BASE_URL", "http://gpu1:8000/v1, http://gpu2:8000/v1")
+    monkeypatch.setenv("LLM_MODEL", "test-model")
+    router = client_from_env()
+    assert isinstance(router, LLMRouter)
+    assert [e.base_url for e in router.endpoints] == ["http://gpu1:8000/v1", "http://gpu2:8000/v1"]
+
+    monkeypatch.setenv("LLM_BASE_URL", "http://gpu1:8000/v1")
+    client = client_from_env()
+    assert isinstance(client, LLMClient) and client.model_name == "test-model"
@@ -0,0 +1,59 @@
+import time
+import pytest
+import openai
+from src.backend.extractor import ContentExtractor
+from src.benchmarks.mock_vllm import MockVLLMServer, DEFAULT_RESPONSE
+from src.benchmarks.llm_throughput import make_client, run_benchmark, SAMPLE_SECTIONS
+
+
+def test_llm_client_and_extractor_over_http():
+    with MockVLLMServer() as server:
+        client = make_client(server.base_url, server.model_name)
+        assert client.generate("hello") == DEFAULT_RESPONSE
+
+        result = ContentExtractor(client).extract_all("", sections=SAMPLE_SECTIONS)
+        assert result["component"].part_number == "MOCK-1234"
+        assert len(result["pins"]) == 8
+        assert server.stats["completions"] == 2
+        assert server.stats["prompt_tokens"] > 0
+
+
+def test_streaming_and_model_listing():
+    with MockVLLMServer(responses=["first", "second"], tokens_per_second=1000) as server:
+        sdk = make_client(server.base_url, server.model_name).client
+        assert [m.id for m in sdk.models.list()] == ["mock-model"]
+
+        stream = sdk.chat.completions.create(model=server.model_name, stream=True,
+                                             messages=[{"role": "user", "content": "x"}])
+        chunks = [c.choices[0].delta.content or "" for c in stream]
+        assert "".join(chunks) == "first"
+        assert sdk.chat.completions.create(model="m", messages=[]).choices[0].message.content == "second"
+
+
+def test_failure_injection_and_truncation():
+    with MockVLLMServer(failure_rate=1.0) as server:
+        with pytest.raises(openai.APIStatusError):
+            make_client(server.base_url, server.model_name).generate("x")
+
+    with MockVLLMServer(malformed_rate=1.0) as server:
+        # Truncated replies are salvaged locally, keeping the complete members
+        response = make_client(server.base_url, server.model_name).generate("x")
+        assert response["component"]["part_number"] == "MOCK-1234"
+        assert len(response.get("pins", [])) < 8
+
+
+def test_latency_is_reproducible_and_slots_limit_concurrency():
+    samples = [MockVLLMServer(latency_ms=100, latency_distribution="lognormal",
+                              latency_spread_ms=30, seed=7)._sample_latency() for _ in range(2)]
+    assert samples[0] == samples[1]
+
+    with MockVLLMServer(latency_ms=20, max_concurrency=2) as server:
+        start = time.perf_counter()
+        results = run_benchmark(server.base_url, server.model_name, "client",
+                                concurrency_levels=[1, 4], requests_per_level=8, server=server)
+        assert time.perf_counter() - start < 10
+
+    assert [r["concurrency"] for r in results] == [1, 4]
+    assert all(r["errors"] == 0 for r in results)
+    assert server.stats["peak_in_flight"] == 2
+    assert results[1]["throughput_rps"] > results[0]["throughput_rps"]
@@ -0,0 +1,102 @@
+import os
+import numpy as np
+import pytest
+from src.models.data_models import Package
+from src.generators.model_generator import (ModelGenerator, model_cache_key, decimate_mesh,
+                                            write_vrml, HAS_CQ)
+
+needs_cq = pytest.mark.skipif(not HAS_CQ, reason="CadQuery not installed")
+
+
+def soic(name, width=3.9):
+    return Package(component_id=1, name=name, package_type="SOIC",
+                   dimensions={"body_width": width, "body_length": 4.9, "height": 1.5})
+
+
+def test_cache_key_ignores_name_ordering_and_float_noise():
+    a = soic("SOIC-8_A")
+    b = Package(component_id=1, name="SOIC-8_B", package_type=" soic ",
+                dimensions={"height": 1.5, "body_length": 4.9, "body_width": 3.9000000001})
+    assert model_cache_key(a) == model_cache_key(b)
+    assert model_cache_key(a) != model_cache_key(soic("SOIC-8_W", width=7.5))
+
+
+@needs_cq
+def test_identical_packages_are_built_once(tmp_path):
+    packages = [soic(f"SOIC-8_{i}") for i in range(20)] + [soic("SOIC-8_W", width=7.5)]
+    stats = ModelGenerator(export_wrl=False).generate_models(packages, str(tmp_path), workers=1)
+
+    assert stats == {"built": 2, "cached": 0, "written": 21, "failed": 0}
+    assert len(os.listdir(tmp_path)) == 21
+    assert (tmp_path / "SOIC-8_0.step").read_bytes() == (tmp_path / "SOIC-8_19.step").read_bytes()
+
+
+@needs_cq
+def test_disk_cache_is_shared_between_runs(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    ModelGenerator(cache_dir=cache_dir).generate_models([soic("A")], str(tmp_path / "out"), workers=1)
+
+    generator = ModelGenerator(cache_dir=cache_dir)
+    stats = generator.generate_models([soic("B")], str(tmp_path / "out"), workers=1)
+    assert stats["built"] == 0 and stats["cached"] == 1
+    assert generator.generate_model(soic("C"), str(tmp_path / "out"))
+    assert os.path.exists(tmp_path / "out" / "C.step")
+
+
+@needs_cq
+def test_process_pool_generation(tmp_path):
+    packages = [soic(f"P{i}", width=3.0 + i * 0.1) for i in range(6)]
+    stats = ModelGenerator().generate_models(packages, str(tmp_path), workers=2, chunk_size=2)
+    assert stats == {"built": 6, "cached": 0, "written": 6, "failed": 0}
+    assert open(tmp_path / "P5.step").read().startswith("ISO-10303-21")
+    assert open(tmp_path / "P5.wrl").read().startswith("#VRML V2.0 utf8")
+
+
+def sphere_mesh(n=40):
+    theta, phi = np.meshgrid(np.linspace(0, np.pi, n), np.linspace(0, 2 * np.pi, n), indexing="ij")
+    vertices = np.stack([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)], -1).reshape(-1, 3)
+    idx = np.arange(n * n).reshape(n, n)
+    a, b, c, d = idx[:-1, :-1].ravel(), idx[1:, :-1].ravel(), idx[1:, 1:].ravel(), idx[:-1, 1:].ravel()
+    triangles = np.concatenate([np.stack([a, b, c], 1), np.stack([a, c, d], 1)])
+    return vertices * 5.0, triangles
+
+
+def test_decimation_meets_triangle_budget():
+    vertices, triangles = sphere_mesh()
+    out_v, out_t = decimate_mesh(vertices, triangles, 500)
+
+    assert 0 < len(out_t) <= 500
+    assert out_t.max() < len(out_v)
+    # Clustering keeps vertices on roughly the same surface
+    radii = np.linalg.norm(out_v, axis=1)
+    assert radii.max() <= 5.0 + 1e-9 and radii.min() > 4.0
+
+
+@pytest.mark.parametrize("budget", [0, -1])
+def test_non_positive_triangle_budget_is_rejected(budget):
+    vertices, triangles = sphere_mesh(8)
+    with pytest.raises(ValueError):
+        decimate_mesh(vertices, triangles, budget)
+    with pytest.raises(ValueError):
+        ModelGenerator(max_triangles=budget)
+
+
+def test_vrml_is_indexed_face_set_in_kicad_units():
+    vertices = np.array([[0.0, 0.0, 0.0], [2.54, 0.0, 0.0], [0.0, 2.54, 0.0]])
+    text = write_vrml(vertices, np.array([[0, 1, 2]])).decode()
+    assert "coord Coordinate {point [0 0 0,1 0 0,0 1 0]}" in text
+    assert "coordIndex [0,1,2,-1]" in text
+
+
+@needs_cq
+def test_wrl_mesh_is_cached_per_geometry(tmp_path):
+    generator = ModelGenerator(max_triangles=50)
+    qfn = Package(component_id=1, name="QFN", package_type="QFN",
+                  dimensions={"body_width": 5.0, "body_length": 5.0, "height": 0.8})
+    wrl = generator.build_wrl(qfn)
+
+    assert wrl.count(b",-1") <= 50
+    assert len(generator._mesh_cache) == 1
+    generator.max_triangles = 100
+    generator.build_wrl(qfn.model_copy(update={"name": "QFN-B"}))
+    assert len(generator._mesh_cache) == 1
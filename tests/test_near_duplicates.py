@@ -0,0 +1,146 @@
+import os
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from src.benchmarks.near_duplicates import benchmark_index
+from src.backend.extractor import ContentExtractor
+from src.backend.incremental_extractor import IncrementalExtractor
+from src.backend.near_duplicates import MinHasher, NearDuplicateDetector, NearDuplicateIndex
+from src.database.db_manager import DBManager
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'database', 'schema.sql')
+
+
+def datasheet(part: str, seed: int) -> dict:
+    """Section text of a synthetic datasheet; different seeds give unrelated documents."""
+    rng = np.random.default_rng(seed)
+    vocabulary = ["supply", "voltage", "current", "input", "output", "offset", "gain", "bandwidth", "noise",
+                  "temperature", "range", "typical", "maximum", "minimum", "rail", "load", "capacitance",
+                  "resistance", "slew", "rate", "settling", "time", "power", "shutdown", "pin", "mode"]
+    def paragraph(words):
+        return " ".join(rng.choice(vocabulary, size=words)) + f" {rng.integers(1, 1000)} mV"
+    return {
+        "preamble": f"{part} Rev. C, March 2021. Copyright ACME Corp.",
+        "description": " ".join(paragraph(40) for _ in range(5)),
+        "electrical_characteristics": " ".join(paragraph(60) for _ in range(10)),
+        "package_dimensions": "SOIC-8, 3.9 x 4.9 mm, pitch 1.27 mm",
+        "pin_configuration": "1 OUTA 2 INA- 3 INA+ 4 V- 5 INB+ 6 INB- 7 OUTB 8 V+",
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DBManager(str(tmp_path / "test.db"))
+    db.initialize_db(SCHEMA_PATH)
+    return db
+
+
+def test_minhash_estimates_jaccard():
+    hasher = MinHasher(num_perm=256, shingle_size=1)
+    a = " ".join(f"w{i}" for i in range(0, 300))
+    b = " ".join(f"w{i}" for i in range(100, 400))  # Jaccard 200 / 400 = 0.5
+    similarity = (hasher.signature(a) == hasher.signature(b)).mean()
+    assert abs(similarity - 0.5) < 0.1
+    assert (hasher.signature(a) == MinHasher(num_perm=256, shingle_size=1).signature(a)).all()
+
+
+def test_revised_cover_page_is_a_near_duplicate():
+    hasher = MinHasher()
+    index = NearDuplicateIndex()
+    original = datasheet("ACME358", seed=1)
+    index.add("acme358_revC.pdf", hasher.signature("\n".join(original.values())))
+    index.add("acme324.pdf", hasher.signature("\n".join(datasheet("ACME324", seed=2).values())))
+
+    revised = dict(original, preamble="ACME358 Rev. D, June 2024. Copyright ACME Corp. All rights reserved.")
+    matches = index.query(hasher.signature("\n".join(revised.values())))
+
+    assert [key for key, _ in matches] == ["acme358_revC.pdf"]
+    assert matches[0][1] >= 0.8
+
+
+def test_replaced_key_is_not_returned_twice():
+    index = NearDuplicateIndex()
+    signature = np.arange(128, dtype=np.uint32)
+    index.add("a.pdf", signature)
+    index.add("a.pdf", signature)
+    assert len(index) == 1
+    assert index.query(signature) == [("a.pdf", 1.0)]
+    assert index.query(signature, exclude="a.pdf") == []
+
+
+def test_detector_persists_signatures(db):
+    sections = datasheet("ACME358", seed=1)
+    NearDuplicateDetector(db).register("acme358.pdf", sections)
+    db.save_extraction("acme358.pdf", {}, {"component": {"part_number": "ACME358"}})
+
+    # A fresh detector rebuilds its index from the database
+    matches = NearDuplicateDetector(db).find(dict(sections, preamble="ACME358 Rev. D"))
+    assert matches[0]["source_key"] == "acme358.pdf"
+    assert matches[0]["has_extraction"] is True
+
+
+def test_near_duplicate_reuses_stored_extraction(db):
+    llm_client = MagicMock()
+    llm_client.generate.return_value = {
+        "component": {"part_number": "ACME358", "manufacturer": "ACME", "description": "Dual op amp"},
+        "package": {"name": "SOIC-8", "package_type": "SOIC", "dimensions": {}},
+        "pins": [{"number": str(n), "name": f"P{n}"} for n in range(1, 9)],
+    }
+    detector = NearDuplicateDetector(db)
+    incremental = IncrementalExtractor(ContentExtractor(llm_client, resolve_packages=False), db,
+                                       duplicates=detector)
+    original = datasheet("ACME358", seed=1)
+    incremental.extract("acme358_revC.pdf", "", original)
+
+    llm_client.generate.return_value = {
+        "component": {"part_number": "ACME358", "manufacturer": "ACME Corp", "description": "Dual op amp"},
+    }
+    revised = dict(original, preamble="ACME358 Rev. D, June 2024. Copyright ACME Corp.")
+    result = incremental.extract("acme358_revD.pdf", "", revised)
+
+    # Only the component reads the cover page; package and pins come from Rev. C
+    assert result["reused_from"] == "acme358_revC.pdf"
+    assert result["reextracted"] == ["component"]
+    assert result["component"].manufacturer == "ACME Corp"
+    assert len(result["pins"]) == 8
+    assert db.get_latest_extraction("acme358_revD.pdf") is not None
+    assert "acme358_revD.pdf" in detector.index
+
+
+def test_unrelated_document_is_extracted_in_full(db):
+    llm_client = MagicMock()
+    llm_client.generate.return_value = {
+        "component": {"part_number": "X"}, "package": {"name": "SOIC-8", "package_type": "SOIC"}, "pins": [],
+    }
+    incremental = IncrementalExtractor(ContentExtractor(llm_client, resolve_packages=False), db,
+                                       duplicates=NearDuplicateDetector(db))
+    incremental.extract("acme358.pdf", "", datasheet("ACME358", seed=1))
+    result = incremental.extract("acme324.pdf", "", datasheet("ACME324", seed=2))
+
+    assert result["reused_from"] is None
+    assert result["reextracted"] == ["component", "package", "pins"]
+
+
+def test_index_scales_to_large_libraries():
+    rng = np.random.default_rng(0)
+    n = 100_000
+    signatures = rng.integers(0, 1 << 32, size=(n, 128), dtype=np.uint32)
+    index = NearDuplicateIndex()
+    index.add_many([f"doc{i}.pdf" for i in range(n - 1000)], signatures[:n - 1000])
+    for i in range(n - 1000, n):
+        index.add(f"doc{i}.pdf", signatures[i])
+
+    assert len(index) == n
+    assert index.memory_bytes() / n < 1024
+
+    # The first ten bands still match, so the document becomes a candidate
+    probe = signatures[n - 10].copy()
+    probe[86:] = 0
+    matches = index.query(probe, threshold=0.6)
+    assert matches[0][0] == f"doc{n - 10}.pdf"
+
+
+def test_index_benchmark_runs():
+    # Timing lives in src.benchmarks.near_duplicates; this only checks it still runs
+    results = benchmark_index(documents=2000, incremental=100, queries=5)
+    assert results["documents"] == 2000 and results["found"] == 5
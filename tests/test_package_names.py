@@ -0,0 +1,103 @@
+import pytest
+from unittest.mock import MagicMock
+from src.backend.extractor import ContentExtractor, extraction_schema
+from src.generators.footprint_generator import FootprintGenerator
+from src.generators.package_names import (parse_package_name, package_dimensions, fill_dimensions, is_determined,
+                                          package_type_of, packages_in_text)
+from src.models.data_models import Package
+
+LLM_RESPONSE = {
+    "component": {"part_number": "ACME123", "manufacturer": "ACME", "description": "12-bit ADC"},
+    "pins": [{"number": str(i), "name": f"P{i}"} for i in range(1, 9)],
+}
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("SOIC-8 3.9x4.9mm P1.27mm", {"family": "SOIC", "pin_count": 8, "body_width": 3.9, "body_length": 4.9,
+                                  "pitch": 1.27}),
+    ("QFN-32-1EP_5x5mm_P0.5mm", {"family": "QFN", "pin_count": 32, "exposed_pads": 1, "body_width": 5.0,
+                                 "body_length": 5.0, "pitch": 0.5}),
+    ("DIP-8_W7.62mm", {"family": "DIP", "pin_count": 8, "lead_span": 7.62}),
+    ("SOT-23-5", {"family": "SOT-23", "pin_count": 5}),
+    ("SO8", {"family": "SOIC", "pin_count": 8}),
+    ("SOIC-16W", {"family": "SOIC-W", "pin_count": 16}),
+    ("0603", {"family": "0603", "pin_count": 2}),
+    ("QFN 4 x 4 mm", {}),
+    ("Custom package", {}),
+])
+def test_parse_package_name(name, expected):
+    assert parse_package_name(name) == expected
+
+
+def test_standard_table_fills_what_the_name_leaves_out():
+    soic = package_dimensions("SOIC-8")
+    assert (soic["body_width"], soic["body_length"], soic["pitch"], soic["lead_span"]) == (3.9, 4.9, 1.27, 6.0)
+    assert is_determined(soic)
+
+    # Spelled-out values win over the table; lead width follows the pitch
+    qfn = package_dimensions("QFN-32-1EP_5x5mm_P0.5mm")
+    assert (qfn["body_width"], qfn["pitch"], qfn["lead_width"]) == (5.0, 0.5, 0.25)
+    assert is_determined(qfn) and is_determined(package_dimensions("0805"))
+
+    # Same pin count, several JEDEC bodies: left to the LLM
+    assert not is_determined(package_dimensions("QFN-32"))
+    assert not is_determined(package_dimensions("BGA-256"))
+    assert package_type_of("0603") == "chip" and package_type_of("SOIC-16W") == "SOIC"
+
+
+def test_fill_dimensions_keeps_given_values():
+    filled = fill_dimensions("SOIC-8", {"body_width": 4.0, "lead_length": 1.0})
+    assert filled["body_width"] == 4.0 and filled["body_length"] == 4.9
+    # The tabulated span belongs to the tabulated body
+    assert "lead_span" not in filled
+    assert fill_dimensions("Custom", {"pitch": 0.5}) == {"pitch": 0.5}
+
+
+def test_packages_in_text_ignores_part_numbers():
+    text = "Ordering: ACME123-SO8, ACME123DR (SOIC-8, 4.9 x 3.9 mm). LM358 rev A2 2023"
+    assert packages_in_text(text) == ["SO8", "SOIC-8"]
+
+
+def test_footprint_from_name_only_matches_explicit_dimensions():
+    generator = FootprintGenerator()
+    by_name = generator.generate_footprint(Package(component_id=0, name="SOIC-8", package_type="Unknown"))
+    explicit = generator.generate_footprint(Package(component_id=0, name="SOIC-8", package_type="SOIC",
+                                                    dimensions=package_dimensions("SOIC-8")))
+    assert by_name.replace("Unknown", "SOIC") == explicit
+    assert by_name.count("(pad ") == 8
+
+
+def test_extractor_skips_llm_package_extraction_for_standard_package():
+    client = MagicMock()
+    client.generate.return_value = LLM_RESPONSE
+    sections = {
+        "description": "12-bit ADC",
+        "package_dimensions": "SOIC-8 package outline, 4.9 x 3.9 mm. Lead detail A ...",
+        "ordering_information": "ACME123-SO8",
+        "pin_configuration": "1 VDD\n2 GND",
+    }
+
+    result = ContentExtractor(client).extract_all("", sections=sections)
+
+    kwargs = client.generate.call_args[1]
+    assert "PACKAGE INFORMATION" not in kwargs["prompt"] and "Lead detail" not in kwargs["prompt"]
+    assert kwargs["json_schema"] == extraction_schema(["component", "pins"])
+    assert (result["package"].name, result["package"].package_type) == ("SOIC-8", "SOIC")
+    assert result["package"].dimensions["pitch"] == 1.27
+    assert result["raw_json"]["package"]["name"] == "SOIC-8"
+
+    # Only the package requested: no LLM call at all
+    client.generate.reset_mock()
+    assert ContentExtractor(client).extract_all("", sections=sections, targets=["package"])["package"].name == "SOIC-8"
+    client.generate.assert_not_called()
+
+
+@pytest.mark.parametrize("package_text", ["QFN-32 (RHB), see drawing", "SOIC-8 (D) and DIP-8 (P) packages"])
+def test_ambiguous_package_goes_to_llm(package_text):
+    client = MagicMock()
+    client.generate.return_value = dict(LLM_RESPONSE, package={"name": "QFN-32", "dimensions": {"body_width": 5.0}})
+
+    result = ContentExtractor(client).extract_all("", sections={"package_dimensions": package_text})
+
+    assert "PACKAGE INFORMATION" in client.generate.call_args[1]["prompt"]
+    assert result["package"].dimensions == {"body_width": 5.0}
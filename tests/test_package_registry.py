@@ -0,0 +1,85 @@
+import pytest
+from src.models.data_models import Component, Package, Pin
+from src.generators.package_registry import PackageRegistry, canonical_name, geometry_key
+from src.generators.model_generator import HAS_CQ
+from src.generators.symbol_generator import SymbolGenerator
+from src.generators.footprint_generator import FootprintGenerator
+from src.generators.package_names import parse_package_name
+
+SOIC8 = {"body_width": 3.9, "body_length": 4.9, "pitch": 1.27, "pin_count": 8}
+
+
+def soic8(name, **overrides):
+    return Package(component_id=1, name=name, package_type="SOIC", dimensions=dict(SOIC8, **overrides))
+
+
+def test_parts_with_identical_geometry_share_one_footprint():
+    registry = PackageRegistry(library_name="Parts")
+    packages = [soic8(f"ACME{i}_SO8") for i in range(100)]
+
+    footprints = {registry.footprint(p) for p in packages}
+    assert len(footprints) == 1
+    assert '(footprint "SOIC-8_3.9x4.9mm_P1.27mm"' in footprints.pop()
+    assert registry.footprint_ref(packages[42]) == "Parts:SOIC-8_3.9x4.9mm_P1.27mm"
+
+    stats = registry.stats()
+    assert stats["geometries"] == 1
+    assert stats["footprint_misses"] == 1 and stats["footprint_hits"] == 99
+
+
+def test_different_geometry_with_same_headline_name_is_kept_apart():
+    registry = PackageRegistry()
+    a = registry.register(soic8("A"))
+    b = registry.register(soic8("B", lead_width=0.51))
+
+    assert a == canonical_name(soic8("A"))
+    assert b.startswith(a + "_") and a != b
+    assert geometry_key(soic8("A")) != geometry_key(soic8("B", lead_width=0.51))
+    assert [p.name for p in registry.packages()] == [a, b]
+
+
+def test_grid_array_depopulation_is_part_of_the_key():
+    bga = Package(component_id=1, name="BGA", package_type="BGA",
+                  dimensions={"rows": 4, "columns": 4, "pitch": 0.8})
+    depopulated = bga.model_copy(update={"model_params": {"depopulated_balls": ["A1"]}})
+    assert geometry_key(bga) != geometry_key(depopulated)
+
+
+def test_symbol_references_shared_footprint():
+    registry = PackageRegistry(library_name="Parts")
+    component = Component(datasheet_id=1, part_number="ACME1")
+    pins = [Pin(package_id=1, number="1", name="VDD")]
+    symbol = SymbolGenerator().generate_symbol(component, pins, registry.footprint_ref(soic8("X")))
+    assert '(property "Footprint" "Parts:SOIC-8_3.9x4.9mm_P1.27mm"' in symbol
+
+
+@pytest.mark.skipif(not HAS_CQ, reason="CadQuery not installed")
+def test_model_generated_once_per_geometry(tmp_path):
+    registry = PackageRegistry()
+    paths = {registry.model(soic8(f"P{i}"), str(tmp_path)) for i in range(10)}
+
+    assert paths == {str(tmp_path / "SOIC-8_3.9x4.9mm_P1.27mm.step")}
+    assert registry.stats()["model_misses"] == 1
+    assert registry.stats()["model_hits"] == 9
+
+
+def test_pin_count_from_the_name_separates_geometries():
+    registry = PackageRegistry(library_name="Parts")
+    soic8_bare = Package(component_id=1, name="SOIC-8", package_type="SOIC", dimensions={})
+    soic16_bare = Package(component_id=1, name="SOIC-16", package_type="SOIC", dimensions={})
+
+    assert geometry_key(soic8_bare) != geometry_key(soic16_bare)
+    assert registry.footprint_ref(soic8_bare) == "Parts:SOIC-8_3.9x4.9mm_P1.27mm"
+    assert registry.footprint_ref(soic16_bare) == "Parts:SOIC-16_3.9x9.9mm_P1.27mm"
+
+    # The shared footprint matches the one generated from the original package
+    shared = registry.footprint(soic16_bare)
+    direct = FootprintGenerator().generate_footprint(soic16_bare)
+    assert shared.count("(pad ") == direct.count("(pad ") == 16
+
+
+def test_canonical_name_parses_back_to_the_same_geometry():
+    package = Package(component_id=1, name="SO8", package_type="SOIC", dimensions=SOIC8)
+    canonical = PackageRegistry().canonical_package(package)
+    assert parse_package_name(canonical.name)["body_width"] == SOIC8["body_width"]
+    assert geometry_key(canonical) == geometry_key(package)
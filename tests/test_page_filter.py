@@ -0,0 +1,126 @@
+import pytest
+from unittest.mock import patch
+from src.backend.ingestion import IngestionEngine
+from src.backend.page_filter import PageRelevanceFilter, HAS_FITZ, page_filter_from_env, relevant_pdf_path
+
+COVER_PAGE = """ACME123 12-bit ADC
+General Description
+The ACME123 is a low-power 12-bit analog-to-digital converter.
+"""
+
+PIN_PAGE = """Pin Configuration
+Pin No. Name Type
+1 VDD Power
+2 GND Ground
+3 AIN0 Input
+4 SDA I/O
+"""
+
+DIMENSION_PAGE = """Package Outline
+SOIC-8 body 3.9 x 4.9 mm, pitch 1.27 mm
+Dim Min Nom Max
+A 1.35 1.55 1.75
+b 0.31 0.41 0.51
+e 1.27 1.27 1.27
+"""
+
+REGISTER_PAGE = """CTRL1 Register
+Offset: 0x04 Reset value 0x0000
+Bits 31:16 Reserved RW
+Bits 15:8 PRESC RW
+Bit 7 EN RW
+Bit 6 IRQ RO
+"""
+
+
+@pytest.fixture
+def pages():
+    return [
+        {"text": COVER_PAGE},
+        {"text": REGISTER_PAGE},
+        {"text": PIN_PAGE},
+        {"text": REGISTER_PAGE},
+        {"text": DIMENSION_PAGE, "has_drawing": True},
+        {"text": REGISTER_PAGE},
+    ]
+
+
+def test_relevant_pages_outscore_register_maps(pages):
+    page_filter = PageRelevanceFilter()
+    scored = page_filter.score_pages(pages)
+
+    assert "pin_configuration" in scored[2]["sections"]
+    assert "package_dimensions" in scored[4]["sections"]
+    assert scored[2]["has_table"]
+    assert scored[2]["score"] > scored[1]["score"]
+    assert scored[4]["score"] > scored[3]["score"]
+
+
+def test_select_pages_prunes_register_maps(pages):
+    page_filter = PageRelevanceFilter()
+    scored = page_filter.score_pages(pages)
+    selected = page_filter.select_pages(scored)
+
+    assert selected == [0, 2, 4]
+
+
+def test_max_pages_keeps_forced_first_page(pages):
+    page_filter = PageRelevanceFilter(max_pages=2)
+    scored = page_filter.score_pages(pages)
+    selected = page_filter.select_pages(scored)
+
+    assert len(selected) == 2
+    assert 0 in selected
+
+
+def test_recall_report(pages):
+    page_filter = PageRelevanceFilter(max_pages=2)
+    scored = page_filter.score_pages(pages)
+    selected = page_filter.select_pages(scored)
+    report = page_filter.recall_report(scored, selected, relevant_pages=[0, 2, 4])
+
+    assert report["total_pages"] == 6
+    assert report["kept_pages"] == 2
+    assert report["recall"] == pytest.approx(2 / 3)
+    assert len(report["missed_pages"]) == 1
+
+
+@pytest.mark.skipif(not HAS_FITZ, reason="PyMuPDF not installed")
+def test_filter_pdf_writes_subset(tmp_path):
+    import fitz
+
+    src = tmp_path / "datasheet.pdf"
+    doc = fitz.open()
+    for text in (COVER_PAGE, REGISTER_PAGE, PIN_PAGE, REGISTER_PAGE):
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    doc.save(str(src))
+    doc.close()
+
+    out = tmp_path / "filtered.pdf"
+    result = PageRelevanceFilter().filter_pdf(str(src), str(out))
+
+    assert result["selected"] == [0, 2]
+    with fitz.open(str(out)) as filtered:
+        assert filtered.page_count == 2
+
+
+def test_filter_pdf_returns_text_of_kept_pages(pages):
+    page_filter = PageRelevanceFilter()
+    with patch.object(page_filter, "load_pdf_pages", return_value=pages):
+        result = page_filter.filter_pdf("datasheet.pdf")
+
+    assert "Pin Configuration" in result["text"]
+    assert "CTRL1 Register" not in result["text"]
+    sections = IngestionEngine().process_text(result["text"])["sections"]
+    assert "pin_configuration" in sections
+
+
+def test_page_filter_from_env(monkeypatch):
+    monkeypatch.delenv("PAGE_FILTER", raising=False)
+    monkeypatch.setenv("PAGE_FILTER_MAX_PAGES", "5")
+    assert page_filter_from_env().max_pages == 5
+
+    monkeypatch.setenv("PAGE_FILTER", "0")
+    assert page_filter_from_env() is None
+    assert relevant_pdf_path("/data/acme123.pdf") == "/data/acme123.relevant.pdf"
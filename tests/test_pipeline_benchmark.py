@@ -0,0 +1,56 @@
+import os
+import copy
+import json
+from src.backend.ingestion import IngestionEngine
+from src.benchmarks.pipeline import (synthetic_datasheet, run_suite, compare, main, DEFAULT_BASELINE,
+                                     SCHEMA_PATH, StubLLMClient)
+from src.backend.extractor import ContentExtractor
+from src.database.db_manager import DBManager
+
+
+def test_synthetic_datasheet_has_requested_size_and_sections(tmp_path):
+    path = tmp_path / "ds.md"
+    path.write_text(synthetic_datasheet(300, 200_000))
+    result = IngestionEngine().process_file(str(path))
+
+    assert 200_000 <= path.stat().st_size < 201_000
+    assert result["sections"]["pin_configuration"].count("\n| ") == 300
+    assert {"package_dimensions", "ordering_information", "electrical_characteristics"} <= set(result["sections"])
+
+
+def test_save_component_persists_all_pins(tmp_path):
+    db = DBManager(str(tmp_path / "t.db"))
+    db.initialize_db(SCHEMA_PATH)
+    extracted = ContentExtractor(StubLLMClient(100)).extract_all("", sections={"pin_configuration": ""})
+
+    component_id = db.save_component(extracted["component"], extracted["package"], extracted["pins"])
+    package = db.fetch_one("SELECT * FROM packages WHERE component_id = ?", (component_id,))
+    assert package["package_type"] == "BGA"
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM pins WHERE package_id = ?", (package["id"],))["n"] == 100
+
+
+def test_suite_reports_every_stage_and_gates_regressions():
+    results = run_suite([(20, 20_000)], repeat=1, stages=["ingestion", "extraction", "symbol", "footprint", "db"])
+    stages = results["cases"]["pins20_20kB"]["stages"]
+    assert set(stages) == {"ingestion", "extraction", "symbol", "footprint", "db"}
+    assert all(s["seconds"] > 0 and s["throughput"] > 0 and s["peak_mb"] >= 0 for s in stages.values())
+
+    assert compare(results, results) == []
+    slower = copy.deepcopy(results)
+    slower["cases"]["pins20_20kB"]["stages"]["symbol"]["seconds"] += 1.0
+    slower["cases"]["pins20_20kB"]["stages"]["db"]["peak_mb"] *= 2
+    regressions = compare(slower, results)
+    assert {(r["stage"], r["metric"]) for r in regressions} == {("symbol", "seconds"), ("db", "peak_mb")}
+
+
+def test_cli_writes_json_and_fails_on_regression(tmp_path):
+    out = tmp_path / "results.json"
+    assert main(["--case", "10:5000", "--repeat", "1", "--stages", "symbol", "--json", str(out)]) == 0
+    assert out.exists()
+    assert os.path.exists(DEFAULT_BASELINE)
+
+    baseline = json.loads(out.read_text())
+    baseline["cases"]["pins10_5kB"]["stages"]["symbol"]["peak_mb"] = 1e-9
+    impossible = tmp_path / "baseline.json"
+    impossible.write_text(json.dumps(baseline))
+    assert main(["--case", "10:5000", "--repeat", "1", "--stages", "symbol", "--baseline", str(impossible)]) == 1
@@ -0,0 +1,61 @@
+import pytest
+from src.backend.extractor import ContentExtractor
+from src.backend.prompts import DEFAULT_TEMPLATE, get_template, common_prefix_length
+from src.benchmarks.mock_vllm import MockVLLMServer
+from src.benchmarks.prefix_cache import TARGET_SETS, parse_prefix_cache_metrics, run
+
+SECTIONS = {
+    "description": "The MOCK-1234 is a low-noise op-amp.",
+    "package_dimensions": "SOIC-8, 4.9 x 3.9 mm",
+    "pin_configuration": "| 1 | OUT |",
+}
+
+
+def test_prompts_share_the_template_prefix_across_targets():
+    extractor = ContentExtractor(llm_client=None)
+    prompts = [extractor.build_prompt("", SECTIONS, targets) for targets in TARGET_SETS]
+    prompts.append(extractor.build_prompt("Raw datasheet text", None, ["pins"]))
+
+    assert {system for system, _ in prompts} == {DEFAULT_TEMPLATE.system}
+    users = [user for _, user in prompts]
+    assert all(user.startswith(DEFAULT_TEMPLATE.prefix) for user in users)
+    assert common_prefix_length(users) >= len(DEFAULT_TEMPLATE.prefix)
+    # Variable content comes last
+    assert all(user.endswith("\n") and "Datasheet Text:" in user[len(DEFAULT_TEMPLATE.prefix):] for user in users)
+
+
+def test_template_registry():
+    assert get_template(DEFAULT_TEMPLATE.version) is DEFAULT_TEMPLATE
+    with pytest.raises(ValueError):
+        get_template("extraction-v0")
+    # Older versions stay available so stored extractions can be traced back
+    assert "body_width" not in get_template("extraction-v2").instructions
+    assert "body_width" in get_template("extraction-v3").instructions
+
+
+def test_common_prefix_length():
+    assert common_prefix_length(["abcd", "abxy", "abc"]) == 2
+    assert common_prefix_length(["same", "same"]) == 4
+    assert common_prefix_length([]) == 0
+
+
+def test_parse_prefix_cache_metrics_across_vllm_versions():
+    v1 = ('vllm:prefix_cache_queries_total{model_name="m"} 100.0\n'
+          'vllm:prefix_cache_hits_total{model_name="m"} 40.0\n')
+    legacy_v1 = 'vllm:gpu_prefix_cache_queries_total 10\nvllm:gpu_prefix_cache_hits_total 5\n'
+    v0 = '# HELP vllm:gpu_prefix_cache_hit_rate GPU prefix cache block hit rate.\nvllm:gpu_prefix_cache_hit_rate{model_name="m"} 0.25\n'
+
+    assert parse_prefix_cache_metrics(v1) == {"queries": 100.0, "hits": 40.0}
+    assert parse_prefix_cache_metrics(legacy_v1) == {"queries": 10.0, "hits": 5.0}
+    assert parse_prefix_cache_metrics(v0) == {"hit_rate": 0.25}
+    assert parse_prefix_cache_metrics("") == {}
+
+
+def test_prefix_cache_hit_rate_against_mock_server():
+    with MockVLLMServer() as server:
+        result = run(server.base_url, server.model_name, datasheets=3)
+
+    assert result["requests"] == 3 * len(TARGET_SETS)
+    assert result["shared_prefix_chars"] >= len(DEFAULT_TEMPLATE.system) + len(DEFAULT_TEMPLATE.prefix)
+    assert result["expected_hit_rate"] > 0.2
+    assert result["measured_hit_rate"] >= result["expected_hit_rate"] * 0.9
@@ -0,0 +1,91 @@
+import pytest
+from src.benchmarks.sexpr_parse import benchmark_library, write_synthetic_library
+from src.generators import sexpr
+from src.generators.sexpr import SExprError, parse, diff, is_equivalent
+from src.generators.symbol_generator import SymbolGenerator
+from src.generators.symbol_library import SymbolLibraryWriter
+from src.generators.footprint_generator import FootprintGenerator
+from src.models.data_models import Component, Package, Pin
+
+
+def part(name, pin_count=8):
+    component = Component(datasheet_id=1, part_number=name, description='Says "hi"')
+    pins = [Pin(package_id=0, number=str(i), name=f"P{i}", electrical_type="Input")
+            for i in range(1, pin_count + 1)]
+    return component, pins
+
+
+def test_parse_atoms_and_strings():
+    node = parse('(pad "1" smd rect (at -2.5 0) (net 1 "A \\"B\\""))')
+    assert node == ["pad", "1", "smd", "rect", ["at", "-2.5", "0"], ["net", "1", 'A "B"']]
+
+
+def test_parse_errors():
+    with pytest.raises(SExprError):
+        parse('(a (b)')
+    with pytest.raises(SExprError):
+        parse(')')
+
+
+def test_iter_children_handles_escaped_backslashes():
+    text = r'(lib (symbol "C:\\") (symbol "a\"(") (symbol "\\\"") (symbol "b"))'
+    spans = list(sexpr.iter_children(text))
+    assert [parse(text, start, end) for start, end in spans] == parse(text)[1:]
+    assert [text[start:end] for start, end in spans][-1] == '(symbol "b")'
+
+
+def test_diff_ignores_order_formatting_and_timestamps():
+    old = '(footprint "X" (tedit 1) (pad "1" smd (at 1.0 0)) (pad "2" smd (at -1 0)))'
+    new = '(footprint "X"\n  (tedit 2)\n  (pad "2" smd (at -1.00 0))\n  (pad "1" smd (at 1 0)))'
+    assert is_equivalent(old, new)
+
+
+def test_diff_reports_changes():
+    old = '(footprint "X" (pad "1" smd (at 1 0)) (pad "2" smd (at -1 0)))'
+    new = '(footprint "X" (pad "1" smd (at 1.2 0)) (pad "3" smd (at 0 0)))'
+    changes = diff(old, new)
+
+    assert ("footprint/pad:1/at", ["at", "1", "0"], ["at", "1.2", "0"]) in changes
+    assert any(path == "footprint/pad:2" and new_node is None for path, _, new_node in changes)
+    assert any(path == "footprint/pad:3" and old_node is None for path, old_node, _ in changes)
+
+
+def test_symbol_library_round_trip(tmp_path):
+    path = str(tmp_path / "Parts.kicad_sym")
+    with SymbolLibraryWriter(path) as lib:
+        for i in range(3):
+            lib.upsert(*part(f"PART-{i}"))
+
+    symbols = sexpr.load_symbol_library(path)
+    assert list(symbols) == ["PART-0", "PART-1", "PART-2"]
+    # Nothing is parsed until requested
+    assert all(s._node is None for s in symbols.values())
+
+    regenerated = SymbolGenerator().generate_symbol_block(*part("PART-1"))
+    assert is_equivalent(symbols["PART-1"], regenerated)
+
+    changed = SymbolGenerator().generate_symbol_block(*part("PART-1", pin_count=9))
+    changes = diff(symbols["PART-1"], changed)
+    assert any(path.endswith("pin:9") for path, _, _ in changes)
+
+
+def test_generated_footprint_round_trip(tmp_path):
+    pkg = Package(component_id=0, name="QFN-16", package_type="QFN", dimensions={"pin_count": 16})
+    content = FootprintGenerator().generate_footprint(pkg)
+    path = tmp_path / "QFN-16.kicad_mod"
+    path.write_text(content)
+
+    footprint = sexpr.load_footprint(str(path))
+    assert footprint.head == "footprint" and footprint.name == "QFN-16"
+    assert sum(1 for c in footprint.children() if c.head == "pad") == 16
+    assert is_equivalent(footprint, sexpr.footprint_from_text(content))
+    assert sexpr.load_footprint_library(str(tmp_path)) == {"QFN-16": str(path)}
+
+
+def test_library_benchmark_indexes_and_parses(tmp_path):
+    path = str(tmp_path / "Big.kicad_sym")
+    write_synthetic_library(path, symbols=50, pin_count=8)
+
+    result = benchmark_library(path)
+    assert result["symbols"] == 50
+    assert result["index_seconds"] >= 0 and result["parse_seconds"] >= 0
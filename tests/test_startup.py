@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import pytest
+from src.lazy_import import lazy_import, is_available
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_MODULES = {"cadquery", "OCP", "openai", "fitz"}
+
+# Cold-start budget for importing an entry point (seconds)
+STARTUP_BUDGET = 1.0
+
+ENTRY_POINTS = [
+    "src.generators.footprint_library",
+    "src.generators.model_generator",
+    "src.backend.extractor",
+    pytest.param("src.gui.main_window",
+                 marks=pytest.mark.skipif(not is_available("PySide6"), reason="PySide6 not installed")),
+]
+
+
+def import_times(module: str):
+    """Runs `python -X importtime` in a fresh interpreter; returns {module: cumulative seconds}."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if cumulative.isdigit():
+            times[name] = int(cumulative) / 1e6
+    return times
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_point_imports_no_heavy_dependencies(module):
+    times = import_times(module)
+    loaded = {name.split(".")[0] for name in times}
+
+    assert not loaded & HEAVY_MODULES
+    assert times[module] < STARTUP_BUDGET
+
+
+def test_lazy_module_loads_on_first_attribute_access():
+    lazy_json = lazy_import("json")
+    assert "not loaded" in repr(lazy_json)
+    assert lazy_json.loads("[1]") == [1]
+    assert "loaded" in repr(lazy_json) and "not loaded" not in repr(lazy_json)
+
+    dumps = lazy_import("json", "dumps")
+    assert dumps({"a": 1}) == '{"a": 1}'
+    assert not is_available("no_such_module_xyz")
@@ -0,0 +1,70 @@
+import re
+import pytest
+from src.benchmarks.generators import fpga_pins, main as benchmark_main
+from src.generators.symbol_generator import SymbolGenerator
+from src.models.data_models import Component, Pin
+
+
+@pytest.fixture
+def component():
+    return Component(datasheet_id=1, part_number="XC7A200T", description="FPGA")
+
+
+def unit_pin_counts(content, lib_name):
+    units = re.split(rf'\(symbol "{lib_name}_\d+_1"', content)[1:]
+    return [unit.count("(pin ") for unit in units]
+
+
+def test_small_part_stays_single_unit(component):
+    pins = [Pin(package_id=0, number=str(i), name=f"P{i}", electrical_type="Input") for i in range(1, 9)]
+    content = SymbolGenerator().generate_symbol(component, pins)
+
+    assert '(symbol "XC7A200T_1_1"' in content
+    assert '(symbol "XC7A200T_2_1"' not in content
+
+
+def test_large_part_is_split_by_bank(component):
+    pins = fpga_pins(banks=[14, 15, 34], per_bank=50, power=40)
+    content = SymbolGenerator().generate_symbol(component, pins)
+    counts = unit_pin_counts(content, "XC7A200T")
+
+    # One unit per bank, power pins collected in their own unit
+    assert counts == [50, 50, 50, 40]
+    bank_34_unit = re.split(r'\(symbol "XC7A200T_\d+_1"', content)[3]
+    assert "IO_L0P_T0_34" in bank_34_unit
+    assert "IO_L0P_T0_14" not in bank_34_unit
+
+
+def test_oversized_group_is_chunked(component):
+    generator = SymbolGenerator()
+    generator.max_pins_per_unit = 32
+    pins = fpga_pins(banks=[14], per_bank=80, power=0)
+    counts = unit_pin_counts(generator.generate_symbol(component, pins), "XC7A200T")
+
+    assert counts == [32, 32, 16]
+
+
+def test_natural_pin_order():
+    generator = SymbolGenerator()
+    pins = [Pin(package_id=0, number=n, electrical_type="Input") for n in ("B1", "A10", "A2", "AA1")]
+    left, _, _, _ = generator._group_pins(pins)
+
+    assert [p.number for p in left] == ["A2", "A10", "AA1", "B1"]
+
+
+def test_2000_pin_part_is_split_into_units(component):
+    pins = fpga_pins(banks=range(10, 46), per_bank=50, power=200)
+    assert len(pins) == 2000
+
+    content = SymbolGenerator().generate_symbol(component, pins)
+
+    counts = unit_pin_counts(content, "XC7A200T")
+    assert sum(counts) == 2000
+    assert max(counts) <= 64
+
+
+def test_generator_benchmark_runs():
+    # Timing lives in src.benchmarks.generators; this only checks it still runs
+    results = benchmark_main(["--symbol-pins", "200", "--bga-rows", "8"])
+    assert results["symbol"]["pins"] == 200 and results["symbol"]["units"] > 1
+    assert results["footprint"]["pads"] == 64
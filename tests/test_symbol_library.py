@@ -0,0 +1,107 @@
+import pytest
+from src.generators.symbol_library import SymbolLibraryWriter
+from src.models.data_models import Component, Pin
+
+
+def part(name, pin_count=4, description=""):
+    component = Component(datasheet_id=1, part_number=name, description=description)
+    pins = [Pin(package_id=0, number=str(i), name=f"P{i}", electrical_type="Input")
+            for i in range(1, pin_count + 1)]
+    return component, pins
+
+
+def test_create_and_reload(tmp_path):
+    path = str(tmp_path / "Parts.kicad_sym")
+    with SymbolLibraryWriter(path) as lib:
+        for i in range(5):
+            lib.upsert(*part(f"PART-{i}"))
+
+    content = open(path).read()
+    assert content.startswith("(kicad_symbol_lib")
+    assert content.rstrip().endswith(")")
+    assert content.count('\n  (symbol "PART-') == 5
+
+    reloaded = SymbolLibraryWriter(path)
+    assert reloaded.names() == [f"PART-{i}" for i in range(5)]
+    assert reloaded.get("PART-3").startswith('  (symbol "PART-3"')
+
+
+def test_update_remove_and_add(tmp_path):
+    path = str(tmp_path / "Parts.kicad_sym")
+    with SymbolLibraryWriter(path) as lib:
+        for i in range(5):
+            lib.upsert(*part(f"PART-{i}"))
+
+    lib = SymbolLibraryWriter(path)
+    untouched = lib.get("PART-4")
+    lib.upsert(*part("PART-1", pin_count=8))
+    lib.remove("PART-2")
+    lib.upsert(*part("PART-9"))
+    lib.upsert(*part("PART-0"))
+    stats = lib.commit()
+
+    assert stats == {"added": 1, "updated": 1, "removed": 1, "unchanged": 1}
+    assert lib.names() == ["PART-0", "PART-1", "PART-3", "PART-4", "PART-9"]
+    assert lib.get("PART-1").count("(pin ") == 8
+    assert lib.get("PART-4") == untouched
+
+    # In-memory index matches a fresh scan of the file
+    assert SymbolLibraryWriter(path).index == lib.index
+
+
+def test_unchanged_commit_does_not_rewrite(tmp_path):
+    path = tmp_path / "Parts.kicad_sym"
+    with SymbolLibraryWriter(str(path)) as lib:
+        lib.upsert(*part("PART-0"))
+    mtime = path.stat().st_mtime_ns
+
+    with SymbolLibraryWriter(str(path)) as lib:
+        lib.upsert(*part("PART-0"))
+
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_failed_batch_leaves_library_untouched(tmp_path):
+    path = tmp_path / "Parts.kicad_sym"
+    with SymbolLibraryWriter(str(path)) as lib:
+        lib.upsert(*part("PART-0"))
+    before = path.read_bytes()
+
+    with pytest.raises(RuntimeError):
+        with SymbolLibraryWriter(str(path)) as lib:
+            lib.remove("PART-0")
+            raise RuntimeError("abort")
+
+    assert path.read_bytes() == before
+
+
+def test_structurally_equal_symbol_is_not_rewritten(tmp_path):
+    path = str(tmp_path / "Parts.kicad_sym")
+    with SymbolLibraryWriter(path) as lib:
+        lib.upsert(*part("PART-0"))
+
+    lib = SymbolLibraryWriter(path)
+    reformatted = lib.get("PART-0").replace("(at 0 5 0)", "(at 0.0 5.00 0)")
+    lib.upsert_block("PART-0", reformatted)
+    assert lib.commit()["unchanged"] == 1
+
+
+def test_tab_indented_library_is_indexed(tmp_path):
+    path = tmp_path / "Parts.kicad_sym"
+    with SymbolLibraryWriter(str(path)) as lib:
+        for i in range(3):
+            lib.upsert(*part(f"PART-{i}"))
+    # KiCAD re-saves libraries with tab indentation
+    lines = path.read_text().splitlines(keepends=True)
+    path.write_text("".join("\t" * ((len(l) - len(l.lstrip(" "))) // 2) + l.lstrip(" ") for l in lines))
+
+    lib = SymbolLibraryWriter(str(path))
+    assert lib.names() == ["PART-0", "PART-1", "PART-2"]
+    lib.upsert(*part("PART-1", pin_count=8))
+    lib.remove("PART-2")
+    assert lib.commit() == {"added": 0, "updated": 1, "removed": 1, "unchanged": 0}
+
+    content = path.read_text()
+    assert content.count('(symbol "PART-1"') == 1 and 'PART-2' not in content
+    assert SymbolLibraryWriter(str(path)).names() == ["PART-0", "PART-1"]
+    assert SymbolLibraryWriter(str(path)).get("PART-0").startswith('\t(symbol "PART-0"')
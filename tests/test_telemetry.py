@@ -0,0 +1,106 @@
+import json
+import urllib.request
+import pytest
+from src.telemetry import Tracer, Metrics, JsonlExporter, MetricsServer, tracer, metrics
+from src.backend.ingestion import IngestionEngine
+from src.backend.llm_client import LLMClient
+from src.backend.extractor import ContentExtractor
+from src.benchmarks.mock_vllm import MockVLLMServer
+from src.benchmarks.pipeline import StubLLMClient, synthetic_datasheet
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def recorded_spans():
+    exporter = ListExporter()
+    tracer.exporters.append(exporter)
+    try:
+        yield exporter.spans
+    finally:
+        tracer.exporters.remove(exporter)
+
+
+def test_spans_nest_and_export_jsonl(tmp_path):
+    local = Tracer()
+    path = tmp_path / "trace.jsonl"
+    exporter = JsonlExporter(str(path))
+    local.exporters.append(exporter)
+
+    with local.span("extraction") as outer:
+        with local.span("prompt_build", chars=10):
+            pass
+    with pytest.raises(RuntimeError):
+        with local.span("db.write"):
+            raise RuntimeError("locked")
+    exporter.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["name"] for r in records] == ["prompt_build", "extraction", "db.write"]
+    inner, outer_rec, failed = records
+    assert inner["parent_id"] == outer.span_id
+    assert inner["trace_id"] == outer_rec["trace_id"]
+    assert inner["attributes"] == {"chars": 10}
+    assert outer_rec["parent_id"] is None
+    assert failed["error"] == "RuntimeError: locked"
+    assert local.metrics.histogram("stage_duration_seconds", stage="extraction")["count"] == 1
+    assert local.metrics.counter("stage_errors_total", stage="db.write") == 1
+
+
+def test_prometheus_rendering_and_endpoint():
+    m = Metrics(buckets=(0.1, 1.0))
+    m.inc("llm_requests_total", help="Requests", status="ok")
+    m.observe("stage_duration_seconds", 0.5, stage='say "hi"')
+
+    text = m.render_prometheus()
+    assert "# TYPE llm_requests_total counter" in text
+    assert 'llm_requests_total{status="ok"} 1' in text
+    assert 'stage_duration_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 0' in text
+    assert 'stage_duration_seconds_bucket{stage="say \\"hi\\"",le="1"} 1' in text
+    assert 'stage_duration_seconds_count{stage="say \\"hi\\""} 1' in text
+
+    server = MetricsServer(m, port=0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+            assert response.read().decode() == m.render_prometheus()
+    finally:
+        server.stop()
+
+
+def test_pipeline_traces_stages_without_printing(tmp_path, capsys, recorded_spans):
+    path = tmp_path / "datasheet.md"
+    path.write_text(synthetic_datasheet(16, 20_000), encoding='utf-8')
+    ingested = IngestionEngine().process_file(str(path))
+    extractor = ContentExtractor(StubLLMClient(16))
+
+    result = extractor.extract_all(ingested["content"], sections=ingested["sections"])
+
+    assert len(result["pins"]) == 16
+    assert capsys.readouterr().out == ""
+    by_name = {s.name: s for s in recorded_spans}
+    assert {"ingestion", "extraction", "prompt_build", "model_construction"} <= set(by_name)
+    assert by_name["ingestion"].attributes["sections"] == len(ingested["sections"])
+    assert by_name["prompt_build"].parent_id == by_name["extraction"].span_id
+    assert by_name["prompt_build"].attributes["prompt_chars"] > 0
+
+
+def test_streaming_client_records_ttft_and_tokens(recorded_spans):
+    metrics.reset()
+    with MockVLLMServer(latency_ms=20, tokens_per_second=2000) as server:
+        client = LLMClient(base_url=server.base_url, model_name=server.model_name, stream=True)
+        response = client.generate("Extract the component data as JSON.", json_mode=True)
+
+    assert response["component"]["part_number"] == "MOCK-1234"
+    span = next(s for s in recorded_spans if s.name == "llm_request")
+    assert span.attributes["ttft_seconds"] >= 0.02
+    assert span.attributes["completion_tokens"] == server.stats["completion_tokens"]
+    assert metrics.histogram("llm_ttft_seconds")["count"] == 1
+    assert metrics.histogram("llm_queue_seconds")["count"] == 1
+    assert metrics.counter("llm_requests_total", status="ok") == 1
+    assert metrics.counter("llm_completion_tokens_total") == server.stats["completion_tokens"]
@@ -0,0 +1,109 @@
+import pytest
+from src.benchmarks.validation import benchmark_validation
+from src.backend.validation import (ValidationIssue, ERROR, WARNING, validate, has_errors, expected_pin_count,
+                                    normalize_electrical_type, normalize_pins, pin_count_from_name)
+from src.models.data_models import Component, Package, Pin
+
+
+def make_part(package_name="SOIC-8", pin_count=8, dimensions=None, numbers=None, etype="Input"):
+    component = Component(datasheet_id=1, part_number="LM358")
+    package = Package(component_id=1, name=package_name, dimensions=dimensions or {"pitch": 1.27, "body_width": 3.9})
+    pins = [Pin(package_id=1, number=n, name=f"P{n}", electrical_type=etype)
+            for n in (numbers or [str(i) for i in range(1, pin_count + 1)])]
+    return component, package, pins
+
+
+def rules(issues, severity=None):
+    return [i.rule for i in issues if severity is None or i.severity == severity]
+
+
+def test_consistent_part_has_no_issues():
+    assert validate(*make_part()) == []
+
+
+def test_pin_count_must_match_package_name():
+    issues = validate(*make_part("SOIC-8", pin_count=14))
+    assert rules(issues, ERROR) == ["pin_count"]
+    assert issues[0].suggestion == 8 and "14 pins" in issues[0].message
+
+    # Exposed pad adds one; fixed-count names are not read from their digits
+    assert validate(*make_part("QFN-16", pin_count=17)) == []
+    assert validate(*make_part("SOT-23", pin_count=3)) == []
+    assert rules(validate(*make_part("SOT-23-5", pin_count=3)), ERROR) == ["pin_count"]
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("QFN-32 5x5", 32), ("DFN-8 3x3", 8), ("WQFN-16 3x3", 16), ("LQFP-64_10x10mm_P0.5mm", 64),
+    ("PowerPAK SO-8 5x6", 8), ("ACME_SO8", 8), ("XYZ 5x5", None),
+])
+def test_pin_count_from_name_ignores_body_size(name, expected):
+    assert pin_count_from_name(name) == expected
+
+
+def test_body_size_in_name_does_not_reject_valid_part():
+    assert validate(*make_part("QFN-32 5x5", pin_count=32, dimensions={"pitch": 0.5})) == []
+    assert rules(validate(*make_part("DFN-8 3x3", pin_count=3, dimensions={"pitch": 0.65})), ERROR) == ["pin_count"]
+
+
+def test_declared_pin_count_conflicting_with_name_is_flagged():
+    issues = validate(*make_part("SOIC-8", pin_count=14, dimensions={"pin_count": 14}))
+    assert [(i.rule, i.severity, i.field) for i in issues] == \
+        [("pin_count", WARNING, "package.dimensions.pin_count")]
+    assert expected_pin_count(make_part(dimensions={"pin_count": 14})[1]) == 14
+
+
+def test_duplicate_empty_and_missing_pin_numbers():
+    issues = validate(*make_part("SOIC-8", numbers=["1", "2", "2", "", "5", "6", "7", "8"]))
+    messages = {i.message for i in issues}
+    assert "Duplicate pin numbers: 2" in messages
+    assert any(i.field == "pins[3].number" and i.severity == ERROR for i in issues)
+    missing = next(i for i in issues if i.message.startswith("Missing"))
+    assert missing.severity == WARNING and missing.suggestion == [3, 4]
+
+    # BGA ball names have no numeric sequence to check
+    assert validate(*make_part("BGA", numbers=["A1", "A2", "B1", "B3"])) == []
+
+
+@pytest.mark.parametrize("dimensions, severity", [
+    ({"pitch": 0.0}, ERROR),
+    ({"body_width": -3.9}, ERROR),
+    ({"pitch": 12.7}, WARNING),
+    ({"height": 45.0}, WARNING),
+])
+def test_dimension_ranges(dimensions, severity):
+    issues = validate(*make_part(dimensions=dimensions))
+    assert [(i.rule, i.severity) for i in issues] == [("dimensions", severity)]
+    assert issues[0].field == f"package.dimensions.{next(iter(dimensions))}"
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Power", "power_in"), ("GND", "power_in"), ("I/O", "bidirectional"), ("Open-Drain", "open_collector"),
+    ("N/C", "no_connect"), ("Tri-State", "tri_state"), ("Input (5 V tolerant)", "input"),
+    ("power_out", "power_out"), (None, "unspecified"), ("Magic", None),
+])
+def test_normalize_electrical_type(value, expected):
+    assert normalize_electrical_type(value) == expected
+
+
+def test_unknown_electrical_type_is_a_warning_and_kept_by_normalize():
+    component, package, pins = make_part(etype="Magic")
+    issues = validate(component, package, pins)
+    assert rules(issues) == ["electrical_type"] * 8 and not has_errors(issues)
+    assert normalize_pins(pins)[0].electrical_type == "Magic"
+    assert normalize_pins(make_part(etype="Power")[2])[0].electrical_type == "power_in"
+
+
+def test_errors_sort_first_and_serialize():
+    component = Component(datasheet_id=1, part_number="unknown")
+    _, package, pins = make_part(dimensions={"pitch": 9.0})
+    issues = validate(component, package, pins)
+    assert [i.severity for i in issues] == [ERROR, WARNING]
+    assert issues[0].to_dict() == {"rule": "part_number", "severity": ERROR, "field": "component.part_number",
+                                   "message": "Part number is missing", "suggestion": None}
+    assert isinstance(issues[0], ValidationIssue)
+
+
+def test_validation_benchmark_runs():
+    # Timing lives in src.benchmarks.validation; this only checks it still runs
+    results = benchmark_validation(parts=10)
+    assert (results["parts"], results["pins"], results["issues"]) == (10, 64, 0)